@@ -3,13 +3,16 @@ TrendForge AI Backend - MVP 3.1
 Deep content analysis with social media trends + Prophet time series prediction
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Callable, Awaitable
 import asyncio
+from contextlib import asynccontextmanager
 from datetime import datetime
 import os
+import json
 import urllib.parse
 from dotenv import load_dotenv
 
@@ -45,6 +48,36 @@ print(f"✅ Using audience_analyzer: {type(audience_analyzer).__name__}")
 print(f"✅ Analyzer has extract_topics_from_titles: {hasattr(content_analyzer, 'extract_topics_from_titles')}")
 print(f"✅ Analyzer has _extract_proper_nouns: {hasattr(content_analyzer, '_extract_proper_nouns')}")
 print(f"✅ Analyzer has _extract_proper_nouns_nltk: {hasattr(content_analyzer, '_extract_proper_nouns_nltk')} (should be False)")
+
+# CPU executor: NLTK / 推荐 / 标题生成在有界进程池中执行，不阻塞事件循环
+from services.cpu_executor import (
+    cpu_executor,
+    analyze_channel_task,
+    generate_recommendations_task,
+    generate_basic_recommendations_task,
+    generate_titles_task
+)
+from services.pipeline_dag import PipelineDAG
+from services.analysis_cache import analysis_cache, fingerprint_videos, make_cache_key
+from services.single_flight import SingleFlight
+from services.nlp_memo import title_memo
+from services.io_executor import social_io_executor
+
+# Request coalescing for concurrent identical work
+stage_flight = SingleFlight('analysis_stages')
+prediction_flight = SingleFlight('prophet_predictions')
+
+# Async job API for long-running full analysis
+from services.analysis_jobs import JobManager, JobStore, JobQueueFullError
+job_manager = JobManager(
+    store=JobStore(
+        max_jobs=int(os.getenv('ANALYSIS_JOB_MAX_STORED', '200')),
+        ttl=int(os.getenv('ANALYSIS_JOB_TTL', '3600'))
+    ),
+    max_workers=int(os.getenv('ANALYSIS_JOB_WORKERS', '2')),
+    max_queue=int(os.getenv('ANALYSIS_JOB_MAX_QUEUE', '20'))
+)
+
 # Try to use enhanced social collector (MVP 3.1), fallback to original
 try:
     from services.enhanced_social_collector import EnhancedSocialMediaAggregator
@@ -110,6 +143,11 @@ except ImportError:
     PROPHET_AVAILABLE = False
     print("⚠️ Prophet predictor not available")
 
+# Predictions run with Prophet or the batched NumPy forecaster (TREND_FORECASTER=auto|prophet|fast)
+PREDICTIONS_AVAILABLE = trend_predictor is not None and getattr(trend_predictor, 'available', PROPHET_AVAILABLE)
+if PREDICTIONS_AVAILABLE and not PROPHET_AVAILABLE:
+    print(f"✅ Trend predictions enabled ({trend_predictor.forecaster} forecaster)")
+
 # Load environment variables
 load_dotenv()
 
@@ -137,6 +175,13 @@ else:
         reddit_secret=os.getenv('REDDIT_CLIENT_SECRET')
     )
 
+# 热门关键词后台预热（TREND_PREWARM_ENABLED=true 时在进程内运行；
+# 也可单独运行: python -m services.trend_prewarmer）
+trend_prewarmer = None
+if USE_ENHANCED_COLLECTOR and os.getenv('TREND_PREWARM_ENABLED', 'false').lower() == 'true':
+    from services.trend_prewarmer import create_prewarmer
+    trend_prewarmer = create_prewarmer(social_aggregator)
+
 # Initialize backtest analyzer (MVP 2.0 feature)
 from services.backtest_analyzer import BacktestAnalyzer
 backtest_analyzer = BacktestAnalyzer(recommendation_engine, social_aggregator)
@@ -152,10 +197,32 @@ except ImportError:
     SCRIPT_GENERATOR_AVAILABLE = False
     print("⚠️ Script Generator not available")
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用生命周期：启动/关闭共享的执行器"""
+    cpu_executor.start()
+    job_manager.start()
+    if trend_prewarmer is not None:
+        trend_prewarmer.start()
+    try:
+        yield
+    finally:
+        if trend_prewarmer is not None:
+            await trend_prewarmer.stop()
+        await job_manager.shutdown()
+        cpu_executor.shutdown()
+        social_io_executor.shutdown()
+        if trend_predictor is not None and hasattr(trend_predictor, 'shutdown'):
+            trend_predictor.shutdown()
+        if hasattr(social_aggregator, 'cache') and hasattr(social_aggregator.cache, 'close'):
+            await social_aggregator.cache.close()
+
+
 app = FastAPI(
     title="TrendForge AI Backend - MVP 3.1 (Prophet + LLM + ML)",
     version="3.1.0",
-    description="Intelligent YouTube trend prediction with deep content analysis and AI-powered script generation"
+    description="Intelligent YouTube trend prediction with deep content analysis and AI-powered script generation",
+    lifespan=lifespan
 )
 
 # CORS
@@ -366,7 +433,8 @@ async def analyze_channel_endpoint(request: ChannelAnalysisRequest):
         print(f"📊 Analyzing channel with {len(request.videos)} videos...")
         
         # 强制禁用字幕分析以提速
-        analysis = analyze_channel_deeply(
+        analysis = await cpu_executor.run(
+            analyze_channel_task,
             request.videos,
             request.channel_data
         )
@@ -446,19 +514,21 @@ async def generate_recommendations(request: RecommendationRequest):
         )
         
         # Generate recommendations
-        recommendations = recommendation_engine.generate_recommendations(
+        recommendations = await cpu_executor.run(
+            generate_basic_recommendations_task,
             request.channel_analysis,
             social_results['merged_trends'],
             request.max_recommendations
         )
         
         # Generate titles for each recommendation
-        for rec in recommendations:
-            titles = title_engine.generate_titles(
-                rec,
-                request.channel_analysis,
-                count=3
-            )
+        titles_list = await cpu_executor.run(
+            generate_titles_task,
+            recommendations,
+            request.channel_analysis,
+            3
+        )
+        for rec, titles in zip(recommendations, titles_list):
             rec['suggested_titles'] = titles
         
         return {
@@ -478,11 +548,12 @@ async def generate_titles(request: TitleGenerationRequest):
     Generate optimized title variants for a specific recommendation
     """
     try:
-        titles = title_engine.generate_titles(
-            request.recommendation,
+        titles = (await cpu_executor.run(
+            generate_titles_task,
+            [request.recommendation],
             request.channel_analysis,
             request.count
-        )
+        ))[0]
         
         return {
             "success": True,
@@ -493,8 +564,41 @@ async def generate_titles(request: TitleGenerationRequest):
         raise HTTPException(status_code=500, detail=f"Title generation failed: {str(e)}")
 
 
-@app.post("/api/v2/full-analysis")
-async def full_analysis(request: FullAnalysisRequest):
+# Full-analysis pipeline steps, in execution order (used for progress reporting)
+PIPELINE_STEPS = ['channel', 'social', 'recommendations', 'backtest', 'predictions']
+
+
+def _format_channel_analysis(channel_analysis: Dict) -> Dict:
+    """channel_analysis section of the full-analysis response"""
+    return {
+        "topics": channel_analysis.get('topics', [])[:15],
+        "content_style": channel_analysis.get('content_style', {}),
+        "target_audience": channel_analysis.get('target_audience', {}),
+        "high_performers": channel_analysis.get('high_performers', {}),
+        "total_videos_analyzed": channel_analysis.get('total_videos_analyzed', 0)
+    }
+
+
+def _format_social_trends(social_trends_data: Dict) -> Dict:
+    """social_trends section of the full-analysis response"""
+    by_source = social_trends_data.get('by_source', {})
+    return {
+        "merged_trends": social_trends_data['merged_trends'],
+        "source_breakdown": {
+            "twitter_count": len(by_source.get('twitter', [])),
+            "reddit_count": len(by_source.get('reddit', [])),
+            "google_trends_count": len(by_source.get('google_trends', []))
+        },
+        # 各数据源的新鲜度（live / cached / partial / stale / unavailable + 数据年龄）
+        "freshness": social_trends_data.get('freshness', {})
+    }
+
+
+async def run_full_analysis(
+    request: FullAnalysisRequest,
+    on_step: Optional[Callable[[str, str, Optional[Dict]], None]] = None,
+    use_cache: bool = True
+) -> Dict:
     """
     🚀 FAST ANALYSIS PIPELINE - Quick Fix Version
     
@@ -503,24 +607,88 @@ async def full_analysis(request: FullAnalysisRequest):
     - Reduced social media timeout
     - Optional simple mode (skip social trends)
     - Disabled backtest by default
+    
+    Args:
+        request: Full analysis request
+        on_step: Optional progress callback on_step(step, status, payload).
+                 status is one of running/completed/skipped/timeout/failed;
+                 payload carries the partial result of a finished step using
+                 the same shapes as the final response.
+        use_cache: Read stage results from the analysis cache (fresh results
+                   are always written back)
     """
-    try:
-        print("🔍 Starting FAST analysis pipeline...")
-        start_time = datetime.utcnow()
+    def report(step: str, status: str, payload: Optional[Dict] = None):
+        if on_step:
+            try:
+                on_step(step, status, payload)
+            except Exception as e:
+                print(f"   ⚠️ Progress callback failed ({step}/{status}): {e}")
+    
+    print("🔍 Starting FAST analysis pipeline...")
+    start_time = datetime.utcnow()
+    
+    # Content-addressed stage cache: each stage is keyed only by the inputs it
+    # depends on, and a cached stage result is reused only when none of its
+    # upstream stages were recomputed in this run. Cache misses go through
+    # single-flight, so duplicate concurrent runs compute each stage once.
+    videos_fingerprint = fingerprint_videos(request.videos)
+    request_flags = request.model_dump(exclude={'videos', 'channel_data'})
+    stage_cache_keys = {
+        'channel': make_cache_key(videos_fingerprint, request.channel_data),
+        'social': make_cache_key(videos_fingerprint, request.channel_data,
+                                 request.geo, request.use_simple_mode),
+        'recommendations': make_cache_key(videos_fingerprint, request.channel_data, request_flags),
+        'backtest': make_cache_key(videos_fingerprint, request.channel_data, request.enable_backtest),
+        'predictions': make_cache_key(videos_fingerprint, request.channel_data, request_flags),
+    }
+    cache_hits: List[str] = []
+    fresh_stages = set()
+    
+    async def cached(stage: str, compute: Callable[[], Awaitable], depends_on=(), cacheable=None):
+        key = stage_cache_keys[stage]
+        if use_cache and not fresh_stages.intersection(depends_on):
+            value = analysis_cache.get(stage, key)
+            if value is not None:
+                print(f"   📦 Using cached {stage} result")
+                cache_hits.append(stage)
+                return value
         
+        async def compute_and_store():
+            value = await compute()
+            if cacheable is None or cacheable(value):
+                analysis_cache.set(stage, key, value)
+            return value
+        
+        # Concurrent identical analyses share one in-flight computation per stage
+        value = await stage_flight.do((stage, key), compute_and_store)
+        fresh_stages.add(stage)
+        return value
+    
+    async def stage_channel(ctx: Dict):
+        """Step 1: deep channel analysis"""
         # Step 1: Deep channel analysis (Fast)
         print("📊 Step 1/5: Analyzing channel...")
-        channel_analysis = analyze_channel_deeply(
-            request.videos,
-            request.channel_data
-        )
+        report('channel', 'running')
+        try:
+            channel_analysis = await cached('channel', lambda: cpu_executor.run(
+                analyze_channel_task,
+                request.videos,
+                request.channel_data
+            ))
+        except Exception:
+            report('channel', 'failed')
+            raise
         print(f"   ✅ Channel analyzed in {(datetime.utcnow() - start_time).total_seconds():.1f}s")
-        
+        report('channel', 'completed', {"channel_analysis": _format_channel_analysis(channel_analysis)})
+        return channel_analysis
+    
+    async def stage_social(ctx: Dict):
+        """Step 2: social trends for the top channel topics"""
+        channel_analysis = ctx['channel']
         # Extract keywords
         keywords = [t['topic'] for t in channel_analysis.get('topics', [])][:5]  # 减少到5个
         
         # Step 2: Collect social trends (with timeout)
-        recommendations = []
         social_trends_data = {
             'merged_trends': [],
             'by_source': {},
@@ -528,46 +696,68 @@ async def full_analysis(request: FullAnalysisRequest):
         
         if not request.use_simple_mode and keywords:
             print("🌐 Step 2/5: Collecting social media trends (quick mode)...")
+            report('social', 'running')
             
-            try:
-                # 设置严格的超时
-                social_results = await asyncio.wait_for(
-                    social_aggregator.collect_all_trends(keywords, request.geo),
-                    timeout=15.0  # 15秒超时
-                )
-                
-                social_trends_data = {
-                    'merged_trends': social_results.get('merged_trends', [])[:10],
-                    'by_source': social_results.get('by_source', {})
-                }
-                
-                print(f"   ✅ Trends collected in {(datetime.utcnow() - start_time).total_seconds():.1f}s")
+            async def collect_social():
+                try:
+                    # 设置严格的超时
+                    social_results = await asyncio.wait_for(
+                        social_aggregator.collect_all_trends(keywords, request.geo),
+                        timeout=15.0  # 15秒超时
+                    )
+                    
+                    print(f"   ✅ Trends collected in {(datetime.utcnow() - start_time).total_seconds():.1f}s")
+                    return {
+                        'merged_trends': social_results.get('merged_trends', [])[:10],
+                        'by_source': social_results.get('by_source', {}),
+                        'freshness': social_results.get('freshness', {})
+                    }, 'completed'
                 
-            except asyncio.TimeoutError:
-                print("   ⚠️ Social trends timeout, skipping...")
-            except Exception as e:
-                print(f"   ⚠️ Social trends error: {e}, skipping...")
+                except asyncio.TimeoutError:
+                    print("   ⚠️ Social trends timeout, skipping...")
+                    return social_trends_data, 'timeout'
+                except Exception as e:
+                    print(f"   ⚠️ Social trends error: {e}, skipping...")
+                    return social_trends_data, 'failed'
+            
+            # Only successful collections are cached
+            social_trends_data, social_status = await cached(
+                'social', collect_social, depends_on=['channel'],
+                cacheable=lambda value: value[1] == 'completed'
+            )
+            report('social', social_status, {"social_trends": _format_social_trends(social_trends_data)})
         else:
             print("📊 Step 2/5: Skipping social trends (simple mode)...")
-        
+            report('social', 'skipped', {"social_trends": _format_social_trends(social_trends_data)})
+        return social_trends_data
+    
+    async def stage_recommendations(ctx: Dict):
+        """Step 3: recommendations (channel analysis + social trends)"""
+        channel_analysis = ctx['channel']
+        social_trends_data = ctx['social']
+        recommendations = []
         # Step 3: Generate recommendations (即使没有社交媒体趋势也生成)
         print("💡 Step 3/5: Generating recommendations...")
+        report('recommendations', 'running')
         
-        try:
+        async def build_recommendations():
+            recommendations = []
             # 即使没有社交媒体趋势，也基于频道分析生成推荐
             if social_trends_data['merged_trends']:
                 # Use predictive engine if available (MVP 3.1)
                 if USE_PREDICTIVE_ENGINE:
-                    recommendations = predictive_recommender.generate_recommendations(
+                    recommendations = await cpu_executor.run(
+                        generate_recommendations_task,
                         channel_analysis,
                         social_trends_data['merged_trends'],
                         request.max_recommendations,
-                        enable_predictions=request.enable_predictions and PROPHET_AVAILABLE,
+                        enable_predictions=request.enable_predictions and PREDICTIONS_AVAILABLE,
                         use_ml_prediction=request.use_ml_prediction,  # 新增：ML 预测
                         use_semantic_keywords=request.use_semantic_keywords  # 新增：语义分析
                     )
                 else:
-                    recommendations = recommendation_engine.generate_recommendations(
+                    recommendations = await cpu_executor.run(
+                        generate_basic_recommendations_task,
                         channel_analysis,
                         social_trends_data['merged_trends'],
                         request.max_recommendations
@@ -654,17 +844,19 @@ async def full_analysis(request: FullAnalysisRequest):
                 
                 # 使用 predictive_recommender 生成推荐（确保格式一致）
                 if USE_PREDICTIVE_ENGINE and mock_social_trends:
-                    recommendations = predictive_recommender.generate_recommendations(
+                    recommendations = await cpu_executor.run(
+                        generate_recommendations_task,
                         channel_analysis,
                         mock_social_trends,
                         request.max_recommendations,
-                        enable_predictions=request.enable_predictions and PROPHET_AVAILABLE,
+                        enable_predictions=request.enable_predictions and PREDICTIONS_AVAILABLE,
                         use_ml_prediction=request.use_ml_prediction,  # 新增：ML 预测
                         use_semantic_keywords=request.use_semantic_keywords  # 新增：语义分析
                     )
                 elif mock_social_trends:
                     # Fallback to intelligent_recommender
-                    recommendations = recommendation_engine.generate_recommendations(
+                    recommendations = await cpu_executor.run(
+                        generate_basic_recommendations_task,
                         channel_analysis,
                         mock_social_trends,
                         request.max_recommendations
@@ -730,27 +922,37 @@ async def full_analysis(request: FullAnalysisRequest):
                                 }
                             })
             
-            # Generate titles for all recommendations
-            for rec in recommendations[:min(5, len(recommendations))]:
-                try:
-                    titles = title_engine.generate_titles(
-                        rec,
-                        channel_analysis,
-                        count=3
-                    )
+            # Generate titles for all recommendations (one batched executor call)
+            title_targets = recommendations[:min(5, len(recommendations))]
+            if title_targets:
+                titles_list = await cpu_executor.run(
+                    generate_titles_task,
+                    title_targets,
+                    channel_analysis,
+                    3
+                )
+                for rec, titles in zip(title_targets, titles_list):
                     rec['suggested_titles'] = titles
-                except Exception as e:
-                    print(f"   ⚠️ Title generation failed for {rec.get('keyword', 'unknown')}: {e}")
-                    rec['suggested_titles'] = []
-            
+            return recommendations
+        
+        try:
+            recommendations = await cached(
+                'recommendations', build_recommendations, depends_on=['channel', 'social']
+            )
             print(f"   ✅ Generated {len(recommendations)} recommendations in {(datetime.utcnow() - start_time).total_seconds():.1f}s")
-            
+            report('recommendations', 'completed', {"recommendations": recommendations})
+        
         except Exception as e:
             print(f"   ⚠️ Recommendation error: {e}")
             import traceback
             traceback.print_exc()
             recommendations = []
-        
+            report('recommendations', 'failed', {"recommendations": recommendations})
+        return recommendations
+    
+    async def stage_backtest(ctx: Dict):
+        """Step 4: backtest (needs channel analysis only)"""
+        channel_analysis = ctx['channel']
         # Step 4: Backtest analysis (if enabled and sufficient videos)
         backtest_results = None
         backtest_status = {
@@ -766,6 +968,7 @@ async def full_analysis(request: FullAnalysisRequest):
         recommended_videos = 70
         if request.enable_backtest and len(request.videos) >= min_videos_for_backtest and backtest_analyzer:
             print("📈 Step 4/5: Running backtest analysis...")
+            report('backtest', 'running')
             step_start = datetime.utcnow()
             try:
                 # Use ML model if sufficient data (>=20 videos)
@@ -774,15 +977,19 @@ async def full_analysis(request: FullAnalysisRequest):
                 # Add timeout for backtest (90 seconds for 70+ videos, 60 seconds for 50+, 30 seconds otherwise)
                 timeout_seconds = 90.0 if len(request.videos) >= 70 else (60.0 if len(request.videos) >= 50 else 30.0)
                 # backtest_predictions 现在是同步函数，直接在线程中调用
-                backtest_results = await asyncio.wait_for(
-                    asyncio.to_thread(
-                        backtest_analyzer.backtest_predictions,
-                        request.videos,
-                        channel_analysis,
-                        None,  # historical_trends
-                        use_ml  # use_ml_model
+                backtest_results = await cached(
+                    'backtest',
+                    lambda: asyncio.wait_for(
+                        cpu_executor.run_thread(
+                            backtest_analyzer.backtest_predictions,
+                            request.videos,
+                            channel_analysis,
+                            None,  # historical_trends
+                            use_ml  # use_ml_model
+                        ),
+                        timeout=timeout_seconds
                     ),
-                    timeout=timeout_seconds
+                    depends_on=['channel']
                 )
                 ml_status = "enabled" if use_ml else "disabled (insufficient data)"
                 print(f"   ✅ Backtest complete: {backtest_results.get('total_videos_tested', 0)} videos tested (ML: {ml_status})")
@@ -813,11 +1020,23 @@ async def full_analysis(request: FullAnalysisRequest):
             print("   ℹ️ Backtest disabled in request")
             backtest_status["status"] = "disabled"
         
-        # Step 5: Prophet predictions (if enabled and available)
+        backtest_step_status = {
+            "success": "completed", "timeout": "timeout", "error": "failed"
+        }.get(backtest_status["status"], "skipped")
+        report('backtest', backtest_step_status, {"backtest": backtest_results, "backtest_status": backtest_status})
+        return backtest_results, backtest_status
+    
+    async def stage_predictions(ctx: Dict):
+        """Step 5: Prophet predictions (needs recommendation keywords only)"""
+        recommendations = ctx['recommendations']
         trend_predictions = None
         emerging_trends = None
-        if request.enable_predictions and PROPHET_AVAILABLE and trend_predictor:
+        # Step 5: Prophet predictions (if enabled and available)
+        predictions_step_status = 'skipped'
+        if request.enable_predictions and PREDICTIONS_AVAILABLE:
             print("🔮 Step 5/5: Generating Prophet predictions...")
+            report('predictions', 'running')
+            predictions_step_status = 'completed'
             step_start = datetime.utcnow()
             try:
                 # Extract keywords from recommendations (use all for better coverage)
@@ -827,10 +1046,14 @@ async def full_analysis(request: FullAnalysisRequest):
                 
                 if prediction_keywords:
                     # Use sync method in thread (Prophet is CPU-bound)
-                    predictions_result = await asyncio.to_thread(
-                        trend_predictor.predict_trends,
-                        prediction_keywords,
-                        7  # forecast_days
+                    predictions_result = await cached(
+                        'predictions',
+                        lambda: cpu_executor.run_thread(
+                            trend_predictor.predict_trends,
+                            prediction_keywords,
+                            7  # forecast_days
+                        ),
+                        depends_on=['recommendations']
                     )
                     
                     trend_predictions = predictions_result.get('predictions', [])
@@ -920,79 +1143,269 @@ async def full_analysis(request: FullAnalysisRequest):
                 print(f"   ⚠️ Prediction error: {e}")
                 import traceback
                 traceback.print_exc()
+                predictions_step_status = 'failed'
             finally:
                 prediction_time = (datetime.utcnow() - step_start).total_seconds()
                 print(f"   ⏱️  Predictions: {prediction_time:.2f}s")
         elif request.enable_predictions:
-            if not PROPHET_AVAILABLE:
+            if not PREDICTIONS_AVAILABLE:
                 print("   ℹ️ Prophet not available, skipping predictions")
             elif not trend_predictor:
                 print("   ℹ️ Trend predictor not initialized, skipping predictions")
-        
-        total_time = (datetime.utcnow() - start_time).total_seconds()
-        print(f"✅ Analysis complete in {total_time:.1f}s!")
-        
-        response = {
-            "success": True,
-            "version": "3.1.0" if PROPHET_AVAILABLE else "2.0.1-quickfix",
-            "channel_analysis": {
-                "topics": channel_analysis.get('topics', [])[:15],
-                "content_style": channel_analysis.get('content_style', {}),
-                "target_audience": channel_analysis.get('target_audience', {}),
-                "high_performers": channel_analysis.get('high_performers', {}),
-                "total_videos_analyzed": channel_analysis.get('total_videos_analyzed', 0)
-            },
-            "social_trends": {
-                "merged_trends": social_trends_data['merged_trends'],
-                "source_breakdown": {
-                    "twitter_count": len(social_trends_data.get('by_source', {}).get('twitter', [])),
-                    "reddit_count": len(social_trends_data.get('by_source', {}).get('reddit', [])),
-                    "google_trends_count": len(social_trends_data.get('by_source', {}).get('google_trends', []))
-                }
-            },
-            "recommendations": recommendations,
-            "summary": {
-                "total_recommendations": len(recommendations),
-                "urgent_count": sum(1 for r in recommendations if r.get('urgency') == 'urgent'),
-                "high_match_count": sum(1 for r in recommendations if r.get('match_score', 0) > 75),
-                "avg_match_score": sum(r.get('match_score', 0) for r in recommendations) / len(recommendations) if recommendations else 0,
-                "predicted_rising_count": sum(1 for r in recommendations if r.get('prediction', {}).get('trend_direction') == 'rising') if request.enable_predictions else 0
-            },
-            "performance": {
-                "analysis_time_seconds": total_time,
-                "simple_mode": request.use_simple_mode,
-                "backtest_enabled": request.enable_backtest,
-                "predictions_enabled": request.enable_predictions and PROPHET_AVAILABLE
-            },
-            "analyzed_at": datetime.utcnow().isoformat()
-        }
-        
-        # Add backtest results and status
-        if backtest_results:
-            response["backtest"] = backtest_results
-            response["backtest_status"] = backtest_status
-        else:
-            # Always include backtest status, even if no results
-            response["backtest"] = None
-            response["backtest_status"] = backtest_status
-        
-        # Add trend predictions and emerging trends (MVP 3.1)
-        # Always include these fields, even if empty, for frontend consistency
-        if request.enable_predictions and PROPHET_AVAILABLE:
-            response["trend_predictions"] = trend_predictions if trend_predictions else []
-            response["emerging_trends"] = emerging_trends if emerging_trends else []
-        else:
-            response["trend_predictions"] = []
-            response["emerging_trends"] = []
-        
-        return response
+        report('predictions', predictions_step_status, {
+            "trend_predictions": trend_predictions or [],
+            "emerging_trends": emerging_trends or []
+        })
+        return trend_predictions, emerging_trends
+    
+    # Dependency DAG: backtest only needs the channel analysis and predictions
+    # only need the recommendation keywords, so backtest runs concurrently with
+    # social → recommendations → predictions.
+    dag = PipelineDAG()
+    dag.add_stage('channel', stage_channel)
+    dag.add_stage('social', stage_social, depends_on=['channel'])
+    dag.add_stage('recommendations', stage_recommendations, depends_on=['channel', 'social'])
+    dag.add_stage('backtest', stage_backtest, depends_on=['channel'])
+    dag.add_stage('predictions', stage_predictions, depends_on=['recommendations'])
+    
+    ctx = await dag.run()
+    channel_analysis = ctx['channel']
+    social_trends_data = ctx['social']
+    recommendations = ctx['recommendations']
+    backtest_results, backtest_status = ctx['backtest']
+    trend_predictions, emerging_trends = ctx['predictions']
+    
+    total_time = (datetime.utcnow() - start_time).total_seconds()
+    print(f"✅ Analysis complete in {total_time:.1f}s!")
+    
+    response = {
+        "success": True,
+        "version": "3.1.0" if PROPHET_AVAILABLE else "2.0.1-quickfix",
+        "channel_analysis": _format_channel_analysis(channel_analysis),
+        "social_trends": _format_social_trends(social_trends_data),
+        "recommendations": recommendations,
+        "summary": {
+            "total_recommendations": len(recommendations),
+            "urgent_count": sum(1 for r in recommendations if r.get('urgency') == 'urgent'),
+            "high_match_count": sum(1 for r in recommendations if r.get('match_score', 0) > 75),
+            "avg_match_score": sum(r.get('match_score', 0) for r in recommendations) / len(recommendations) if recommendations else 0,
+            "predicted_rising_count": sum(1 for r in recommendations if r.get('prediction', {}).get('trend_direction') == 'rising') if request.enable_predictions else 0
+        },
+        "performance": {
+            "analysis_time_seconds": total_time,
+            "simple_mode": request.use_simple_mode,
+            "backtest_enabled": request.enable_backtest,
+            "predictions_enabled": request.enable_predictions and PREDICTIONS_AVAILABLE,
+            "stages": dag.stats(),
+            "critical_path": dag.critical_path(),
+            "cache": {
+                "bypassed": not use_cache,
+                "hits": cache_hits
+            }
+        },
+        "analyzed_at": datetime.utcnow().isoformat()
+    }
     
+    # Add backtest results and status
+    if backtest_results:
+        response["backtest"] = backtest_results
+        response["backtest_status"] = backtest_status
+    else:
+        # Always include backtest status, even if no results
+        response["backtest"] = None
+        response["backtest_status"] = backtest_status
+    
+    # Add trend predictions and emerging trends (MVP 3.1)
+    # Always include these fields, even if empty, for frontend consistency
+    if request.enable_predictions and PREDICTIONS_AVAILABLE:
+        response["trend_predictions"] = trend_predictions if trend_predictions else []
+        response["emerging_trends"] = emerging_trends if emerging_trends else []
+    else:
+        response["trend_predictions"] = []
+        response["emerging_trends"] = []
+    
+    return response
+
+
+def _cache_bypassed(x_analysis_cache: Optional[str], cache_control: Optional[str]) -> bool:
+    """`X-Analysis-Cache: bypass` or `Cache-Control: no-cache` skips cached stage results"""
+    if x_analysis_cache and x_analysis_cache.strip().lower() in ('bypass', 'no-cache', 'refresh'):
+        return True
+    return bool(cache_control and 'no-cache' in cache_control.lower())
+
+
+@app.post("/api/v2/full-analysis")
+async def full_analysis(
+    request: FullAnalysisRequest,
+    x_analysis_cache: Optional[str] = Header(None),
+    cache_control: Optional[str] = Header(None)
+):
+    """
+    🚀 Complete analysis pipeline (channel → social → recommendations → backtest → predictions)
+    
+    Stage results are cached by channel fingerprint; send `X-Analysis-Cache: bypass`
+    to force a fresh run.
+    """
+    try:
+        return await run_full_analysis(
+            request, use_cache=not _cache_bypassed(x_analysis_cache, cache_control)
+        )
     except Exception as e:
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Full analysis failed: {str(e)}")
 
 
+# ==================== SSE: Full Analysis Stream ====================
+
+# Pipeline step -> SSE event name (payloads use the full-analysis response keys)
+STREAM_EVENTS = {
+    'channel': 'channel_analysis',
+    'social': 'social_trends',
+    'recommendations': 'recommendations',
+    'backtest': 'backtest',
+    'predictions': 'trend_predictions',
+}
+
+
+def _json_default(obj):
+    """json.dumps fallback for numpy scalars / datetimes in analysis payloads"""
+    # numpy arrays and scalars (ndarray.item() only works for size-1 arrays)
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    if hasattr(obj, 'item'):
+        return obj.item()
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    return str(obj)
+
+
+def _sse_event(event: str, data: Dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=_json_default, ensure_ascii=False)}\n\n"
+
+
+@app.post("/api/v2/full-analysis/stream")
+async def full_analysis_stream(
+    request: FullAnalysisRequest,
+    x_analysis_cache: Optional[str] = Header(None),
+    cache_control: Optional[str] = Header(None)
+):
+    """
+    🚀 Full analysis as Server-Sent Events
+    
+    Emits channel_analysis → social_trends → recommendations → backtest →
+    trend_predictions as each step finishes, then `complete` with the full
+    response (or `error`). Event payloads use the same shapes as
+    /api/v2/full-analysis.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    use_cache = not _cache_bypassed(x_analysis_cache, cache_control)
+    
+    def on_step(step: str, status: str, payload: Optional[Dict]):
+        if status != 'running' and step in STREAM_EVENTS:
+            queue.put_nowait((STREAM_EVENTS[step], {"status": status, **(payload or {})}))
+    
+    async def run():
+        try:
+            result = await run_full_analysis(request, on_step=on_step, use_cache=use_cache)
+            queue.put_nowait(('complete', result))
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            queue.put_nowait(('error', {"success": False, "detail": f"Full analysis failed: {str(e)}"}))
+    
+    async def event_stream():
+        task = asyncio.create_task(run())
+        try:
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), timeout=15.0)
+                except asyncio.TimeoutError:
+                    # Keep proxies from closing an idle connection during long steps
+                    yield ": keep-alive\n\n"
+                    continue
+                yield _sse_event(event, data)
+                if event in ('complete', 'error'):
+                    break
+        finally:
+            # Client disconnected early: stop the pipeline
+            if not task.done():
+                task.cancel()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+# ==================== Async Jobs: Full Analysis ====================
+
+@app.post("/api/v3/jobs/full-analysis", status_code=202)
+async def submit_full_analysis_job(
+    request: FullAnalysisRequest,
+    x_analysis_cache: Optional[str] = Header(None),
+    cache_control: Optional[str] = Header(None)
+):
+    """
+    Submit a full analysis as a background job
+    
+    Returns immediately with a job id. Poll GET /api/v3/jobs/{job_id} for
+    per-step progress and partial results.
+    """
+    use_cache = not _cache_bypassed(x_analysis_cache, cache_control)
+    
+    async def runner(job):
+        return await run_full_analysis(request, on_step=job.on_step, use_cache=use_cache)
+    
+    try:
+        job = job_manager.submit('full-analysis', PIPELINE_STEPS, runner)
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    print(f"📥 Full analysis job queued: {job.id} ({len(request.videos)} videos)")
+    
+    return {
+        "success": True,
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/api/v3/jobs/{job.id}",
+        "result_url": f"/api/v3/jobs/{job.id}/result",
+        "submitted_at": datetime.utcnow().isoformat()
+    }
+
+
+@app.get("/api/v3/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    """
+    Job status with per-step status/timings and the partial results produced so far
+    """
+    job = job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job not found or expired: {job_id}")
+    
+    return {
+        "success": True,
+        **job.to_dict()
+    }
+
+
+@app.get("/api/v3/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """
+    Final result of a completed job (same shape as /api/v2/full-analysis)
+    """
+    job = job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job not found or expired: {job_id}")
+    if job.status == 'failed':
+        raise HTTPException(status_code=500, detail=f"Full analysis failed: {job.error}")
+    if job.status != 'completed':
+        raise HTTPException(status_code=409, detail=f"Job not finished yet (status: {job.status})")
+    
+    return job.result
+
+
 @app.post("/api/v2/quick-analysis")
 async def quick_analysis(videos: List[Dict], channel_data: Dict):
     """
@@ -1001,7 +1414,7 @@ async def quick_analysis(videos: List[Dict], channel_data: Dict):
     try:
         print("⚡ Starting quick analysis (channel only)...")
         
-        analysis = analyze_channel_deeply(videos, channel_data)
+        analysis = await cpu_executor.run(analyze_channel_task, videos, channel_data)
         
         return {
             "success": True,
@@ -1035,13 +1448,14 @@ async def health_check():
         "google_trends": True,
         "serpapi": social_aggregator.serpapi.available if hasattr(social_aggregator, 'serpapi') else False,
         "youtube": youtube_configured,  # YouTube API (used by frontend)
+        # Redis 已配置且当前未处于故障退避期（失败后会退回本地缓存）
         "cache": (hasattr(social_aggregator, 'signal_aggregator') and 
                  hasattr(social_aggregator.signal_aggregator, 'cache') and 
-                 social_aggregator.signal_aggregator.cache.redis_client is not None) or
+                 getattr(social_aggregator.signal_aggregator.cache, 'redis_available', False)) or
                  (hasattr(social_aggregator, 'cache') and 
-                 hasattr(social_aggregator.cache, 'redis_client') and 
-                 social_aggregator.cache.redis_client is not None),
+                 getattr(social_aggregator.cache, 'redis_available', False)),
         "prophet": PROPHET_AVAILABLE and trend_predictor is not None,
+        "forecaster": trend_predictor.forecaster if PREDICTIONS_AVAILABLE and hasattr(trend_predictor, 'forecaster') else False,
         "script_generator": SCRIPT_GENERATOR_AVAILABLE and script_generator is not None,
         "ml_predictor": ML_PREDICTOR_AVAILABLE if 'ML_PREDICTOR_AVAILABLE' in globals() else False,
         "semantic_analyzer": SEMANTIC_ANALYZER_AVAILABLE if 'SEMANTIC_ANALYZER_AVAILABLE' in globals() else False
@@ -1071,6 +1485,29 @@ async def health_check():
             "youtube_data_collection": youtube_configured,  # YouTube API capability
         },
         "services": social_status,
+        "circuit_breakers": social_aggregator.breaker_stats()
+        if hasattr(social_aggregator, 'breaker_stats') else None,
+        "cpu_executor": cpu_executor.stats(),
+        "analysis_jobs": job_manager.stats(),
+        "analysis_cache": analysis_cache.stats(),
+        "social_io": social_io_executor.stats(),
+        "rate_limits": await social_aggregator.rate_limit_stats()
+        if hasattr(social_aggregator, 'rate_limit_stats') else None,
+        "social_cache": social_aggregator.cache.stats()
+        if hasattr(getattr(social_aggregator, 'cache', None), 'stats') else None,
+        "trend_prewarmer": trend_prewarmer.stats() if trend_prewarmer is not None else None,
+        "forecast_cache": trend_predictor.forecast_cache.stats()
+        if hasattr(trend_predictor, 'forecast_cache') else None,
+        "nlp_title_memo": {
+            "main_process": title_memo.stats(),
+            "cpu_workers": cpu_executor.worker_memo_stats()
+        },
+        "single_flight": {
+            "analysis_stages": stage_flight.stats(),
+            "prophet_predictions": prediction_flight.stats(),
+            "social_fetch": social_aggregator.twitter.cache.inflight.stats()
+            if hasattr(getattr(social_aggregator, 'twitter', None), 'cache') else None
+        },
         "warnings": warnings
     }
 
@@ -1113,7 +1550,7 @@ async def predict_trends(request: TrendPredictionRequest):
     
     Returns 7-day forecast with confidence intervals, trend direction, and peak timing
     """
-    if not PROPHET_AVAILABLE or not trend_predictor:
+    if not PREDICTIONS_AVAILABLE:
         raise HTTPException(
             status_code=503,
             detail="Prophet prediction engine not available. Install: pip install prophet"
@@ -1122,17 +1559,30 @@ async def predict_trends(request: TrendPredictionRequest):
     try:
         print(f"🔮 Predicting trends for {len(request.keywords)} keywords...")
         
-        # Use sync method in thread (Prophet is CPU-bound)
-        result = await asyncio.to_thread(
-            trend_predictor.predict_trends,
-            request.keywords,
-            request.forecast_days
+        # Concurrent requests share in-flight fits per (keyword, forecast_days);
+        # the keywords nobody is fitting yet go through one predict_many call
+        # (one history query, batched NumPy solve or Prophet fits on the
+        # process pool with the forecast cache)
+        keywords = list(dict.fromkeys(request.keywords))
+        
+        async def fit_missing(keys):
+            fitted = await cpu_executor.run_thread(
+                trend_predictor.predict_many, [keyword for keyword, _ in keys], request.forecast_days
+            )
+            return {(keyword, days): fitted.get(keyword) for keyword, days in keys}
+        
+        results = await prediction_flight.do_many(
+            [(keyword, request.forecast_days) for keyword in keywords], fit_missing
+        )
+        predictions = trend_predictor.rank_predictions(
+            [r for r in results if r], len(keywords)
         )
+        emerging_trends = trend_predictor.detect_emerging_trends(predictions)
         
         return {
             "success": True,
-            "predictions": result.get('predictions', []),
-            "emerging_trends": result.get('emerging_trends', []),
+            "predictions": predictions,
+            "emerging_trends": emerging_trends,
             "forecast_days": request.forecast_days,
             "generated_at": datetime.utcnow().isoformat()
         }
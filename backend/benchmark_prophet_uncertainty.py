@@ -0,0 +1,99 @@
+"""
+Prophet Uncertainty Benchmark - 对比不同预测区间估计方式的耗时与质量
+每种设置在同一组（按关键词固定随机种子的）模拟历史上运行 predict_trend，
+以 full（1000 次模拟）为基准比较区间边界、区间宽度、置信度和样本内覆盖率
+
+用法:
+    python benchmark_prophet_uncertainty.py
+    python benchmark_prophet_uncertainty.py --keywords 20 --settings full fast:300 fast:100 analytic
+"""
+
+import argparse
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from services.forecast_cache import ForecastCache
+from services.trend_predictor import PROPHET_AVAILABLE, TrendPredictionEngine
+
+
+def parse_setting(setting: str) -> Tuple[str, Optional[int]]:
+    """'fast:200' -> ('fast', 200)，'full' -> ('full', None)"""
+    mode, _, samples = setting.partition(':')
+    return mode, int(samples) if samples else None
+
+
+def run_setting(setting: str, keywords: List[str], forecast_days: int) -> Tuple[float, Dict[str, Dict]]:
+    """返回 (每个关键词的平均耗时, {keyword: prediction})"""
+    mode, samples = parse_setting(setting)
+    engine = TrendPredictionEngine(
+        max_workers=1, forecaster='prophet', uncertainty=mode, uncertainty_samples=samples
+    )
+    # 关闭预测缓存，每次都真正拟合
+    engine.forecast_cache = ForecastCache(max_entries=0)
+
+    predictions = {}
+    start = time.perf_counter()
+    for keyword in keywords:
+        prediction = engine.predict_trend(keyword, forecast_days)
+        if prediction:
+            predictions[keyword] = prediction
+    return (time.perf_counter() - start) / len(keywords), predictions
+
+
+def compare(predictions: Dict[str, Dict], baseline: Dict[str, Dict]) -> Dict:
+    """与基准设置对比：边界误差（占基准区间宽度的比例）、宽度比、置信度差、覆盖率"""
+    bound_errors, width_ratios, confidence_deltas, coverages = [], [], [], []
+    for keyword, prediction in predictions.items():
+        coverages.append(prediction['model_accuracy']['coverage'])
+        reference = baseline.get(keyword)
+        if reference is None:
+            continue
+        lower, upper, width = (
+            np.array([day[field] for day in prediction['predictions']])
+            for field in ('lower_bound', 'upper_bound', 'confidence_range')
+        )
+        ref_lower, ref_upper, ref_width = (
+            np.array([day[field] for day in reference['predictions']])
+            for field in ('lower_bound', 'upper_bound', 'confidence_range')
+        )
+        scale = np.maximum(ref_width, 1e-9)
+        bound_errors.append(np.mean((np.abs(lower - ref_lower) + np.abs(upper - ref_upper)) / 2 / scale))
+        width_ratios.append(width.sum() / max(ref_width.sum(), 1e-9))
+        confidence_deltas.append(abs(prediction['confidence'] - reference['confidence']))
+    return {
+        'bound_error': float(np.mean(bound_errors)) if bound_errors else float('nan'),
+        'width_ratio': float(np.mean(width_ratios)) if width_ratios else float('nan'),
+        'confidence_delta': float(np.mean(confidence_deltas)) if confidence_deltas else float('nan'),
+        'coverage': float(np.mean(coverages)) if coverages else float('nan')
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prophet uncertainty estimation benchmark")
+    parser.add_argument('--keywords', type=int, default=10)
+    parser.add_argument('--days', type=int, default=7, help="forecast horizon")
+    parser.add_argument('--settings', nargs='+', default=['full', 'fast:500', 'fast:200', 'fast:100', 'analytic'],
+                        help="uncertainty modes, 'fast:<samples>' sets the draw count (first = baseline)")
+    args = parser.parse_args()
+
+    if not PROPHET_AVAILABLE:
+        print("❌ Prophet not installed. Install: pip install prophet")
+        return
+
+    keywords = [f"benchmark topic {i}" for i in range(args.keywords)]
+    results = {setting: run_setting(setting, keywords, args.days) for setting in args.settings}
+    baseline = results[args.settings[0]]
+
+    print(f"\n{'setting':>10} {'ms/keyword':>11} {'speedup':>8} {'bound err':>10} "
+          f"{'width':>7} {'Δconf':>7} {'coverage':>9}")
+    for setting, (seconds, predictions) in results.items():
+        quality = compare(predictions, baseline[1])
+        print(f"{setting:>10} {seconds * 1000:>11.1f} {baseline[0] / seconds:>7.1f}x "
+              f"{quality['bound_error']:>9.1%} {quality['width_ratio']:>6.2f}x "
+              f"{quality['confidence_delta']:>7.2f} {quality['coverage']:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
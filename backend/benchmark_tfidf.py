@@ -0,0 +1,99 @@
+"""
+TF-IDF Benchmark - 对比原 Counter 实现与 CSR 稀疏实现
+验证两者分数、排序完全一致，并测量 100 ~ 5000 个标题的耗时
+
+用法:
+    python benchmark_tfidf.py
+    python benchmark_tfidf.py --sizes 1000 5000 --repeat 5
+"""
+
+import argparse
+import random
+import time
+from collections import Counter
+from typing import Dict, List
+
+import numpy as np
+
+from services.sparse_tfidf import rank_terms
+
+
+def make_corpus(num_titles: int, vocab_size: int = 3000, seed: int = 42) -> List[List[str]]:
+    """生成模拟的名词 token 列表（Zipf 分布，接近真实标题的词频）"""
+    rng = random.Random(seed)
+    vocab = [f"term{i}" for i in range(vocab_size)]
+    weights = [1.0 / (rank + 1) for rank in range(vocab_size)]
+    return [
+        rng.choices(vocab, weights=weights, k=rng.randint(0, 8))
+        for _ in range(num_titles)
+    ]
+
+
+def make_bigrams(docs: List[List[str]]) -> Counter:
+    counts = Counter(f"{a} {b}" for doc in docs for a, b in zip(doc, doc[1:]))
+    return Counter({k: v for k, v in counts.items() if v >= 2})
+
+
+def legacy_tfidf(docs: List[List[str]], bigrams: Counter) -> List[Dict]:
+    """原 _extract_tfidf_topics 的 Counter 实现（作为对照）"""
+    processed_titles = [' '.join(doc) for doc in docs]
+    all_words = []
+    for title in processed_titles:
+        all_words.extend(title.split())
+    word_freq = Counter(all_words)
+
+    doc_freq = Counter()
+    for title in processed_titles:
+        for word in set(title.split()):
+            doc_freq[word] += 1
+
+    num_docs = len(docs)
+    scores = {}
+    for word, tf in word_freq.items():
+        df = doc_freq[word]
+        idf = np.log(num_docs / df) if df > 0 else 0
+        scores[word] = (tf / len(all_words)) * idf if all_words else 0
+    for bigram, count in bigrams.items():
+        scores[bigram] = count * 1.5
+
+    max_score = max(scores.values())
+    min_score = min(scores.values())
+    score_range = max_score - min_score if max_score > min_score else 1.0
+    normalized = {word: (score - min_score) / score_range for word, score in scores.items()}
+
+    return [
+        {'topic': word, 'score': float(normalized[word]), 'frequency': word_freq.get(word, bigrams.get(word, 1))}
+        for word, _ in sorted(scores.items(), key=lambda x: x[1], reverse=True)
+    ][:20]
+
+
+def best_of(func, repeat: int, *args) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TF-IDF benchmark")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 500, 1000, 2000, 5000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'titles':>8} {'legacy (ms)':>12} {'sparse (ms)':>12} {'speedup':>8}  identical")
+    for size in args.sizes:
+        docs = make_corpus(size)
+        bigrams = make_bigrams(docs)
+
+        identical = legacy_tfidf(docs, bigrams) == rank_terms(docs, bigrams)
+        legacy = best_of(legacy_tfidf, args.repeat, docs, bigrams)
+        sparse = best_of(rank_terms, args.repeat, docs, bigrams)
+
+        print(f"{size:>8} {legacy * 1000:>12.2f} {sparse * 1000:>12.2f} {legacy / sparse:>7.1f}x  "
+              f"{'✅' if identical else '❌'}")
+
+
+if __name__ == '__main__':
+    main()
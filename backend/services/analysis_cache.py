@@ -0,0 +1,136 @@
+"""
+Analysis Result Cache - 完整分析的内容寻址缓存
+同一频道、同一批视频的重复分析直接复用各阶段结果，
+避免重复运行 NLTK、ML 训练和 Prophet
+
+- 缓存键 = 视频集合指纹（videoId + 播放量分桶 + 发布时间）+ channel_data + 请求参数
+- 每个阶段（channel / social / recommendations / backtest / predictions）有独立 TTL
+"""
+
+import copy
+import hashlib
+import json
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+
+# 各阶段默认 TTL（秒），可通过环境变量 ANALYSIS_CACHE_TTL_<STAGE> 覆盖
+DEFAULT_STAGE_TTLS = {
+    'channel': 86400,         # 只依赖视频集合，结果确定
+    'social': 900,            # 社交趋势变化快
+    'recommendations': 900,   # 依赖社交趋势
+    'backtest': 21600,        # 只依赖视频集合，但计算昂贵
+    'predictions': 3600,
+}
+
+
+def view_count_bucket(view_count) -> int:
+    """
+    播放量分桶（保留 2 位有效数字），避免播放量小幅增长导致缓存失效
+    例如 12345 -> 12000, 987 -> 990
+    """
+    try:
+        views = int(view_count or 0)
+    except (TypeError, ValueError):
+        return 0
+    if views < 100:
+        return views
+    magnitude = 10 ** (int(math.log10(views)) - 1)
+    return int(round(views / magnitude) * magnitude)
+
+
+def fingerprint_videos(videos: List[Dict]) -> str:
+    """视频集合指纹（与顺序无关）"""
+    entries = sorted(
+        (
+            str(v.get('videoId') or v.get('id') or v.get('title', '')),
+            view_count_bucket(v.get('viewCount', 0)),
+            str(v.get('publishedAt', ''))
+        )
+        for v in videos
+    )
+    return hashlib.sha256(json.dumps(entries).encode()).hexdigest()
+
+
+def make_cache_key(*parts) -> str:
+    """由任意可 JSON 序列化的部分生成稳定的缓存键"""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class AnalysisResultCache:
+    """
+    分阶段结果缓存（进程内 LRU，每个阶段独立 TTL）
+
+    读写均做深拷贝：流水线会原地修改推荐结果（如追加预测字段），
+    不能让缓存中的对象被后续请求污染
+    """
+
+    def __init__(self, stage_ttls: Optional[Dict[str, int]] = None, max_entries: int = 256):
+        self.stage_ttls = dict(DEFAULT_STAGE_TTLS)
+        if stage_ttls:
+            self.stage_ttls.update(stage_ttls)
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _entry_key(self, stage: str, key: str) -> str:
+        return f"{stage}:{key}"
+
+    def get(self, stage: str, key: str) -> Optional[Any]:
+        entry_key = self._entry_key(stage, key)
+        entry = self._entries.get(entry_key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if time.time() >= entry['expires_at']:
+            del self._entries[entry_key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(entry_key)
+        self.hits += 1
+        return copy.deepcopy(entry['value'])
+
+    def set(self, stage: str, key: str, value: Any):
+        ttl = self.stage_ttls.get(stage, 0)
+        if ttl <= 0:
+            return
+        entry_key = self._entry_key(stage, key)
+        self._entries[entry_key] = {
+            'value': copy.deepcopy(value),
+            'expires_at': time.time() + ttl
+        }
+        self._entries.move_to_end(entry_key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 3) if total else 0.0,
+            'stage_ttls': self.stage_ttls
+        }
+
+
+def _ttls_from_env() -> Dict[str, int]:
+    ttls = {}
+    for stage in DEFAULT_STAGE_TTLS:
+        value = os.getenv(f'ANALYSIS_CACHE_TTL_{stage.upper()}')
+        if value is not None:
+            ttls[stage] = int(value)
+    return ttls
+
+
+# 全局实例
+analysis_cache = AnalysisResultCache(
+    stage_ttls=_ttls_from_env(),
+    max_entries=int(os.getenv('ANALYSIS_CACHE_MAX_ENTRIES', '256'))
+)
@@ -0,0 +1,245 @@
+"""
+Analysis Job Manager - 异步分析任务
+完整分析（回测 + Prophet）可能耗时 60-120 秒，接近 gunicorn 的 --timeout 120，
+因此提供提交任务 → 轮询进度 → 获取结果的异步模式
+
+- AnalysisJob: 单个任务，记录每个步骤的状态、耗时和阶段性结果
+- JobStore: LRU + TTL 的任务存储
+- JobManager: 有界的进程内 worker 池
+"""
+
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional
+
+
+class JobQueueFullError(Exception):
+    """任务队列已满"""
+    pass
+
+
+def _iso(ts: Optional[float]) -> Optional[str]:
+    return datetime.utcfromtimestamp(ts).isoformat() if ts else None
+
+
+class AnalysisJob:
+    """
+    单个分析任务
+
+    status: queued → running → completed | failed
+    每个步骤: pending → running → completed | skipped | timeout | failed
+    """
+
+    def __init__(self, kind: str, steps: List[str]):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = 'queued'
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.steps: Dict[str, Dict] = OrderedDict(
+            (name, {'status': 'pending', 'started_at': None, 'finished_at': None, 'duration_seconds': None})
+            for name in steps
+        )
+        self.partial_results: Dict = {}
+        self.result: Optional[Dict] = None
+        self.error: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ('completed', 'failed')
+
+    def on_step(self, step: str, status: str, payload: Optional[Dict] = None):
+        """流水线进度回调（与 run_full_analysis 的 on_step 签名一致）"""
+        now = time.time()
+        info = self.steps.setdefault(
+            step, {'status': 'pending', 'started_at': None, 'finished_at': None, 'duration_seconds': None}
+        )
+        info['status'] = status
+        if status == 'running':
+            info['started_at'] = now
+        else:
+            info['finished_at'] = now
+            if info['started_at']:
+                info['duration_seconds'] = round(now - info['started_at'], 3)
+        if payload:
+            self.partial_results.update(payload)
+
+    def mark_running(self):
+        self.status = 'running'
+        self.started_at = time.time()
+
+    def mark_completed(self, result: Dict):
+        self.status = 'completed'
+        self.result = result
+        self.finished_at = time.time()
+
+    def mark_failed(self, error: str):
+        self.status = 'failed'
+        self.error = error
+        self.finished_at = time.time()
+
+    def to_dict(self, include_partial: bool = True) -> Dict:
+        """任务状态（用于 GET /api/v3/jobs/{id}）"""
+        end = self.finished_at or time.time()
+        data = {
+            'job_id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'created_at': _iso(self.created_at),
+            'started_at': _iso(self.started_at),
+            'finished_at': _iso(self.finished_at),
+            'elapsed_seconds': round(end - self.started_at, 3) if self.started_at else 0.0,
+            'steps': {
+                name: {
+                    'status': info['status'],
+                    'started_at': _iso(info['started_at']),
+                    'finished_at': _iso(info['finished_at']),
+                    'duration_seconds': info['duration_seconds']
+                }
+                for name, info in self.steps.items()
+            },
+            'error': self.error
+        }
+        if include_partial:
+            data['partial_results'] = self.partial_results
+        return data
+
+
+class JobStore:
+    """
+    LRU + TTL 任务存储
+
+    - 已完成任务在 ttl 秒后过期
+    - 超过 max_jobs 时按 LRU 淘汰已完成任务（运行中的任务不会被淘汰）
+    """
+
+    def __init__(self, max_jobs: int = 200, ttl: int = 3600):
+        self.max_jobs = max_jobs
+        self.ttl = ttl
+        self._jobs: "OrderedDict[str, AnalysisJob]" = OrderedDict()
+
+    def put(self, job: AnalysisJob):
+        self._jobs[job.id] = job
+        self._jobs.move_to_end(job.id)
+        self._evict()
+
+    def get(self, job_id: str) -> Optional[AnalysisJob]:
+        self._expire()
+        job = self._jobs.get(job_id)
+        if job is not None:
+            self._jobs.move_to_end(job_id)
+        return job
+
+    def _expire(self):
+        now = time.time()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished and now - job.finished_at > self.ttl
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def _evict(self):
+        self._expire()
+        if len(self._jobs) <= self.max_jobs:
+            return
+        for job_id in [jid for jid, job in self._jobs.items() if job.finished]:
+            if len(self._jobs) <= self.max_jobs:
+                break
+            del self._jobs[job_id]
+
+    def stats(self) -> Dict:
+        statuses = [job.status for job in self._jobs.values()]
+        return {
+            'stored': len(statuses),
+            'queued': statuses.count('queued'),
+            'running': statuses.count('running'),
+            'max_jobs': self.max_jobs,
+            'ttl_seconds': self.ttl
+        }
+
+
+class JobManager:
+    """
+    有界的进程内任务池
+
+    max_workers 个 worker 协程从队列中取任务执行；队列满时 submit 抛出 JobQueueFullError
+    """
+
+    def __init__(self, store: Optional[JobStore] = None, max_workers: int = 2, max_queue: int = 20):
+        self.store = store or JobStore()
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    def start(self):
+        """启动 worker（在 lifespan 启动阶段调用）"""
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._workers = [
+            asyncio.create_task(self._worker(i)) for i in range(self.max_workers)
+        ]
+        print(f"✅ Job manager started ({self.max_workers} workers, queue {self.max_queue})")
+
+    async def shutdown(self):
+        """停止 worker（在 lifespan 结束阶段调用）"""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        print("🛑 Job manager stopped")
+
+    def submit(self, kind: str, steps: List[str],
+               runner: Callable[[AnalysisJob], Awaitable[Dict]]) -> AnalysisJob:
+        """
+        提交任务
+
+        Args:
+            kind: 任务类型（如 'full-analysis'）
+            steps: 步骤名称列表（用于进度展示）
+            runner: async runner(job) -> result，通过 job.on_step 报告进度
+        """
+        if self._queue is None:
+            raise RuntimeError("Job manager not started")
+        job = AnalysisJob(kind, steps)
+        try:
+            self._queue.put_nowait((job, runner))
+        except asyncio.QueueFull:
+            raise JobQueueFullError(f"Job queue is full ({self.max_queue} pending jobs)")
+        self.store.put(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[AnalysisJob]:
+        return self.store.get(job_id)
+
+    async def _worker(self, index: int):
+        while True:
+            job, runner = await self._queue.get()
+            job.mark_running()
+            print(f"🧵 Job worker {index}: running {job.kind} job {job.id}")
+            try:
+                result = await runner(job)
+                job.mark_completed(result)
+            except asyncio.CancelledError:
+                job.mark_failed("cancelled")
+                raise
+            except Exception as e:
+                import traceback
+                traceback.print_exc()
+                job.mark_failed(str(e))
+            finally:
+                self._queue.task_done()
+
+    def stats(self) -> Dict:
+        return {
+            'workers': self.max_workers,
+            'queue_depth': self._queue.qsize() if self._queue else 0,
+            'max_queue': self.max_queue,
+            **self.store.stats()
+        }
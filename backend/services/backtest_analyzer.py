@@ -10,6 +10,7 @@ from collections import defaultdict
 
 # Import content analyzer for video content analysis
 from services.enhanced_youtube_analyzer import content_analyzer
+from services.keyword_matcher import content_theme_matcher
 
 # Import ML predictor for enhanced predictions
 try:
@@ -905,23 +906,13 @@ class BacktestAnalyzer:
         """
         提取内容主题
         """
-        themes = []
         combined = f"{title} {description}".lower()
         
-        # 主题关键词映射
-        theme_keywords = {
-            '教程/教育': ['how to', 'tutorial', 'guide', 'learn', 'teach', 'explain'],
-            '评测/对比': ['review', 'vs', 'compare', 'test', 'unboxing'],
-            '娱乐/趣味': ['funny', 'prank', 'challenge', 'compilation', 'fails'],
-            '新闻/资讯': ['news', 'update', 'breaking', 'latest', 'announcement'],
-            '科技/产品': ['tech', 'gadget', 'phone', 'laptop', 'device'],
-            '生活/日常': ['vlog', 'daily', 'life', 'routine', 'day in'],
-            '游戏': ['game', 'gaming', 'gameplay', 'walkthrough', 'playthrough']
-        }
-        
-        for theme, keywords in theme_keywords.items():
-            if any(kw in combined for kw in keywords):
-                themes.append(theme)
+        # 主题关键词映射见 keyword_categories.json（content_themes），一次扫描匹配所有主题
+        themes = [
+            theme for theme, matched in content_theme_matcher.distinct(combined).items()
+            if matched
+        ]
         
         return themes[:3]  # 返回最多3个主题
     
@@ -0,0 +1,167 @@
+"""
+Circuit Breaker - 社交平台熔断与自适应超时
+平台宕机或被限流时，collect_all_trends 原本每次请求都要等满 15 秒超时；
+熔断打开后直接跳过该平台的抓取（只返回缓存），超时时间按观测到的 p95 延迟调整
+
+状态: closed（正常）→ open（熔断，不发请求）→ half_open（冷却结束，放行一次试探）
+"""
+
+import os
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+import numpy as np
+
+
+class CircuitBreaker:
+    """
+    单个平台的熔断器
+
+    - 最近 window 秒内的调用结果中，失败数 >= min_failures 且失败率 >= failure_rate 时打开
+    - 打开 cooldown 秒后进入 half_open，放行一次试探：成功则关闭，
+      失败则重新打开且冷却时间加倍（最多 max_cooldown）
+    - timeout(): 最近采集耗时的 p95 × timeout_multiplier，限制在 [min_timeout, max_timeout]；
+      样本不足时使用 max_timeout（即原来固定的 15 秒）
+    """
+
+    def __init__(self, name: str, window: float = 60.0, min_failures: int = 5,
+                 failure_rate: float = 0.5, cooldown: float = 30.0, max_cooldown: float = 300.0,
+                 min_timeout: float = 3.0, max_timeout: float = 15.0,
+                 timeout_multiplier: float = 1.5, latency_samples: int = 50, min_samples: int = 5):
+        self.name = name
+        self.window = window
+        self.min_failures = min_failures
+        self.failure_rate = failure_rate
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.timeout_multiplier = timeout_multiplier
+        self.min_samples = min_samples
+
+        self.state = 'closed'
+        self.cooldown = cooldown
+        self._opened_at = 0.0
+        self._probe_started: Optional[float] = None
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        self._latencies: Deque[float] = deque(maxlen=latency_samples)
+
+        # 统计
+        self.calls = 0
+        self.failures = 0
+        self.short_circuited = 0
+        self.times_opened = 0
+
+    def _prune(self, now: float):
+        while self._outcomes and now - self._outcomes[0][0] > self.window:
+            self._outcomes.popleft()
+
+    def _open(self, now: float):
+        self.state = 'open'
+        self._opened_at = now
+        self._probe_started = None
+        self.times_opened += 1
+        print(f"⚡ {self.name} circuit opened for {self.cooldown:.0f}s")
+
+    def allow_request(self) -> bool:
+        """是否允许向平台发请求（open 时返回 False；half_open 时只放行一个试探）"""
+        now = time.monotonic()
+        if self.state == 'open':
+            if now - self._opened_at < self.cooldown:
+                self.short_circuited += 1
+                return False
+            self.state = 'half_open'
+            self._probe_started = None
+        if self.state == 'half_open':
+            # 试探没有发出请求（例如全部命中缓存）时，冷却时长后允许新的试探
+            if self._probe_started is not None and now - self._probe_started < self.cooldown:
+                self.short_circuited += 1
+                return False
+            self._probe_started = now
+        return True
+
+    def record_success(self):
+        now = time.monotonic()
+        self.calls += 1
+        self._outcomes.append((now, True))
+        self._prune(now)
+        if self.state != 'closed':
+            print(f"✅ {self.name} circuit closed")
+            # 恢复后重新统计，避免打开前的失败让熔断器立即再次打开
+            self._outcomes.clear()
+            self.state = 'closed'
+            self.cooldown = self.base_cooldown
+            self._probe_started = None
+
+    def record_failure(self):
+        now = time.monotonic()
+        self.calls += 1
+        self.failures += 1
+        self._outcomes.append((now, False))
+        self._prune(now)
+        if self.state == 'half_open':
+            self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+            self._open(now)
+        elif self.state == 'closed':
+            failed = sum(1 for _, ok in self._outcomes if not ok)
+            if failed >= self.min_failures and failed / len(self._outcomes) >= self.failure_rate:
+                self._open(now)
+
+    def record_latency(self, seconds: float):
+        """记录一次平台采集（含抓取）的总耗时，用于计算自适应超时"""
+        self._latencies.append(seconds)
+
+    async def call(self, func: Callable[..., Awaitable], *args, **kwargs):
+        """执行一次平台 API 调用并记录结果（异常照常抛出）"""
+        try:
+            result = await func(*args, **kwargs)
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+    def p95_latency(self) -> Optional[float]:
+        if not self._latencies:
+            return None
+        return float(np.percentile(np.fromiter(self._latencies, dtype=float), 95))
+
+    def timeout(self) -> float:
+        """本次采集的超时时间（秒）"""
+        if len(self._latencies) < self.min_samples:
+            return self.max_timeout
+        adaptive = self.p95_latency() * self.timeout_multiplier
+        return round(min(self.max_timeout, max(self.min_timeout, adaptive)), 2)
+
+    def stats(self) -> Dict:
+        now = time.monotonic()
+        self._prune(now)
+        recent_failures = sum(1 for _, ok in self._outcomes if not ok)
+        p95 = self.p95_latency()
+        return {
+            'state': self.state,
+            'recent_calls': len(self._outcomes),
+            'recent_failures': recent_failures,
+            'retry_in_seconds': round(max(0.0, self.cooldown - (now - self._opened_at)), 1)
+            if self.state == 'open' else 0.0,
+            'timeout_seconds': self.timeout(),
+            'p95_latency_seconds': round(p95, 3) if p95 is not None else None,
+            'calls': self.calls,
+            'failures': self.failures,
+            'short_circuited': self.short_circuited,
+            'times_opened': self.times_opened
+        }
+
+
+def create_breaker(name: str) -> CircuitBreaker:
+    """按环境变量创建熔断器（所有平台共用同一组配置）"""
+    return CircuitBreaker(
+        name,
+        window=float(os.getenv('SOCIAL_BREAKER_WINDOW', '60')),
+        min_failures=int(os.getenv('SOCIAL_BREAKER_MIN_FAILURES', '5')),
+        failure_rate=float(os.getenv('SOCIAL_BREAKER_FAILURE_RATE', '0.5')),
+        cooldown=float(os.getenv('SOCIAL_BREAKER_COOLDOWN', '30')),
+        min_timeout=float(os.getenv('SOCIAL_TIMEOUT_MIN', '3')),
+        max_timeout=float(os.getenv('SOCIAL_TIMEOUT_MAX', '15'))
+    )
@@ -0,0 +1,247 @@
+"""
+CPU Executor - 将 CPU 密集型服务调用移出事件循环
+NLTK 分词/词性标注、推荐打分、标题生成都在有界进程池中执行，
+避免阻塞唯一的 uvicorn worker（包括 /health）
+"""
+
+import asyncio
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from services.nlp_memo import COUNTER_FIELDS, merge_counter_stats, title_memo
+
+
+def _default_workers() -> int:
+    # 512MB 机器上每个子进程都会加载 NLTK，默认最多 2 个
+    return max(1, min(2, os.cpu_count() or 1))
+
+
+# 当前流水线阶段的 CPU 时间累加器（由 PipelineDAG 按阶段设置）
+_stage_cpu: ContextVar[Optional[List[float]]] = ContextVar('stage_cpu', default=None)
+
+
+@contextmanager
+def cpu_time_scope():
+    """
+    统计作用域内（包括其中创建的 asyncio 任务）通过执行器完成的任务 CPU 时间
+
+    Yields:
+        单元素列表 [cpu_seconds]，作用域结束后读取
+    """
+    acc = [0.0]
+    token = _stage_cpu.set(acc)
+    try:
+        yield acc
+    finally:
+        _stage_cpu.reset(token)
+
+
+def _record_cpu(seconds: float):
+    acc = _stage_cpu.get()
+    if acc is not None:
+        acc[0] += seconds
+
+
+def _warmup() -> int:
+    """预热子进程（在 fork 时就加载好模块）"""
+    return os.getpid()
+
+
+# ==================== Worker Tasks ====================
+# 进程池只能执行可 pickle 的模块级函数，这里对服务实例做一层包装，
+# 子进程使用各服务模块自己的全局实例
+
+def analyze_channel_task(videos: List[Dict], channel_data: Dict) -> Dict:
+    """频道深度分析（NLTK）"""
+    from services.enhanced_youtube_analyzer import analyze_channel_deeply
+    return analyze_channel_deeply(videos, channel_data)
+
+
+def generate_recommendations_task(*args, **kwargs) -> List[Dict]:
+    """预测推荐引擎（MVP 3.1）"""
+    from services.predictive_recommender import predictive_recommendation_engine
+    return predictive_recommendation_engine.generate_recommendations(*args, **kwargs)
+
+
+def generate_basic_recommendations_task(*args, **kwargs) -> List[Dict]:
+    """基础推荐引擎（MVP 2.0）"""
+    from services.intelligent_recommender import recommendation_engine
+    return recommendation_engine.generate_recommendations(*args, **kwargs)
+
+
+def generate_titles_task(recommendations: List[Dict], channel_analysis: Dict,
+                         count: int = 3) -> List[List[Dict]]:
+    """
+    为一批推荐生成标题（一次提交，减少进程间传输）
+    单个推荐失败时返回空列表，不影响其他推荐
+    """
+    from services.intelligent_recommender import title_engine
+    results = []
+    for rec in recommendations:
+        try:
+            results.append(title_engine.generate_titles(rec, channel_analysis, count=count))
+        except Exception as e:
+            print(f"   ⚠️ Title generation failed for {rec.get('keyword', 'unknown')}: {e}")
+            results.append([])
+    return results
+
+
+class CPUExecutor:
+    """
+    有界 CPU 执行器
+
+    - 进程池大小固定（max_workers），由应用 lifespan 启动/关闭
+    - 同时进入进程池的任务数受限（max_workers + max_queue），
+      超出部分在事件循环中异步等待，不阻塞其他请求
+    - stats() 报告排队深度，用于调整池大小
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_queue: int = 16,
+                 mode: str = 'process'):
+        """
+        Args:
+            max_workers: 进程数（默认 min(2, CPU 核数)）
+            max_queue: 进程池内允许排队的任务数
+            mode: 'process'（默认）或 'thread'（调试/受限环境）
+        """
+        self.max_workers = max_workers or _default_workers()
+        self.max_queue = max_queue
+        self.mode = mode
+        self._executor = None
+        self._admission: Optional[asyncio.Semaphore] = None
+
+        # 统计
+        self._waiting = 0      # 等待进入进程池
+        self._submitted = 0    # 已进入进程池（排队 + 执行中）
+        self._completed = 0
+        self._failed = 0
+        self._total_task_time = 0.0
+        # 子进程中标题 memo 的命中计数（每个任务返回增量后在主进程累加）
+        self._worker_memo = {field: 0 for field in COUNTER_FIELDS}
+
+    @property
+    def started(self) -> bool:
+        return self._executor is not None
+
+    def start(self):
+        """创建进程池（在 lifespan 启动阶段调用）"""
+        if self._executor is not None:
+            return
+        if self.mode == 'thread':
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix='cpu'
+            )
+        else:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            # 预热所有子进程，避免首个请求承担 fork 开销
+            for _ in range(self.max_workers):
+                self._executor.submit(_warmup)
+        if self._admission is None:
+            self._admission = asyncio.Semaphore(self.max_workers + self.max_queue)
+        print(f"✅ CPU executor started ({self.mode}, {self.max_workers} workers)")
+
+    def shutdown(self):
+        """关闭进程池（在 lifespan 结束阶段调用）"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            print("🛑 CPU executor stopped")
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        在进程池中执行 func(*args, **kwargs)
+
+        未启动（例如脚本中直接调用）时退回 asyncio.to_thread，保证调用方无需区分
+        """
+        if self._executor is None:
+            return await self.run_thread(func, *args, **kwargs)
+
+        self._waiting += 1
+        try:
+            await self._admission.acquire()
+        finally:
+            self._waiting -= 1
+
+        self._submitted += 1
+        executor = self._executor
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            result, cpu_seconds, memo_delta = await loop.run_in_executor(
+                executor, _call, func, args, kwargs
+            )
+            _record_cpu(cpu_seconds)
+            if self.mode == 'process':
+                for field, value in memo_delta.items():
+                    self._worker_memo[field] += value
+            self._completed += 1
+            self._total_task_time += time.perf_counter() - start
+            return result
+        except BrokenProcessPool:
+            # 子进程被 OOM killer 杀掉等情况：重建进程池，本次在线程中执行
+            self._failed += 1
+            # 同一个坏掉的池上的所有任务都会失败，只由第一个失败的调用方重建
+            # （检查与重建之间没有 await，在事件循环中是原子的）
+            if self._executor is executor:
+                print("⚠️ CPU process pool broken, restarting")
+                self.shutdown()
+                self.start()
+            print("⚠️ Running task in thread after CPU process pool failure")
+            return await self.run_thread(func, *args, **kwargs)
+        except Exception:
+            self._failed += 1
+            raise
+        finally:
+            self._submitted -= 1
+            self._admission.release()
+
+    async def run_thread(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        在线程中执行 func（用于不可 pickle 的实例方法，如回测/Prophet），
+        同样计入当前阶段的 CPU 时间
+        """
+        result, cpu_seconds, _ = await asyncio.to_thread(_call, func, args, kwargs)
+        _record_cpu(cpu_seconds)
+        return result
+
+    def stats(self) -> Dict:
+        """执行器状态（queue_depth = 等待执行的任务数）"""
+        running = min(self._submitted, self.max_workers)
+        return {
+            'mode': self.mode,
+            'started': self.started,
+            'max_workers': self.max_workers,
+            'max_queue': self.max_queue,
+            'running': running,
+            'queue_depth': self._waiting + (self._submitted - running),
+            'completed': self._completed,   # 成功完成（失败计入 failed）
+            'failed': self._failed,
+            'avg_task_seconds': round(self._total_task_time / self._completed, 3) if self._completed else 0.0
+        }
+
+    def worker_memo_stats(self) -> Dict:
+        """进程池子进程中标题 memo 的累计命中情况"""
+        return merge_counter_stats(self._worker_memo)
+
+
+def _call(func: Callable, args: tuple, kwargs: dict) -> Tuple[Any, float, Dict[str, int]]:
+    """在 worker 中执行并返回 (结果, 本线程消耗的 CPU 秒数, 标题 memo 计数增量)"""
+    memo_before = title_memo.counters()
+    start = time.thread_time()
+    result = func(*args, **kwargs)
+    cpu_seconds = time.thread_time() - start
+    memo_after = title_memo.counters()
+    return result, cpu_seconds, {field: memo_after[field] - memo_before[field] for field in COUNTER_FIELDS}
+
+
+# 全局实例（由 app lifespan 启动）
+cpu_executor = CPUExecutor(
+    max_workers=int(os.getenv('CPU_EXECUTOR_WORKERS', '0')) or None,
+    max_queue=int(os.getenv('CPU_EXECUTOR_MAX_QUEUE', '16')),
+    mode=os.getenv('CPU_EXECUTOR_MODE', 'process')
+)
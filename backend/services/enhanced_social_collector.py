@@ -4,19 +4,26 @@ MVP 3.0 - Cross-Platform Signal Enhancement
 """
 
 import asyncio
-from typing import List, Dict, Optional, Tuple
+from typing import Awaitable, Callable, List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
-from collections import Counter
+from collections import Counter, OrderedDict
 import re
 import json
 import hashlib
-from functools import wraps
+import os
+import threading
 import time
 import numpy as np
 
+from services.circuit_breaker import create_breaker
+from services.io_executor import social_io_executor
+from services.rate_limit import QuotaLimiter, TokenBucket
+from services.single_flight import SingleFlight
+from services.trend_prewarmer import KeywordPopularity
+
 # Redis for caching (optional but recommended)
 try:
-    import redis
+    import redis.asyncio as aioredis
     REDIS_AVAILABLE = True
 except ImportError:
     REDIS_AVAILABLE = False
@@ -53,62 +60,192 @@ except ImportError:
     print("⚠️ SerpAPI not available. Install: pip install google-search-results")
 
 
-class RateLimiter:
+class KeywordFanOut:
     """
-    智能速率限制器 - 自动调节请求频率
+    并发抓取多个关键词：信号量限制同时进行的请求数，令牌桶控制请求节奏
+    （替代每个关键词之后固定的 asyncio.sleep）
     """
-    def __init__(self, max_calls: int, time_window: int):
-        self.max_calls = max_calls
-        self.time_window = time_window  # seconds
-        self.calls = []
-    
-    def __call__(self, func):
-        @wraps(func)
-        async def wrapper(*args, **kwargs):
-            now = time.time()
-            
-            # 清理过期的调用记录
-            self.calls = [call_time for call_time in self.calls 
-                         if now - call_time < self.time_window]
-            
-            # 检查是否超过限制
-            if len(self.calls) >= self.max_calls:
-                wait_time = self.time_window - (now - self.calls[0])
-                if wait_time > 0:
-                    print(f"⏳ Rate limit reached, waiting {wait_time:.1f}s...")
-                    await asyncio.sleep(wait_time + 1)
-                    self.calls = []
-            
-            # 记录本次调用
-            self.calls.append(time.time())
-            return await func(*args, **kwargs)
+    def __init__(self, name: str, concurrency: int = 3, rate: float = 1.0, burst: float = 3.0):
+        self.name = name
+        self.concurrency = concurrency
+        self.bucket = TokenBucket(rate=rate, capacity=burst, name=name)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+    
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # 在事件循环中延迟创建（Python 3.9 的 Semaphore 在创建时绑定事件循环）
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._semaphore
+    
+    async def run(self, keywords: List, fetch) -> Dict:
+        """
+        并发执行 fetch(keyword)，返回成功的 {keyword: data}
+        （keyword 也可以是一组关键词，如 Google Trends 的批量 payload）
+        """
+        semaphore = self._get_semaphore()
+        
+        async def fetch_one(keyword: str):
+            async with semaphore:
+                await self.bucket.acquire()
+                return keyword, await fetch(keyword)
         
-        return wrapper
+        results = await asyncio.gather(*(fetch_one(keyword) for keyword in keywords))
+        return {keyword: data for keyword, data in results if data}
+    
+    def stats(self) -> Dict:
+        return {
+            'concurrency': self.concurrency,
+            'in_flight': self.concurrency - self._semaphore._value if self._semaphore else 0,
+            'pacing': self.bucket.stats()
+        }
+
+
+class LocalCacheTier:
+    """
+    进程内 L1 缓存 - 按条目数和近似字节数做 LRU 淘汰
+    
+    - 每个条目有自己的过期时间：读取时惰性过期，另外每 sweep_interval 秒顺带清理一次
+    - 条目大小按 JSON 序列化后的长度估算
+    """
+    def __init__(self, max_entries: int = 2000, max_bytes: int = 16 * 1024 * 1024,
+                 sweep_interval: float = 60.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._bytes = 0
+        self._last_sweep = time.time()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get(self, key: str) -> Optional[dict]:
+        self._maybe_sweep()
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if time.time() >= entry['expires_at']:
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry['data']
+    
+    def set(self, key: str, data: dict, ttl: float, size: Optional[int] = None):
+        """写入条目（size 为序列化后的字节数，调用方已序列化时可直接传入）"""
+        self._maybe_sweep()
+        if size is None:
+            size = len(json.dumps(data, default=str))
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = {'data': data, 'expires_at': time.time() + ttl, 'size': size}
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+    
+    def _remove(self, key: str):
+        entry = self._entries.pop(key)
+        self._bytes -= entry['size']
+    
+    def _maybe_sweep(self):
+        now = time.time()
+        if now - self._last_sweep < self.sweep_interval:
+            return
+        self._last_sweep = now
+        expired = [key for key, entry in self._entries.items() if now >= entry['expires_at']]
+        for key in expired:
+            self._remove(key)
+        self.expirations += len(expired)
+    
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'bytes': self._bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations
+        }
 
 
 class CacheManager:
     """
     缓存管理器 - 减少API调用，提升响应速度
+    
+    Redis 使用 redis.asyncio（共享连接池，不阻塞事件循环），每个操作有独立超时；
+    Redis 不可用时退回进程内缓存，并在 retry_interval 秒内不再尝试 Redis
+    
+    进程内 L1（LocalCacheTier）同时作为 Redis 前面的 near-cache：
+    热门关键词直接命中 L1，不走网络；从 Redis 读到的条目只在 L1 保留 near_ttl 秒
+    
+    Stale-while-revalidate：条目超过 soft_ttl 后仍立即返回（标记为 stale），
+    同时在后台刷新；超过 ttl（hard TTL）后才视为未命中、阻塞抓取
     """
-    def __init__(self, redis_url: Optional[str] = None, ttl: int = 3600):
+    def __init__(self, redis_url: Optional[str] = None, ttl: int = 3600,
+                 op_timeout: float = 0.5, max_connections: int = 20,
+                 retry_interval: float = 30.0, local_max_entries: int = 2000,
+                 local_max_bytes: int = 16 * 1024 * 1024, near_ttl: int = 60,
+                 soft_ttl: Optional[int] = None):
         """
         初始化缓存管理器
         
         Args:
             redis_url: Redis 连接 URL (例如: redis://localhost:6379)
             ttl: 缓存过期时间（秒），默认 1 小时
+            op_timeout: 单次 Redis 操作超时（秒）
+            max_connections: 连接池大小
+            retry_interval: Redis 失败后退回本地缓存的时长（秒）
+            local_max_entries / local_max_bytes: L1 容量上限
+            near_ttl: Redis 命中的条目在 L1 中的保留时间（秒）
+            soft_ttl: 超过该时间的条目返回后在后台刷新（默认 ttl 的 3/4：
+                      热门关键词的上游请求频率与原先的 hard TTL 相当，只在最后 1/4 提前刷新）
         """
-        self.ttl = ttl  # Time to live in seconds
+        self.ttl = ttl  # Time to live in seconds (hard TTL)
+        self.soft_ttl = min(soft_ttl, ttl) if soft_ttl is not None else ttl * 3 // 4
+        self.op_timeout = op_timeout
+        self.retry_interval = retry_interval
+        self.near_ttl = min(near_ttl, ttl)
         self.redis_client = None
-        self.local_cache = {}  # Fallback to memory cache
+        self.local_cache = LocalCacheTier(local_max_entries, local_max_bytes)  # L1 / fallback
+        self._redis_down_until = 0.0
+        self.redis_errors = 0
+        # 各数据源的累计缓存命中（按关键词计）
+        self.source_stats: Dict[str, Dict[str, int]] = {}
+        # 合并并发的相同抓取（同一 platform/keyword/geo 的缓存键只抓取一次）
+        self.inflight = SingleFlight('social_fetch')
+        # 正在后台刷新的 (source, keyword)
+        self._revalidating: set = set()
+        self._revalidate_tasks: set = set()
+        self.revalidations = 0
         
         if REDIS_AVAILABLE and redis_url:
             try:
-                self.redis_client = redis.from_url(redis_url)
-                self.redis_client.ping()
-                print("✅ Redis cache connected")
+                # 连接池按需建立连接，第一次操作时才真正连接
+                pool = aioredis.ConnectionPool.from_url(
+                    redis_url,
+                    max_connections=max_connections,
+                    socket_timeout=op_timeout,
+                    socket_connect_timeout=op_timeout
+                )
+                self.redis_client = aioredis.Redis(connection_pool=pool)
+                print(f"✅ Redis cache configured (async pool, {max_connections} connections)")
             except Exception as e:
-                print(f"⚠️ Redis connection failed: {e}, using local cache")
+                print(f"⚠️ Redis configuration failed: {e}, using local cache")
     
     def _generate_key(self, prefix: str, params: dict) -> str:
         """生成缓存键"""
@@ -116,46 +253,264 @@ class CacheManager:
         hash_key = hashlib.md5(params_str.encode()).hexdigest()
         return f"{prefix}:{hash_key}"
     
+    @property
+    def redis_available(self) -> bool:
+        return self.redis_client is not None and time.time() >= self._redis_down_until
+    
+    async def _redis_call(self, operation: str, coro):
+        """执行 Redis 操作（带超时）；失败时标记 Redis 暂不可用并返回 None"""
+        try:
+            return await asyncio.wait_for(coro, timeout=self.op_timeout)
+        except Exception as e:
+            self.redis_errors += 1
+            if time.time() >= self._redis_down_until:
+                print(f"⚠️ Cache {operation} error: {type(e).__name__} {e}, "
+                      f"using local cache for {self.retry_interval:.0f}s")
+            self._redis_down_until = time.time() + self.retry_interval
+            return None
+    
     async def get(self, key: str) -> Optional[dict]:
         """获取缓存"""
-        if self.redis_client:
-            try:
-                data = self.redis_client.get(key)
-                if data:
-                    return json.loads(data)
-            except Exception as e:
-                print(f"Cache get error: {e}")
-        
-        # Fallback to local cache
-        if key in self.local_cache:
-            item = self.local_cache[key]
-            if time.time() - item['timestamp'] < self.ttl:
-                return item['data']
-            else:
-                del self.local_cache[key]
-        
-        return None
+        return (await self.get_many([key])).get(key)
     
     async def set(self, key: str, data: dict):
         """设置缓存"""
-        if self.redis_client:
+        await self.set_many({key: data})
+    
+    @staticmethod
+    def _unwrap(entry) -> Tuple[dict, Optional[float]]:
+        """
+        解析缓存条目 -> (data, cached_at)
+        新条目格式为 {'__swr__': 1, 'cached_at': ..., 'ttl': ..., 'data': ...}；
+        旧格式（直接存 data）的写入时间未知，返回 None
+        """
+        if isinstance(entry, dict) and entry.get('__swr__') == 1:
+            return entry['data'], entry['cached_at']
+        return entry, None
+    
+    async def get_many_entries(self, keys: List[str]) -> Dict[str, Tuple[dict, Optional[float]]]:
+        """
+        批量获取缓存及写入时间（Redis 一次 MGET）
+        
+        Returns:
+            命中的 {key: (data, cached_at)}，未命中的键不出现在结果中
+        """
+        found = {}
+        if not keys:
+            return found
+        
+        # L1 near-cache
+        for key in keys:
+            entry = self.local_cache.get(key)
+            if entry is not None:
+                found[key] = self._unwrap(entry)
+        
+        remaining = [key for key in keys if key not in found]
+        if remaining and self.redis_available:
+            values = await self._redis_call('get', self.redis_client.mget(remaining))
+            if values is not None:
+                for key, value in zip(remaining, values):
+                    if value:
+                        entry = json.loads(value)
+                        found[key] = self._unwrap(entry)
+                        near_ttl = self._near_ttl(entry)
+                        if near_ttl > 0:
+                            self.local_cache.set(key, entry, near_ttl, size=len(value))
+        
+        return found
+    
+    def _near_ttl(self, entry) -> float:
+        """Redis 命中的条目在 L1 中的保留时间：不超过 near_ttl，也不超过该条目在 Redis 中的剩余寿命"""
+        if isinstance(entry, dict) and entry.get('__swr__') == 1 and entry.get('ttl'):
+            return min(self.near_ttl, entry['cached_at'] + entry['ttl'] - time.time())
+        return self.near_ttl
+    
+    async def get_many(self, keys: List[str]) -> Dict[str, dict]:
+        """
+        批量获取缓存（Redis 一次 MGET）
+        
+        Returns:
+            命中的 {key: data}，未命中的键不出现在结果中
+        """
+        return {key: data for key, (data, _) in (await self.get_many_entries(keys)).items()}
+    
+    async def set_many(self, items: Dict[str, dict], ttl: Optional[int] = None):
+        """
+        批量设置缓存（Redis 一次 pipeline 往返，每个键单独 SETEX 以保留 hard TTL）
+        
+        Args:
+            ttl: 本批条目的 hard TTL（秒），默认 self.ttl
+        """
+        if not items:
+            return
+        
+        ttl = ttl or self.ttl
+        cached_at = time.time()
+        entries = {
+            key: {'__swr__': 1, 'cached_at': cached_at, 'ttl': ttl, 'data': data}
+            for key, data in items.items()
+        }
+        payloads = {key: json.dumps(entry) for key, entry in entries.items()}
+        
+        # 始终写入 L1（Redis 不可用时即为唯一的缓存）
+        for key, entry in entries.items():
+            self.local_cache.set(key, entry, ttl, size=len(payloads[key]))
+        
+        if self.redis_available:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for key, payload in payloads.items():
+                pipe.setex(key, ttl, payload)
+            await self._redis_call('set', pipe.execute())
+    
+    async def lookup(self, source: str, keyed: Dict[str, str],
+                     cache_stats: Optional[Dict] = None) -> Tuple[Dict[str, dict], List[str], List[str]]:
+        """
+        一次批量查询一组关键词的缓存
+        
+        Args:
+            source: 数据源名称（用于日志和命中率统计）
+            keyed: {keyword: cache_key}
+            cache_stats: 可选，写入本次查询的命中情况和数据新鲜度
+        
+        Returns:
+            (命中的 {keyword: data}, 未命中的关键词列表, 命中但已超过 soft TTL 的关键词列表)
+        """
+        found = await self.get_many_entries(list(keyed.values()))
+        now = time.time()
+        hits, ages, stale = {}, {}, []
+        for keyword, key in keyed.items():
+            if key not in found:
+                continue
+            data, cached_at = found[key]
+            hits[keyword] = data
+            ages[keyword] = now - cached_at if cached_at is not None else None
+            if ages[keyword] is None or ages[keyword] >= self.soft_ttl:
+                stale.append(keyword)
+        misses = [keyword for keyword in keyed if keyword not in hits]
+        
+        for keyword in hits:
+            marker = 'stale' if keyword in stale else 'cached'
+            print(f"📦 Using {marker} {source} data for '{keyword}'")
+        
+        totals = self.source_stats.setdefault(source, {'lookups': 0, 'hits': 0})
+        totals['lookups'] += len(keyed)
+        totals['hits'] += len(hits)
+        if cache_stats is not None:
+            known_ages = [age for age in ages.values() if age is not None]
+            cache_stats.update(_hit_ratio(len(keyed), len(hits)))
+            cache_stats.update({
+                'stale': len(stale),
+                'max_age_seconds': round(max(known_ages), 1) if known_ages else None
+            })
+        
+        return hits, misses, stale
+    
+    async def due_for_refresh(self, keyed: Dict[str, str], refresh_after: float) -> List[str]:
+        """
+        预热用：返回缓存缺失或写入已超过 refresh_after 秒的关键词（不计入命中率统计）
+        
+        Args:
+            keyed: {keyword: cache_key}
+        """
+        found = await self.get_many_entries(list(keyed.values()))
+        now = time.time()
+        due = []
+        for keyword, key in keyed.items():
+            cached_at = found[key][1] if key in found else None
+            if cached_at is None or now - cached_at >= refresh_after:
+                due.append(keyword)
+        return due
+    
+    def revalidate(self, source: str, keywords: List[str],
+                   refresh: Callable[[List[str]], Awaitable]):
+        """
+        在后台刷新超过 soft TTL 的关键词（同一 source/keyword 同时只有一个刷新任务）
+        
+        Args:
+            refresh: async refresh(keywords)，抓取并写入缓存
+        """
+        pending = [keyword for keyword in keywords if (source, keyword) not in self._revalidating]
+        if not pending:
+            return
+        self._revalidating.update((source, keyword) for keyword in pending)
+        self.revalidations += len(pending)
+        print(f"🔄 Revalidating {len(pending)} stale {source} keyword(s) in background")
+        
+        async def run():
             try:
-                self.redis_client.setex(
-                    key, 
-                    self.ttl, 
-                    json.dumps(data)
-                )
-                return
+                await refresh(pending)
             except Exception as e:
-                print(f"Cache set error: {e}")
+                print(f"⚠️ Background {source} refresh failed: {e}")
+            finally:
+                self._revalidating.difference_update((source, keyword) for keyword in pending)
         
-        # Fallback to local cache
-        self.local_cache[key] = {
-            'data': data,
-            'timestamp': time.time()
+        task = asyncio.ensure_future(run())
+        self._revalidate_tasks.add(task)
+        task.add_done_callback(self._revalidate_tasks.discard)
+    
+    async def close(self):
+        """关闭连接池（在 lifespan 结束阶段调用）"""
+        for task in list(self._revalidate_tasks):
+            task.cancel()
+        if self.redis_client is not None:
+            try:
+                # redis>=5.0.1 提供 aclose()，旧版本为 close()
+                close = getattr(self.redis_client, 'aclose', None) or self.redis_client.close
+                await close()
+                await self.redis_client.connection_pool.disconnect()
+            except Exception as e:
+                print(f"⚠️ Redis close error: {e}")
+    
+    def stats(self) -> Dict:
+        return {
+            'redis_configured': self.redis_client is not None,
+            'redis_available': self.redis_available,
+            'redis_errors': self.redis_errors,
+            'ttl_seconds': self.ttl,
+            'soft_ttl_seconds': self.soft_ttl,
+            'near_ttl_seconds': self.near_ttl,
+            'revalidating': len(self._revalidating),
+            'revalidations': self.revalidations,
+            'local': self.local_cache.stats(),
+            'sources': {
+                source: _hit_ratio(totals['lookups'], totals['hits'])
+                for source, totals in self.source_stats.items()
+            }
         }
 
 
+def _freshness(cache_stats: Dict, trends: List[Dict]) -> Dict:
+    """
+    单个数据源本次结果的新鲜度（供前端显示数据时间）
+    
+    status: live（全部实时抓取）| cached（全部来自缓存且未过 soft TTL）|
+            partial（缓存 + 实时）| stale（含过期数据，后台刷新中）| unavailable（无数据）
+    """
+    hits = cache_stats.get('hits', 0)
+    if not trends:
+        status = 'unavailable'
+    elif cache_stats.get('stale'):
+        status = 'stale'
+    elif hits == 0:
+        status = 'live'
+    elif hits >= len(trends):
+        status = 'cached'
+    else:
+        status = 'partial'
+    return {
+        'status': status,
+        'max_age_seconds': cache_stats.get('max_age_seconds') if hits else 0.0
+    }
+
+
+def _hit_ratio(lookups: int, hits: int) -> Dict:
+    return {
+        'keywords': lookups,
+        'hits': hits,
+        'hit_ratio': round(hits / lookups, 3) if lookups else 0.0
+    }
+
+
 class EnhancedTwitterCollector:
     """
     增强版 Twitter 收集器 - 支持速率限制、缓存、深度分析
@@ -164,6 +519,13 @@ class EnhancedTwitterCollector:
         self.bearer_token = bearer_token
         self.client = None
         self.cache = cache_manager or CacheManager()
+        # 关键词并发抓取：最多 3 个同时进行，每秒 1 个请求（突发 3 个）
+        self.fan_out = KeywordFanOut('twitter', concurrency=3, rate=1.0, burst=3)
+        # 熔断器：平台持续失败时跳过请求，超时时间按 p95 延迟自适应
+        self.breaker = create_breaker('twitter')
+        # API 配额：15 calls per 15 minutes（配置 Redis 时所有 worker 共享）
+        self.quota = QuotaLimiter('twitter', max_calls=15, time_window=900,
+                                  redis_client=self.cache.redis_client)
         
         if TWITTER_AVAILABLE and bearer_token:
             try:
@@ -175,81 +537,120 @@ class EnhancedTwitterCollector:
             except Exception as e:
                 print(f"⚠️ Twitter API initialization failed: {e}")
     
-    @RateLimiter(max_calls=15, time_window=900)  # 15 calls per 15 minutes
-    async def get_trending_topics(self, keywords: List[str], limit: int = 100) -> List[Dict]:
+    async def get_trending_topics(self, keywords: List[str], limit: int = 100,
+                                  cache_stats: Optional[Dict] = None) -> List[Dict]:
         """
         收集 Twitter 趋势数据（带缓存和速率限制）
+        先批量查询缓存，只抓取未命中的关键词
         """
-        trending_topics = []
+        keyed = self._cache_keys(keywords[:5], limit)  # Limit keywords to avoid overload
+        results, misses, stale = await self.cache.lookup('twitter', keyed, cache_stats)
+        
+        # 如果没有客户端，跳过（不使用模拟数据）
+        if not self.client:
+            for keyword in misses:
+                print(f"⚠️ Twitter API not available for '{keyword}'")
+            return [results[keyword] for keyword in keyed if keyword in results]
         
-        for keyword in keywords[:5]:  # Limit keywords to avoid overload
-            # 检查缓存
-            cache_key = self.cache._generate_key('twitter', {'keyword': keyword, 'limit': limit})
-            cached_data = await self.cache.get(cache_key)
+        # 熔断打开时不发请求，只返回缓存
+        if (misses or stale) and not self.breaker.allow_request():
+            print("⚡ Twitter circuit open, serving cached data only")
+            return [results[keyword] for keyword in keyed if keyword in results]
+        
+        # 过期（soft TTL）的条目先返回，后台刷新
+        if stale:
+            self.cache.revalidate('twitter', stale, lambda kws: self._fetch_misses(kws, keyed, limit))
+        
+        results.update(await self._fetch_misses(misses, keyed, limit))
+        
+        return [results[keyword] for keyword in keyed if keyword in results]
+    
+    def _cache_keys(self, keywords: List[str], limit: int = 100) -> Dict[str, str]:
+        return {
+            keyword: self.cache._generate_key('twitter', {'keyword': keyword, 'limit': limit})
+            for keyword in keywords
+        }
+    
+    async def prewarm(self, keywords: List[str], refresh_after: float,
+                      max_fetch: Optional[int] = None, limit: int = 100) -> int:
+        """预热：抓取缓存缺失或即将过期的关键词（最多 max_fetch 个），返回成功刷新的数量"""
+        if not self.client or not self.breaker.allow_request():
+            return 0
+        keyed = self._cache_keys(keywords, limit)
+        due = (await self.cache.due_for_refresh(keyed, refresh_after))[:max_fetch]
+        return len(await self._fetch_misses(due, keyed, limit))
+    
+    async def _fetch_misses(self, keywords: List[str], keyed: Dict[str, str], limit: int) -> Dict[str, Dict]:
+        """未命中的关键词并发抓取（信号量 + 令牌桶控制速率），并发的相同请求共享一次抓取"""
+        return await self.fan_out.run(
+            keywords,
+            lambda keyword: self.cache.inflight.do(
+                keyed[keyword], lambda: self._fetch_keyword(keyword, limit, keyed[keyword])
+            )
+        )
+    
+    async def _fetch_keyword(self, keyword: str, limit: int, cache_key: str) -> Optional[Dict]:
+        """
+        抓取并分析单个关键词（成功时写入缓存），失败返回 None
+        """
+        try:
+            # 配额耗尽时快速失败，不等待整个窗口
+            if not await self.quota.acquire(max_wait=0):
+                print(f"⏳ Twitter quota exhausted, skipping '{keyword}'")
+                return None
             
-            if cached_data:
-                print(f"📦 Using cached Twitter data for '{keyword}'")
-                trending_topics.append(cached_data)
-                continue
+            # 搜索推文（阻塞调用放到 I/O 线程池，带超时）
+            tweets = await self.breaker.call(
+                social_io_executor.run,
+                self.client.search_recent_tweets,
+                query=f"{keyword} -is:retweet -is:reply lang:en",
+                max_results=min(limit, 100),
+                tweet_fields=['public_metrics', 'created_at', 'entities'],
+                expansions=['author_id']
+            )
             
-            # 如果没有客户端，跳过（不使用模拟数据）
-            if not self.client:
-                print(f"⚠️ Twitter API not available for '{keyword}'")
-                continue
+            if not tweets.data:
+                print(f"ℹ️ No Twitter data found for '{keyword}'")
+                return None
             
-            try:
-                # 搜索推文
-                tweets = self.client.search_recent_tweets(
-                    query=f"{keyword} -is:retweet -is:reply lang:en",
-                    max_results=min(limit, 100),
-                    tweet_fields=['public_metrics', 'created_at', 'entities'],
-                    expansions=['author_id']
-                )
-                
-                if not tweets.data:
-                    print(f"ℹ️ No Twitter data found for '{keyword}'")
-                    continue
-                
-                # 深度分析
-                analysis = self._deep_analyze_tweets(tweets.data, keyword)
-                
-                trend_data = {
-                    'keyword': keyword,
-                    'source': 'twitter',
-                    'engagement_score': analysis['engagement_score'],
-                    'tweet_count': len(tweets.data),
-                    'related_hashtags': analysis['top_hashtags'],
-                    'sentiment': analysis['sentiment'],
-                    'velocity': analysis['velocity'],  # 新增：趋势速度
-                    'influencer_ratio': analysis['influencer_ratio'],  # 新增：影响力比例
-                    'trend_score': self._calculate_twitter_trend_score(analysis),
-                    'timestamp': datetime.utcnow().isoformat()
-                }
-                
-                # 缓存结果（1小时）
-                await self.cache.set(cache_key, trend_data)
-                trending_topics.append(trend_data)
-                
-                # 避免速率限制
-                await asyncio.sleep(1)
-                
-            except tweepy.errors.TooManyRequests as e:
-                print(f"⚠️ Twitter rate limit hit for '{keyword}', skipping (fast-fail)")
-                # 返回空数据，不等待
-                continue
-            except tweepy.errors.TweepyException as e:
-                # 检查是否是速率限制相关的错误
-                error_str = str(e).lower()
-                if "429" in str(e) or "rate limit" in error_str or "too many requests" in error_str:
-                    print(f"⚠️ Twitter rate limit detected for '{keyword}', skipping (fast-fail)")
-                    continue
-                print(f"❌ Twitter error for '{keyword}': {type(e).__name__} - {e}")
-                continue
-            except Exception as e:
-                print(f"❌ Twitter error for '{keyword}': {type(e).__name__} - {e}")
-                continue
-        
-        return trending_topics
+            # 深度分析
+            analysis = self._deep_analyze_tweets(tweets.data, keyword)
+            
+            trend_data = {
+                'keyword': keyword,
+                'source': 'twitter',
+                'engagement_score': analysis['engagement_score'],
+                'tweet_count': len(tweets.data),
+                'related_hashtags': analysis['top_hashtags'],
+                'sentiment': analysis['sentiment'],
+                'velocity': analysis['velocity'],  # 新增：趋势速度
+                'influencer_ratio': analysis['influencer_ratio'],  # 新增：影响力比例
+                'trend_score': self._calculate_twitter_trend_score(analysis),
+                'timestamp': datetime.utcnow().isoformat()
+            }
+            
+            # 缓存结果（1小时）
+            await self.cache.set(cache_key, trend_data)
+            return trend_data
+            
+        except asyncio.TimeoutError:
+            print(f"⚠️ Twitter request timeout for '{keyword}' ({social_io_executor.timeout}s)")
+            return None
+        except tweepy.errors.TooManyRequests as e:
+            print(f"⚠️ Twitter rate limit hit for '{keyword}', skipping (fast-fail)")
+            # 返回空数据，不等待
+            return None
+        except tweepy.errors.TweepyException as e:
+            # 检查是否是速率限制相关的错误
+            error_str = str(e).lower()
+            if "429" in str(e) or "rate limit" in error_str or "too many requests" in error_str:
+                print(f"⚠️ Twitter rate limit detected for '{keyword}', skipping (fast-fail)")
+                return None
+            print(f"❌ Twitter error for '{keyword}': {type(e).__name__} - {e}")
+            return None
+        except Exception as e:
+            print(f"❌ Twitter error for '{keyword}': {type(e).__name__} - {e}")
+            return None
     
     def _deep_analyze_tweets(self, tweets: List, keyword: str) -> Dict:
         """
@@ -387,6 +788,13 @@ class EnhancedRedditCollector:
                  cache_manager: Optional[CacheManager] = None):
         self.reddit = None
         self.cache = cache_manager or CacheManager()
+        # 关键词并发抓取：最多 3 个同时进行，每秒 1 个请求（突发 3 个）
+        self.fan_out = KeywordFanOut('reddit', concurrency=3, rate=1.0, burst=3)
+        # 熔断器：平台持续失败时跳过请求，超时时间按 p95 延迟自适应
+        self.breaker = create_breaker('reddit')
+        # API 配额：60 calls per minute（配置 Redis 时所有 worker 共享）
+        self.quota = QuotaLimiter('reddit', max_calls=60, time_window=60,
+                                  redis_client=self.cache.redis_client)
         
         if REDDIT_AVAILABLE and client_id and client_secret:
             try:
@@ -399,69 +807,113 @@ class EnhancedRedditCollector:
             except Exception as e:
                 print(f"⚠️ Reddit API initialization failed: {e}")
     
-    @RateLimiter(max_calls=60, time_window=60)  # 60 calls per minute
-    async def get_trending_topics(self, keywords: List[str]) -> List[Dict]:
+    async def get_trending_topics(self, keywords: List[str],
+                                  cache_stats: Optional[Dict] = None) -> List[Dict]:
         """
         收集 Reddit 趋势数据（增强版）
+        先批量查询缓存，只抓取未命中的关键词
         """
-        trending_topics = []
+        keyed = self._cache_keys(keywords[:5])
+        results, misses, stale = await self.cache.lookup('reddit', keyed, cache_stats)
+        
+        if not self.reddit:
+            for keyword in misses:
+                print(f"⚠️ Reddit API not available for '{keyword}'")
+            return [results[keyword] for keyword in keyed if keyword in results]
+        
+        # 熔断打开时不发请求，只返回缓存
+        if (misses or stale) and not self.breaker.allow_request():
+            print("⚡ Reddit circuit open, serving cached data only")
+            return [results[keyword] for keyword in keyed if keyword in results]
+        
+        # 过期（soft TTL）的条目先返回，后台刷新
+        if stale:
+            self.cache.revalidate('reddit', stale, lambda kws: self._fetch_misses(kws, keyed))
         
-        for keyword in keywords[:5]:
-            # 检查缓存
-            cache_key = self.cache._generate_key('reddit', {'keyword': keyword})
-            cached_data = await self.cache.get(cache_key)
+        results.update(await self._fetch_misses(misses, keyed))
+        
+        return [results[keyword] for keyword in keyed if keyword in results]
+    
+    def _cache_keys(self, keywords: List[str]) -> Dict[str, str]:
+        return {keyword: self.cache._generate_key('reddit', {'keyword': keyword}) for keyword in keywords}
+    
+    async def prewarm(self, keywords: List[str], refresh_after: float,
+                      max_fetch: Optional[int] = None) -> int:
+        """预热：抓取缓存缺失或即将过期的关键词（最多 max_fetch 个），返回成功刷新的数量"""
+        if not self.reddit or not self.breaker.allow_request():
+            return 0
+        keyed = self._cache_keys(keywords)
+        due = (await self.cache.due_for_refresh(keyed, refresh_after))[:max_fetch]
+        return len(await self._fetch_misses(due, keyed))
+    
+    async def _fetch_misses(self, keywords: List[str], keyed: Dict[str, str]) -> Dict[str, Dict]:
+        """未命中的关键词并发抓取（信号量 + 令牌桶控制速率），并发的相同请求共享一次抓取"""
+        return await self.fan_out.run(
+            keywords,
+            lambda keyword: self.cache.inflight.do(
+                keyed[keyword], lambda: self._fetch_keyword(keyword, keyed[keyword])
+            )
+        )
+    
+    async def _fetch_keyword(self, keyword: str, cache_key: str) -> Optional[Dict]:
+        """
+        抓取并分析单个关键词（成功时写入缓存），失败返回 None
+        """
+        try:
+            # 配额每秒补充 1 次调用，最多等待 2 秒
+            if not await self.quota.acquire(max_wait=2.0):
+                print(f"⏳ Reddit quota exhausted, skipping '{keyword}'")
+                return None
             
-            if cached_data:
-                print(f"📦 Using cached Reddit data for '{keyword}'")
-                trending_topics.append(cached_data)
-                continue
+            # 搜索帖子并分析（praw 的结果是惰性的，分析时也可能触发请求，因此一起放到 I/O 线程池）
+            posts, analysis = await self.breaker.call(
+                social_io_executor.run, self._search_and_analyze, keyword
+            )
             
-            if not self.reddit:
-                print(f"⚠️ Reddit API not available for '{keyword}'")
-                continue
+            if not posts:
+                print(f"ℹ️ No Reddit data found for '{keyword}'")
+                return None
             
-            try:
-                # 搜索帖子
-                search_results = self.reddit.subreddit('all').search(
-                    keyword,
-                    limit=100,
-                    time_filter='week',
-                    sort='hot'
-                )
-                
-                posts = list(search_results)
-                
-                if not posts:
-                    print(f"ℹ️ No Reddit data found for '{keyword}'")
-                    continue
-                
-                # 深度分析
-                analysis = self._deep_analyze_posts(posts, keyword)
-                
-                trend_data = {
-                    'keyword': keyword,
-                    'source': 'reddit',
-                    'upvote_score': analysis['avg_upvotes'],
-                    'comment_count': analysis['total_comments'],
-                    'post_count': len(posts),
-                    'top_subreddits': analysis['top_subreddits'],
-                    'discussion_depth': analysis['discussion_depth'],  # 新增
-                    'award_count': analysis['total_awards'],  # 新增
-                    'trend_score': self._calculate_reddit_trend_score(analysis),
-                    'timestamp': datetime.utcnow().isoformat()
-                }
-                
-                # 缓存结果
-                await self.cache.set(cache_key, trend_data)
-                trending_topics.append(trend_data)
-                
-                await asyncio.sleep(1)
-                
-            except Exception as e:
-                print(f"❌ Reddit error for '{keyword}': {e}")
-                continue
+            trend_data = {
+                'keyword': keyword,
+                'source': 'reddit',
+                'upvote_score': analysis['avg_upvotes'],
+                'comment_count': analysis['total_comments'],
+                'post_count': len(posts),
+                'top_subreddits': analysis['top_subreddits'],
+                'discussion_depth': analysis['discussion_depth'],  # 新增
+                'award_count': analysis['total_awards'],  # 新增
+                'trend_score': self._calculate_reddit_trend_score(analysis),
+                'timestamp': datetime.utcnow().isoformat()
+            }
+            
+            # 缓存结果
+            await self.cache.set(cache_key, trend_data)
+            return trend_data
+            
+        except asyncio.TimeoutError:
+            print(f"⚠️ Reddit request timeout for '{keyword}' ({social_io_executor.timeout}s)")
+            return None
+        except Exception as e:
+            print(f"❌ Reddit error for '{keyword}': {e}")
+            return None
+    
+    def _search_and_analyze(self, keyword: str) -> Tuple[List, Optional[Dict]]:
+        """在 I/O 线程中执行：搜索帖子并做深度分析"""
+        # 搜索帖子
+        search_results = self.reddit.subreddit('all').search(
+            keyword,
+            limit=100,
+            time_filter='week',
+            sort='hot'
+        )
+        
+        posts = list(search_results)
+        if not posts:
+            return posts, None
         
-        return trending_topics
+        # 深度分析
+        return posts, self._deep_analyze_posts(posts, keyword)
     
     def _deep_analyze_posts(self, posts: List, keyword: str) -> Dict:
         """深度分析 Reddit 帖子"""
@@ -516,6 +968,10 @@ class EnhancedSerpAPICollector:
     def __init__(self, api_key: Optional[str] = None, cache_manager: Optional[CacheManager] = None):
         self.api_key = api_key
         self.cache = cache_manager or CacheManager()
+        # 关键词并发抓取：最多 3 个同时进行，每秒 1 个请求（突发 3 个）
+        self.fan_out = KeywordFanOut('serpapi', concurrency=3, rate=1.0, burst=3)
+        # 熔断器：平台持续失败时跳过请求，超时时间按 p95 延迟自适应
+        self.breaker = create_breaker('serpapi')
         self.available = SERPAPI_AVAILABLE and api_key is not None
         
         if not SERPAPI_AVAILABLE:
@@ -525,71 +981,107 @@ class EnhancedSerpAPICollector:
         else:
             print("✅ SerpAPI collector initialized")
     
-    async def get_trending_topics(self, keywords: List[str], geo: str = 'US') -> List[Dict]:
+    async def get_trending_topics(self, keywords: List[str], geo: str = 'US',
+                                  cache_stats: Optional[Dict] = None) -> List[Dict]:
         """
         从 SerpAPI 获取趋势数据（Google、Twitter、Reddit）
+        先批量查询缓存，只抓取未命中的关键词
         """
         if not self.available:
             return []
         
-        trending_topics = []
+        keyed = self._cache_keys(keywords[:5], geo)  # 限制关键词数量
+        results, misses, stale = await self.cache.lookup('serpapi', keyed, cache_stats)
         
-        for keyword in keywords[:5]:  # 限制关键词数量
-            # 检查缓存
-            cache_key = self.cache._generate_key('serpapi', {'keyword': keyword, 'geo': geo})
-            cached_data = await self.cache.get(cache_key)
-            
-            if cached_data:
-                print(f"📦 Using cached SerpAPI data for '{keyword}'")
-                trending_topics.append(cached_data)
-                continue
-            
-            try:
-                # 搜索 Google（包含 Twitter 和 Reddit 结果）
-                results = await asyncio.to_thread(
-                    self._search_google, keyword, geo
-                )
-                
-                if not results:
-                    print(f"ℹ️ No SerpAPI data found for '{keyword}'")
-                    continue
-                
-                # 分析结果
-                trend_data = self._analyze_serpapi_results(results, keyword)
-                
-                # 缓存结果
-                await self.cache.set(cache_key, trend_data)
-                trending_topics.append(trend_data)
-                
-                await asyncio.sleep(1)  # 避免速率限制
-                
-            except Exception as e:
-                print(f"❌ SerpAPI error for '{keyword}': {e}")
-                continue
+        # 熔断打开时不发请求，只返回缓存
+        if (misses or stale) and not self.breaker.allow_request():
+            print("⚡ SerpAPI circuit open, serving cached data only")
+            return [results[keyword] for keyword in keyed if keyword in results]
         
-        return trending_topics
+        # 过期（soft TTL）的条目先返回，后台刷新
+        if stale:
+            self.cache.revalidate('serpapi', stale, lambda kws: self._fetch_misses(kws, keyed, geo))
+        
+        results.update(await self._fetch_misses(misses, keyed, geo))
+        
+        return [results[keyword] for keyword in keyed if keyword in results]
     
-    def _search_google(self, keyword: str, geo: str = 'US') -> Dict:
+    def _cache_keys(self, keywords: List[str], geo: str = 'US') -> Dict[str, str]:
+        return {
+            keyword: self.cache._generate_key('serpapi', {'keyword': keyword, 'geo': geo})
+            for keyword in keywords
+        }
+    
+    async def prewarm(self, keywords: List[str], refresh_after: float,
+                      max_fetch: Optional[int] = None, geo: str = 'US') -> int:
+        """预热：抓取缓存缺失或即将过期的关键词（最多 max_fetch 个），返回成功刷新的数量"""
+        if not self.available or not self.breaker.allow_request():
+            return 0
+        keyed = self._cache_keys(keywords, geo)
+        due = (await self.cache.due_for_refresh(keyed, refresh_after))[:max_fetch]
+        return len(await self._fetch_misses(due, keyed, geo))
+    
+    async def _fetch_misses(self, keywords: List[str], keyed: Dict[str, str], geo: str) -> Dict[str, Dict]:
+        """未命中的关键词并发抓取（信号量 + 令牌桶控制速率），并发的相同请求共享一次抓取"""
+        return await self.fan_out.run(
+            keywords,
+            lambda keyword: self.cache.inflight.do(
+                keyed[keyword], lambda: self._fetch_keyword(keyword, geo, keyed[keyword])
+            )
+        )
+    
+    async def _fetch_keyword(self, keyword: str, geo: str, cache_key: str) -> Optional[Dict]:
         """
-        使用 SerpAPI 搜索 Google（包含 Twitter 和 Reddit 结果）
+        抓取并分析单个关键词（成功时写入缓存），失败返回 None
         """
         try:
-            params = {
-                "q": keyword,
-                "api_key": self.api_key,
-                "engine": "google",
-                "location": geo,
-                "num": 50,  # 获取更多结果
-                "tbm": "nws"  # 新闻搜索，包含社交媒体结果
-            }
+            # 搜索 Google（包含 Twitter 和 Reddit 结果）
+            results = await self.breaker.call(
+                social_io_executor.run, self._search_google, keyword, geo
+            )
             
-            search = GoogleSearch(params)
-            results = search.get_dict()
+            if not results:
+                print(f"ℹ️ No SerpAPI data found for '{keyword}'")
+                return None
             
-            return results
+            # 分析结果
+            trend_data = self._analyze_serpapi_results(results, keyword)
+            
+            # 缓存结果
+            await self.cache.set(cache_key, trend_data)
+            return trend_data
+            
+        except asyncio.TimeoutError:
+            print(f"⚠️ SerpAPI request timeout for '{keyword}' ({social_io_executor.timeout}s)")
+            return None
         except Exception as e:
-            print(f"❌ SerpAPI Google search error: {e}")
-            return {}
+            print(f"❌ SerpAPI error for '{keyword}': {e}")
+            return None
+    
+    def _search_google(self, keyword: str, geo: str = 'US') -> Dict:
+        """
+        使用 SerpAPI 搜索 Google（包含 Twitter 和 Reddit 结果）
+        """
+        params = {
+            "q": keyword,
+            "api_key": self.api_key,
+            "engine": "google",
+            "location": geo,
+            "num": 50,  # 获取更多结果
+            "tbm": "nws"  # 新闻搜索，包含社交媒体结果
+        }
+        
+        search = GoogleSearch(params)
+        results = search.get_dict()
+        
+        # 请求失败（网络错误等）直接抛出；SerpAPI 的错误响应（无效 key、配额用尽）
+        # 也作为异常抛出，由熔断器计为失败。"没有结果"不是平台故障，返回空结果
+        error = results.get('error')
+        if error:
+            if "hasn't returned any results" in error:
+                return {}
+            raise RuntimeError(f"SerpAPI error: {error}")
+        return results
     
     def _analyze_serpapi_results(self, results: Dict, keyword: str) -> Dict:
         """
@@ -672,10 +1164,29 @@ class EnhancedSerpAPICollector:
 class EnhancedGoogleTrendsCollector:
     """
     增强版 Google Trends 收集器 - 支持历史数据
+    
+    批量模式（batch_size > 1）：一个 payload 最多包含 5 个关键词（pytrends 上限），
+    一次 interest_over_time 请求取回所有关键词的序列，再拆分成每个关键词的 trend_data；
+    在共享刻度下峰值低于 min_shared_peak 的关键词之后各自作为单独的 payload 排队重新查询
+    
+    相关查询（related_queries）在 Google 端是每个关键词一次请求，无法合并；
+    它们变化很慢，单独缓存 related_ttl 秒，只为缓存中没有的关键词请求
     """
-    def __init__(self, cache_manager: Optional[CacheManager] = None):
+    MAX_PAYLOAD_KEYWORDS = 5
+    
+    def __init__(self, cache_manager: Optional[CacheManager] = None, batch_size: int = 5,
+                 min_shared_peak: int = 5, related_ttl: int = 86400):
         self.pytrends = None
         self.cache = cache_manager or CacheManager()
+        self.batch_size = max(1, min(batch_size, self.MAX_PAYLOAD_KEYWORDS))
+        self.min_shared_peak = min_shared_peak
+        self.related_ttl = related_ttl
+        # 关键词并发抓取：最多 2 个同时进行，每秒 0.5 个请求（突发 2 个）
+        self.fan_out = KeywordFanOut('google_trends', concurrency=2, rate=0.5, burst=2)
+        # 熔断器：平台持续失败时跳过请求，超时时间按 p95 延迟自适应
+        self.breaker = create_breaker('google_trends')
+        # I/O 线程各自的 TrendReq 实例
+        self._thread_local = threading.local()
         
         if GOOGLE_TRENDS_AVAILABLE:
             try:
@@ -685,85 +1196,297 @@ class EnhancedGoogleTrendsCollector:
                 print(f"⚠️ Google Trends initialization failed: {e}")
     
     async def get_trending_topics(self, keywords: List[str], geo: str = 'US', 
-                                   timeframe: str = 'now 7-d') -> List[Dict]:
+                                   timeframe: str = 'now 7-d',
+                                   cache_stats: Optional[Dict] = None) -> List[Dict]:
         """
         收集 Google Trends 数据（支持自定义时间范围）
+        先批量查询缓存，只抓取未命中的关键词
         """
-        trending_topics = []
-        
         if not self.pytrends:
             print("⚠️ Google Trends not available")
-            return trending_topics
+            return []
+        
+        keyed = self._cache_keys(keywords[:5], geo, timeframe)
+        results, misses, stale = await self.cache.lookup('google_trends', keyed, cache_stats)
         
-        for keyword in keywords[:5]:
-            cache_key = self.cache._generate_key('google_trends', {
+        # 熔断打开时不发请求，只返回缓存
+        if (misses or stale) and not self.breaker.allow_request():
+            print("⚡ Google Trends circuit open, serving cached data only")
+            return [results[keyword] for keyword in keyed if keyword in results]
+        
+        # 过期（soft TTL）的条目先返回，后台刷新
+        if stale:
+            self.cache.revalidate(
+                'google_trends', stale, lambda kws: self._fetch_misses(kws, keyed, geo, timeframe)
+            )
+        
+        results.update(await self._fetch_misses(misses, keyed, geo, timeframe))
+        
+        return [results[keyword] for keyword in keyed if keyword in results]
+    
+    def _cache_keys(self, keywords: List[str], geo: str = 'US',
+                    timeframe: str = 'now 7-d') -> Dict[str, str]:
+        return {
+            keyword: self.cache._generate_key('google_trends', {
                 'keyword': keyword, 
                 'geo': geo, 
                 'timeframe': timeframe
             })
-            cached_data = await self.cache.get(cache_key)
+            for keyword in keywords
+        }
+    
+    async def prewarm(self, keywords: List[str], refresh_after: float,
+                      max_fetch: Optional[int] = None, geo: str = 'US',
+                      timeframe: str = 'now 7-d') -> int:
+        """预热：抓取缓存缺失或即将过期的关键词（最多 max_fetch 个，按 payload 分组），返回成功刷新的数量"""
+        if not self.pytrends or not self.breaker.allow_request():
+            return 0
+        keyed = self._cache_keys(keywords, geo, timeframe)
+        due = (await self.cache.due_for_refresh(keyed, refresh_after))[:max_fetch]
+        return len(await self._fetch_misses(due, keyed, geo, timeframe))
+    
+    async def _fetch_misses(self, keywords: List[str], keyed: Dict[str, str],
+                            geo: str, timeframe: str) -> Dict[str, Dict]:
+        """抓取未命中的关键词（信号量 + 令牌桶控制速率），并发的相同请求共享一次抓取"""
+        if self.batch_size > 1:
+            # 按 payload 分组，每组一次请求
+            chunks = [
+                tuple(keywords[i:i + self.batch_size])
+                for i in range(0, len(keywords), self.batch_size)
+            ]
+            fetched = await self.fan_out.run(
+                chunks,
+                lambda chunk: self.cache.inflight.do(
+                    tuple(keyed[keyword] for keyword in chunk),
+                    lambda: self._fetch_batch(list(chunk), geo, timeframe, keyed)
+                )
+            )
+            results, requery = {}, []
+            for batch in fetched.values():
+                results.update(batch['trends'])
+                requery.extend(batch['requery'])
+            if requery:
+                # 共享刻度下峰值过低的关键词：各自一个 payload，同样经过并发和节奏控制
+                print(f"🔁 Re-querying {len(requery)} low-volume Google Trends keyword(s) alone")
+                results.update(await self._fetch_singles(requery, keyed, geo, timeframe))
+            return results
+        
+        return await self._fetch_singles(keywords, keyed, geo, timeframe)
+    
+    async def _fetch_singles(self, keywords: List[str], keyed: Dict[str, str],
+                             geo: str, timeframe: str) -> Dict[str, Dict]:
+        """每个关键词单独一个 payload"""
+        return await self.fan_out.run(
+            keywords,
+            lambda keyword: self.cache.inflight.do(
+                keyed[keyword], lambda: self._fetch_keyword(keyword, geo, timeframe, keyed[keyword])
+            )
+        )
+    
+    def _related_keys(self, keywords: List[str], geo: str, timeframe: str) -> Dict[str, str]:
+        return {
+            keyword: self.cache._generate_key('google_related', {
+                'keyword': keyword,
+                'geo': geo,
+                'timeframe': timeframe
+            })
+            for keyword in keywords
+        }
+    
+    async def _cached_related(self, keywords: List[str], geo: str, timeframe: str) -> Dict[str, Dict]:
+        """缓存中的相关查询 {keyword: {'rising_queries': [...], 'top_queries': [...]}}"""
+        keyed = self._related_keys(keywords, geo, timeframe)
+        found = await self.cache.get_many(list(keyed.values()))
+        return {keyword: found[key] for keyword, key in keyed.items() if key in found}
+    
+    async def _store_related(self, related: Dict[str, Dict], geo: str, timeframe: str):
+        keyed = self._related_keys(list(related), geo, timeframe)
+        await self.cache.set_many(
+            {keyed[keyword]: lists for keyword, lists in related.items()}, ttl=self.related_ttl
+        )
+    
+    async def _fetch_batch(self, keywords: List[str], geo: str, timeframe: str,
+                           keyed: Dict[str, str]) -> Dict:
+        """
+        一个 payload 抓取一组关键词（成功的写入缓存）
+        
+        Returns:
+            {'trends': {keyword: trend_data}, 'requery': 需要单独重新查询的关键词}，失败返回 {}
+        """
+        related = await self._cached_related(keywords, geo, timeframe)
+        try:
+            fetched = await self.breaker.call(
+                social_io_executor.run, self._query_batch, keywords, geo, timeframe,
+                [keyword for keyword in keywords if keyword not in related]
+            )
+        except asyncio.TimeoutError:
+            print(f"⚠️ Google Trends request timeout for {keywords} ({social_io_executor.timeout}s)")
+            return {}
+        except Exception as e:
+            print(f"❌ Google Trends error for {keywords}: {e}")
+            return {}
+        
+        # 低峰值关键词的相关查询也在这里写入缓存，单独重新查询时不再请求
+        await self._store_related(fetched['related'], geo, timeframe)
+        related.update(fetched['related'])
+        
+        batch = {
+            keyword: self._build_trend_data(keyword, values, related.get(keyword))
+            for keyword, values in fetched['series'].items()
+        }
+        await self.cache.set_many({keyed[keyword]: trend_data for keyword, trend_data in batch.items()})
+        return {'trends': batch, 'requery': fetched['requery']}
+    
+    async def _fetch_keyword(self, keyword: str, geo: str, timeframe: str,
+                             cache_key: str) -> Optional[Dict]:
+        """
+        抓取并分析单个关键词（成功时写入缓存），失败返回 None
+        """
+        related = (await self._cached_related([keyword], geo, timeframe)).get(keyword)
+        try:
+            # pytrends 调用在 I/O 线程池中执行（带超时）
+            fetched = await self.breaker.call(
+                social_io_executor.run, self._query_keyword, keyword, geo, timeframe, related is None
+            )
+            if fetched is None:
+                return None
             
-            if cached_data:
-                print(f"📦 Using cached Google Trends data for '{keyword}'")
-                trending_topics.append(cached_data)
-                continue
+            values, fetched_related = fetched
+            if related is None:
+                related = fetched_related
+                await self._store_related({keyword: related}, geo, timeframe)
+            trend_data = self._build_trend_data(keyword, values, related)
             
-            try:
-                # Build payload
-                self.pytrends.build_payload([keyword], timeframe=timeframe, geo=geo)
-                
-                # Interest over time
-                interest_df = self.pytrends.interest_over_time()
-                
-                if interest_df.empty or keyword not in interest_df.columns:
-                    continue
-                
-                values = interest_df[keyword].values
-                
-                # 计算增长率
-                growth_rate = self._calculate_growth_rate(values)
-                
-                # 获取相关查询
-                related_queries = self.pytrends.related_queries()
-                rising_queries = []
-                top_queries = []
-                
-                if keyword in related_queries:
-                    if related_queries[keyword]['rising'] is not None:
-                        rising_queries = related_queries[keyword]['rising']['query'].head(10).tolist()
-                    if related_queries[keyword]['top'] is not None:
-                        top_queries = related_queries[keyword]['top']['query'].head(10).tolist()
-                
-                # 当前兴趣度
-                current_interest = int(values[-1])
-                
-                # 趋势方向
-                trend_direction = self._determine_trend_direction(values)
-                
-                trend_data = {
-                    'keyword': keyword,
-                    'source': 'google_trends',
-                    'current_interest': current_interest,
-                    'growth_rate': round(growth_rate, 2),
-                    'trend_direction': trend_direction,  # 新增：上升/下降/稳定
-                    'volatility': self._calculate_volatility(values),  # 新增：波动性
-                    'rising_queries': rising_queries,
-                    'top_queries': top_queries,
-                    'trend_score': self._calculate_trends_score(current_interest, growth_rate, values),
-                    'historical_data': values.tolist()[-30:] if len(values) > 30 else values.tolist(),  # 保存最近30天数据
-                    'timestamp': datetime.utcnow().isoformat()
-                }
-                
-                await self.cache.set(cache_key, trend_data)
-                trending_topics.append(trend_data)
-                
-                await asyncio.sleep(2)
-                
-            except Exception as e:
-                print(f"❌ Google Trends error for '{keyword}': {e}")
+            await self.cache.set(cache_key, trend_data)
+            return trend_data
+            
+        except asyncio.TimeoutError:
+            print(f"⚠️ Google Trends request timeout for '{keyword}' ({social_io_executor.timeout}s)")
+            return None
+        except Exception as e:
+            print(f"❌ Google Trends error for '{keyword}': {e}")
+            return None
+    
+    def _thread_client(self):
+        """每个 I/O 线程使用自己的 TrendReq（build_payload 会修改实例状态，不能跨线程共享）"""
+        client = getattr(self._thread_local, 'pytrends', None)
+        if client is None:
+            client = TrendReq(hl='en-US', tz=360, timeout=(10, 25), retries=3)
+            self._thread_local.pytrends = client
+        return client
+    
+    def _query_batch(self, keywords: List[str], geo: str, timeframe: str,
+                     related_keywords: List[str]) -> Dict:
+        """
+        在 I/O 线程中执行：一个 payload 查询多个关键词
+        
+        同一 payload 中的关键词共享 0-100 刻度（以其中最热门的关键词为 100），
+        这里按各自峰值重新缩放到 0-100，与单独查询的刻度一致；
+        共享刻度下峰值低于 min_shared_peak 的小众关键词只剩几个整数档位，
+        放大后取整噪声会变成剧烈的增长率/方向波动，因此交给调用方单独查询
+        
+        Returns:
+            {'series': {keyword: values}, 'related': {keyword: 相关查询}（只含 related_keywords）,
+             'requery': 需要单独查询的关键词}
+        """
+        pytrends = self._thread_client()
+        
+        pytrends.build_payload(keywords, timeframe=timeframe, geo=geo)
+        interest_df = pytrends.interest_over_time()
+        
+        series, requery = {}, []
+        for keyword in keywords:
+            if interest_df.empty or keyword not in interest_df.columns:
                 continue
+            values = interest_df[keyword].values
+            peak = values.max()
+            if peak < self.min_shared_peak:
+                requery.append(keyword)
+                continue
+            series[keyword] = np.round(values * (100.0 / peak)).astype(values.dtype)
         
-        return trending_topics
+        return {
+            'series': series,
+            'related': self._related_queries(pytrends, related_keywords),
+            'requery': requery
+        }
+    
+    def _query_keyword(self, keyword: str, geo: str, timeframe: str, with_related: bool = True):
+        """在 I/O 线程中执行：兴趣度序列 + 相关查询（with_related=False 时为 None），无数据时返回 None"""
+        pytrends = self._thread_client()
+        
+        # Build payload
+        pytrends.build_payload([keyword], timeframe=timeframe, geo=geo)
+        
+        # Interest over time
+        interest_df = pytrends.interest_over_time()
+        
+        if interest_df.empty or keyword not in interest_df.columns:
+            return None
+        
+        values = interest_df[keyword].values
+        
+        # 获取相关查询
+        related = self._related_queries(pytrends, [keyword]).get(keyword) if with_related else None
+        
+        return values, related
+    
+    @staticmethod
+    def _related_queries(pytrends, keywords: List[str]) -> Dict[str, Dict]:
+        """
+        只为 keywords 请求相关查询：related_queries() 对 payload 中的每个关键词各发一次请求，
+        先过滤掉其余关键词的 widget
+        
+        Returns:
+            {keyword: {'rising_queries': [...], 'top_queries': [...]}}
+        """
+        if not keywords:
+            return {}
+        wanted = set(keywords)
+        pytrends.related_queries_widget_list = [
+            widget for widget in pytrends.related_queries_widget_list
+            if widget['request']['restriction']['complexKeywordsRestriction']['keyword'][0]['value'] in wanted
+        ]
+        related_queries = pytrends.related_queries()
+        
+        related = {}
+        for keyword in keywords:
+            lists = related_queries.get(keyword) or {}
+            related[keyword] = {
+                'rising_queries': lists['rising']['query'].head(10).tolist()
+                if lists.get('rising') is not None else [],
+                'top_queries': lists['top']['query'].head(10).tolist()
+                if lists.get('top') is not None else []
+            }
+        return related
+    
+    def _build_trend_data(self, keyword: str, values, related: Optional[Dict]) -> Dict:
+        """由兴趣度序列和相关查询（见 _related_queries）构建单个关键词的趋势数据"""
+        # 计算增长率
+        growth_rate = self._calculate_growth_rate(values)
+        
+        rising_queries = (related or {}).get('rising_queries', [])
+        top_queries = (related or {}).get('top_queries', [])
+        
+        # 当前兴趣度
+        current_interest = int(values[-1])
+        
+        # 趋势方向
+        trend_direction = self._determine_trend_direction(values)
+        
+        return {
+            'keyword': keyword,
+            'source': 'google_trends',
+            'current_interest': current_interest,
+            'growth_rate': round(growth_rate, 2),
+            'trend_direction': trend_direction,  # 新增：上升/下降/稳定
+            'volatility': self._calculate_volatility(values),  # 新增：波动性
+            'rising_queries': rising_queries,
+            'top_queries': top_queries,
+            'trend_score': self._calculate_trends_score(current_interest, growth_rate, values),
+            'historical_data': values.tolist()[-30:] if len(values) > 30 else values.tolist(),  # 保存最近30天数据
+            'timestamp': datetime.utcnow().isoformat()
+        }
     
     def _calculate_growth_rate(self, values) -> float:
         """计算增长率"""
@@ -1097,53 +1820,121 @@ class EnhancedSocialMediaAggregator:
                  serpapi_key: Optional[str] = None,
                  redis_url: Optional[str] = None):
         # 初始化缓存管理器
-        cache_manager = CacheManager(redis_url=redis_url, ttl=3600)
+        cache_manager = CacheManager(
+            redis_url=redis_url,
+            ttl=3600,
+            op_timeout=float(os.getenv('REDIS_OP_TIMEOUT', '0.5')),
+            max_connections=int(os.getenv('REDIS_MAX_CONNECTIONS', '20')),
+            local_max_entries=int(os.getenv('SOCIAL_CACHE_LOCAL_MAX_ENTRIES', '2000')),
+            local_max_bytes=int(os.getenv('SOCIAL_CACHE_LOCAL_MAX_BYTES', str(16 * 1024 * 1024))),
+            near_ttl=int(os.getenv('SOCIAL_CACHE_NEAR_TTL', '60')),
+            # 未配置时由 CacheManager 按 hard TTL 的 3/4 推导
+            soft_ttl=int(os.getenv('SOCIAL_CACHE_SOFT_TTL', '0')) or None
+        )
+        self.cache = cache_manager
+        # 关键词请求频率（供后台预热选出热门关键词）
+        self.popularity = KeywordPopularity(
+            cache_manager,
+            window_days=int(os.getenv('TREND_PREWARM_WINDOW_DAYS', '7'))
+        )
         
         # 初始化收集器
         self.twitter = EnhancedTwitterCollector(twitter_token, cache_manager)
         self.reddit = EnhancedRedditCollector(reddit_id, reddit_secret, cache_manager=cache_manager)
-        self.google_trends = EnhancedGoogleTrendsCollector(cache_manager)
+        self.google_trends = EnhancedGoogleTrendsCollector(
+            cache_manager,
+            batch_size=int(os.getenv('GOOGLE_TRENDS_BATCH_SIZE', '5')),
+            min_shared_peak=int(os.getenv('GOOGLE_TRENDS_MIN_SHARED_PEAK', '5')),
+            related_ttl=int(os.getenv('GOOGLE_TRENDS_RELATED_TTL', '86400'))
+        )
         self.serpapi = EnhancedSerpAPICollector(serpapi_key, cache_manager)
         
         # 初始化聚合器
         self.signal_aggregator = CrossPlatformSignalAggregator(cache_manager)
     
+    async def rate_limit_stats(self) -> Dict:
+        """各平台的 API 配额剩余令牌和请求节奏"""
+        return {
+            'quotas': {
+                'twitter': await self.twitter.quota.stats(),
+                'reddit': await self.reddit.quota.stats()
+            },
+            'pacing': {
+                name: collector.fan_out.stats()
+                for name, collector in (
+                    ('twitter', self.twitter), ('reddit', self.reddit),
+                    ('google_trends', self.google_trends), ('serpapi', self.serpapi)
+                )
+            }
+        }
+    
+    def breaker_stats(self) -> Dict:
+        """各平台熔断器状态和当前超时"""
+        return {
+            name: collector.breaker.stats()
+            for name, collector in (
+                ('twitter', self.twitter), ('reddit', self.reddit),
+                ('google_trends', self.google_trends), ('serpapi', self.serpapi)
+            )
+        }
+    
     async def collect_all_trends(self, keywords: List[str], geo: str = 'US') -> Dict:
         """
         收集所有平台的趋势数据（兼容现有接口）
-        每个平台单独设置超时，避免一个平台慢影响整体
+        每个平台单独设置超时，避免一个平台慢影响整体；
+        超时时间由各平台熔断器按 p95 延迟给出（最多 15 秒），熔断打开的平台只返回缓存
         """
-        # 为每个平台设置独立超时（15秒，减少等待时间）
-        async def collect_with_timeout(task, platform_name, timeout=15.0):
+        async def collect_with_timeout(task, platform_name, source):
+            breaker = getattr(self, source).breaker
+            timeout = breaker.timeout()
+            started = time.monotonic()
+            failures_before = breaker.failures
             try:
-                return await asyncio.wait_for(task, timeout=timeout)
+                trends = await asyncio.wait_for(task, timeout=timeout)
             except asyncio.TimeoutError:
                 print(f"⚠️ {platform_name} collection timeout ({timeout}s), skipping")
+                # 超时时长计入延迟样本（避免超时越调越短）
+                breaker.record_latency(timeout)
+                # 单次 API 调用的失败/超时已由 breaker.call 计入；只有调用全部被取消、
+                # 熔断器没有记录到任何失败时，才把这次采集超时计为一次失败
+                if breaker.failures == failures_before:
+                    breaker.record_failure()
                 return []
             except Exception as e:
                 print(f"⚠️ {platform_name} collection failed: {e}")
                 return []
+            # 只有实际请求了平台的采集才计入延迟（全部命中缓存的采集耗时接近 0）
+            stats = cache_stats[source]
+            if stats.get('hits', 0) < stats.get('keywords', 0):
+                breaker.record_latency(time.monotonic() - started)
+            return trends
+        
+        # 记录请求频率（各收集器只使用前 5 个关键词）
+        await self.popularity.record(keywords[:5], geo)
+        
+        # 各数据源本次请求的缓存命中情况
+        cache_stats = {source: {} for source in ('twitter', 'reddit', 'google_trends', 'serpapi')}
         
-        # 并行收集，每个都有独立超时
+        # 并行收集，每个都有独立（自适应）超时
         twitter_task = collect_with_timeout(
-            self.twitter.get_trending_topics(keywords),
+            self.twitter.get_trending_topics(keywords, cache_stats=cache_stats['twitter']),
             "Twitter",
-            timeout=15.0  # 减少到15秒
+            "twitter"
         )
         reddit_task = collect_with_timeout(
-            self.reddit.get_trending_topics(keywords),
+            self.reddit.get_trending_topics(keywords, cache_stats=cache_stats['reddit']),
             "Reddit",
-            timeout=15.0  # 减少到15秒
+            "reddit"
         )
         google_task = collect_with_timeout(
-            self.google_trends.get_trending_topics(keywords, geo),
+            self.google_trends.get_trending_topics(keywords, geo, cache_stats=cache_stats['google_trends']),
             "Google Trends",
-            timeout=15.0  # 减少到15秒
+            "google_trends"
         )
         serpapi_task = collect_with_timeout(
-            self.serpapi.get_trending_topics(keywords, geo),
+            self.serpapi.get_trending_topics(keywords, geo, cache_stats=cache_stats['serpapi']),
             "SerpAPI",
-            timeout=15.0  # 15秒超时
+            "serpapi"
         )
         
         twitter_trends, reddit_trends, google_trends, serpapi_trends = await asyncio.gather(
@@ -1187,13 +1978,20 @@ class EnhancedSocialMediaAggregator:
             }
             compatible_trends.append(compatible_trend)
         
+        by_source = {
+            'twitter': twitter_trends,
+            'reddit': reddit_trends,
+            'google_trends': google_trends,
+            'serpapi': serpapi_trends if not isinstance(serpapi_trends, Exception) else []
+        }
+        
         return {
             'merged_trends': compatible_trends,
-            'by_source': {
-                'twitter': twitter_trends,
-                'reddit': reddit_trends,
-                'google_trends': google_trends,
-                'serpapi': serpapi_trends if not isinstance(serpapi_trends, Exception) else []
+            'by_source': by_source,
+            'cache': cache_stats,
+            'freshness': {
+                source: _freshness(stats, by_source[source])
+                for source, stats in cache_stats.items()
             },
             'collected_at': datetime.utcnow().isoformat()
         }
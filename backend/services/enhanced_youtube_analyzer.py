@@ -13,7 +13,11 @@ import numpy as np
 import nltk
 from nltk.corpus import stopwords
 from nltk.tokenize import word_tokenize
-from nltk import pos_tag
+from nltk import pos_tag_sents
+
+from services.nlp_memo import title_memo
+from services.keyword_matcher import audience_age_matcher, content_style_matcher
+from services.sparse_tfidf import rank_terms
 
 # Set NLTK data path
 import os
@@ -78,160 +82,166 @@ class LightweightContentAnalyzer:
         Returns:
             List of topics with scores and related terms
         """
-        # Combine all titles
-        combined_text = ' '.join(titles)
+        # 每个标题只分词 + 词性标注一次，三个提取器共用
+        parsed = self._tokenize_titles(titles)
         
         # Method 1: TF-IDF + Noun Extraction
-        tfidf_topics = self._extract_tfidf_topics(titles)
+        tfidf_topics = self._extract_tfidf_topics(titles, parsed)
         
         # Method 2: Proper Nouns (brands, products, etc.)
-        proper_nouns = self._extract_proper_nouns(combined_text)
+        proper_nouns = self._extract_proper_nouns(' '.join(titles), parsed)
         
         # Merge and rank topics
         all_topics = self._merge_topics(tfidf_topics, proper_nouns)
         
         return all_topics[:15]  # Top 15 topics
     
-    def _extract_tfidf_topics(self, titles: List[str]) -> List[Dict]:
+    def _tokenize_titles(self, titles: List[str]) -> List[Dict]:
         """
-        Use TF-IDF to extract important terms, filtered by POS tags
+        分词 + 批量词性标注（pos_tag_sents 只加载一次感知机标注器）
+        已标注过的标题直接从进程级 title_memo 中读取
+        
+        原始大小写和小写标题各分词、标注一次（同一次 pos_tag_sents 调用）：
+        专有名词依赖大小写标注；TF-IDF 名词过滤和 bigram 与原实现一致，
+        使用 word_tokenize(title.lower()) 及其标注
+        
+        Returns:
+            每个标题一项: tokens / tags（原始大小写）, lower / lower_tags（小写）
         """
-        # Preprocess: extract nouns and proper nouns only
-        processed_titles = []
+        results = {}
+        pending = []
         for title in titles:
+            if title in results:
+                continue
+            memo = title_memo.get(title)
+            if memo is not None:
+                results[title] = memo
+            else:
+                results[title] = None
+                pending.append(title)
+        
+        if pending:
+            token_lists = []
+            lower_lists = []
+            for title in pending:
+                try:
+                    token_lists.append(word_tokenize(title))
+                    lower_lists.append(word_tokenize(title.lower()))
+                except Exception as e:
+                    print(f"⚠️  Tokenization error for title '{title[:50]}...': {e}")
+                    token_lists.append([])
+                    lower_lists.append([])
+            
             try:
-                # 分词
-                words = word_tokenize(title.lower())
-                # 词性标注
-                pos_tags = pos_tag(words)
-                # 只保留名词和专有名词
-                tokens = [
-                    word for word, pos in pos_tags
-                    if pos.startswith(('NN', 'NNP'))  # NN=名词, NNP=专有名词
-                    and word not in self.stop_words
-                    and len(word) > 2
-                    and word.isalnum()
-                ]
-                processed_titles.append(' '.join(tokens))
+                tagged = pos_tag_sents(token_lists + lower_lists)
+                cased_tags, lower_tags = tagged[:len(pending)], tagged[len(pending):]
+                fresh = {
+                    title: (
+                        tuple(tokens), tuple(pos for _, pos in pairs),
+                        tuple(lower), tuple(pos for _, pos in lower_pairs)
+                    )
+                    for title, tokens, pairs, lower, lower_pairs
+                    in zip(pending, token_lists, cased_tags, lower_lists, lower_tags)
+                }
+                title_memo.set_many(fresh)
             except Exception as e:
-                print(f"⚠️  Tokenization error for title '{title[:50]}...': {e}")
-                continue
+                # 标注失败的结果不写入缓存
+                print(f"⚠️  POS tagging error: {e}")
+                fresh = {
+                    title: (tuple(tokens), ('',) * len(tokens), tuple(lower), ('',) * len(lower))
+                    for title, tokens, lower in zip(pending, token_lists, lower_lists)
+                }
+            results.update(fresh)
         
-        if not any(processed_titles):
-            return []
+        parsed = []
+        for title in titles:
+            tokens, tags, lower, lower_tags = results[title]
+            parsed.append({
+                'tokens': tokens,
+                'tags': tags,
+                'lower': lower,
+                'lower_tags': lower_tags
+            })
+        return parsed
+    
+    def _extract_tfidf_topics(self, titles: List[str], parsed: Optional[List[Dict]] = None) -> List[Dict]:
+        """
+        Use TF-IDF to extract important terms, filtered by POS tags
+        """
+        if parsed is None:
+            parsed = self._tokenize_titles(titles)
         
-        # 简单的 TF-IDF 计算
-        # 1. 计算词频 (TF)
-        all_words = []
-        for title in processed_titles:
-            all_words.extend(title.split())
-        
-        word_freq = Counter(all_words)
-        
-        # 2. 计算文档频率 (DF)
-        doc_freq = Counter()
-        for title in processed_titles:
-            unique_words = set(title.split())
-            for word in unique_words:
-                doc_freq[word] += 1
-        
-        # 3. 计算 TF-IDF
-        num_docs = len(titles)
-        tfidf_scores = {}
-        
-        for word, tf in word_freq.items():
-            df = doc_freq[word]
-            # TF-IDF = (TF / total_words) * log(N / DF)
-            idf = np.log(num_docs / df) if df > 0 else 0
-            tfidf_scores[word] = (tf / len(all_words)) * idf if all_words else 0
-        
-        # 4. 提取 bigrams (两词组合)
-        bigrams = self._extract_bigrams(titles)
-        for bigram, count in bigrams.items():
-            # 给短语更高的权重
-            tfidf_scores[bigram] = count * 1.5
-        
-        # 5. 归一化分数到 0-1 范围
-        if tfidf_scores:
-            max_score = max(tfidf_scores.values())
-            min_score = min(tfidf_scores.values())
-            score_range = max_score - min_score if max_score > min_score else 1.0
-            
-            # 归一化: (score - min) / range
-            normalized_scores = {
-                word: (score - min_score) / score_range if score_range > 0 else 0.5
-                for word, score in tfidf_scores.items()
-            }
-        else:
-            normalized_scores = {}
-        
-        # 6. 排序并返回
-        topics = [
-            {
-                'topic': word,
-                'score': float(normalized_scores.get(word, 0.0)),  # 使用归一化后的分数
-                'type': 'tfidf',
-                'frequency': word_freq.get(word, bigrams.get(word, 1))
-            }
-            for word, score in sorted(tfidf_scores.items(), key=lambda x: x[1], reverse=True)
+        # Preprocess: extract nouns and proper nouns only
+        processed_titles = [
+            [
+                word for word, pos in zip(item['lower'], item['lower_tags'])
+                if pos.startswith(('NN', 'NNP'))  # NN=名词, NNP=专有名词
+                and word not in self.stop_words
+                and len(word) > 2
+                and word.isalnum()
+            ]
+            for item in parsed
         ]
         
-        return topics[:20]
+        if not any(processed_titles):
+            return []
+        
+        # CSR 词项-文档矩阵上向量化计算 TF、DF 和 TF-IDF = (TF / total_words) * log(N / DF)；
+        # bigrams (两词组合) 给短语更高的权重；归一化到 0-1 后取前 20（同分保持原顺序）
+        bigrams = self._extract_bigrams(titles, parsed)
+        return [{**topic, 'type': 'tfidf'} for topic in rank_terms(processed_titles, bigrams, k=20)]
     
-    def _extract_bigrams(self, titles: List[str]) -> Counter:
+    def _extract_bigrams(self, titles: List[str], parsed: Optional[List[Dict]] = None) -> Counter:
         """提取有意义的双词组合"""
+        if parsed is None:
+            parsed = self._tokenize_titles(titles)
+        
         bigrams = []
         
-        for title in titles:
-            try:
-                words = word_tokenize(title.lower())
-                words = [w for w in words if w.isalnum() and w not in self.stop_words]
-                
-                # 生成 bigrams
-                for i in range(len(words) - 1):
-                    bigram = f"{words[i]} {words[i+1]}"
-                    bigrams.append(bigram)
-            except Exception as e:
-                continue
+        for item in parsed:
+            words = [w for w in item['lower'] if w.isalnum() and w not in self.stop_words]
+            
+            # 生成 bigrams
+            for i in range(len(words) - 1):
+                bigram = f"{words[i]} {words[i+1]}"
+                bigrams.append(bigram)
         
         # 只保留出现 2 次以上的 bigrams
         bigram_counts = Counter(bigrams)
         return Counter({k: v for k, v in bigram_counts.items() if v >= 2})
     
-    def _extract_proper_nouns(self, text: str) -> List[Dict]:
+    def _extract_proper_nouns(self, text: str, parsed: Optional[List[Dict]] = None) -> List[Dict]:
         """
         提取专有名词（品牌、产品、人名等）
-        使用 NLTK 词性标注
+        使用 NLTK 词性标注（parsed 为已标注的标题；短语不跨标题拼接）
         """
         try:
             # 分词和词性标注
-            words = word_tokenize(text)
-            pos_tags = pos_tag(words)
+            if parsed is None:
+                parsed = self._tokenize_titles([text])
             
             # 提取专有名词 (NNP, NNPS)
             proper_nouns = []
-            i = 0
-            while i < len(pos_tags):
-                word, pos = pos_tags[i]
-                
-                # 连续的专有名词组合在一起
-                if pos in ['NNP', 'NNPS']:
-                    noun_phrase = [word]
-                    j = i + 1
-                    
-                    # 查找连续的专有名词
-                    while j < len(pos_tags) and pos_tags[j][1] in ['NNP', 'NNPS']:
-                        noun_phrase.append(pos_tags[j][0])
-                        j += 1
-                    
-                    # 组合成短语
-                    phrase = ' '.join(noun_phrase)
-                    if len(phrase) > 2:  # 至少3个字符
-                        proper_nouns.append(phrase.lower())
-                    
-                    i = j
-                else:
-                    i += 1
+            for item in parsed:
+                words, tags = item['tokens'], item['tags']
+                i = 0
+                while i < len(tags):
+                    # 连续的专有名词组合在一起
+                    if tags[i] in ['NNP', 'NNPS']:
+                        j = i + 1
+                        
+                        # 查找连续的专有名词
+                        while j < len(tags) and tags[j] in ['NNP', 'NNPS']:
+                            j += 1
+                        
+                        # 组合成短语
+                        phrase = ' '.join(words[i:j])
+                        if len(phrase) > 2:  # 至少3个字符
+                            proper_nouns.append(phrase.lower())
+                        
+                        i = j
+                    else:
+                        i += 1
             
             # 统计频率
             noun_freq = Counter(proper_nouns)
@@ -339,22 +349,13 @@ class LightweightContentAnalyzer:
         titles = [v['title'] for v in videos]
         combined = ' '.join(titles).lower()
         
-        styles = {
-            'tutorial': ['how to', 'tutorial', 'guide', 'tips', 'learn'],
-            'review': ['review', 'unboxing', 'first look', 'hands on', 'vs'],
-            'entertainment': ['funny', 'prank', 'challenge', 'compilation', 'fails'],
-            'news': ['news', 'update', 'breaking', 'latest', 'today'],
-            'educational': ['explained', 'science', 'history', 'documentary'],
-            'gaming': ['gameplay', 'walkthrough', 'let\'s play', 'speedrun'],
-            'tech': ['tech', 'gadget', 'phone', 'laptop', 'specs']
+        # 风格关键词见 keyword_categories.json（content_styles），一次扫描得到所有风格的计数
+        style_scores = {
+            style: score
+            for style, score in content_style_matcher.count(combined).items()
+            if score > 0
         }
         
-        style_scores = {}
-        for style, keywords in styles.items():
-            score = sum(combined.count(kw) for kw in keywords)
-            if score > 0:
-                style_scores[style] = score
-        
         sorted_styles = sorted(style_scores.items(), key=lambda x: x[1], reverse=True)
         
         return {
@@ -371,20 +372,13 @@ class LightweightAudienceAnalyzer:
         """分析目标受众"""
         titles_text = ' '.join([v['title'] for v in videos]).lower()
         
-        # 年龄段分析
-        age_indicators = {
-            '18-24岁 (年轻人)': ['college', 'meme', 'viral', 'tiktok', 'trending'],
-            '25-34岁 (职场)': ['career', 'productivity', 'business', 'startup'],
-            '35-44岁 (成熟)': ['professional', 'investment', 'finance', 'management'],
-            '全年龄': ['tutorial', 'guide', 'beginner', 'how to']
+        # 年龄段分析（关键词见 keyword_categories.json 的 audience_age_groups）
+        age_scores = {
+            age_group: score
+            for age_group, score in audience_age_matcher.distinct(titles_text).items()
+            if score > 0
         }
         
-        age_scores = {}
-        for age_group, keywords in age_indicators.items():
-            score = sum(1 for kw in keywords if kw in titles_text)
-            if score > 0:
-                age_scores[age_group] = score
-        
         primary_age = max(age_scores.items(), key=lambda x: x[1])[0] if age_scores else '18-24岁 (年轻人)'
         
         # 互动水平
@@ -0,0 +1,105 @@
+"""
+Fast Forecaster - 纯 NumPy 的批量趋势预测（Prophet 的轻量替代）
+Prophet 每次拟合需要启动 cmdstan（约 1 秒以上），小内存机器上经常直接不可用；
+这里用 线性趋势 + 周季节性（傅里叶项）的最小二乘回归，
+所有关键词作为一个矩阵问题一次求解，预测区间用解析公式给出
+
+模型（与 Prophet 的 growth='linear' + weekly_seasonality 对应）:
+    y(t) = a + b·t + Σ_k [c_k·sin(2πk·d/7) + s_k·cos(2πk·d/7)] + ε,  ε ~ N(0, σ²)
+    d = 距 1970-01-01 的天数（决定星期几），t = 按历史跨度归一化的时间
+"""
+
+from statistics import NormalDist
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+_DAY_NS = 86400 * 10 ** 9
+
+
+class BatchedSeasonalForecaster:
+    """
+    批量线性趋势 + 周季节性回归
+
+    日期网格相同的关键词（例如同一时间段的每日历史）共享一个设计矩阵，
+    一次 QR 分解后所有关键词的系数为 B = R⁻¹ Qᵀ Y（Y 每列一个关键词）；
+    日期网格不同的关键词按网格分组，每组各求解一次
+    """
+
+    def __init__(self, weekly_order: int = 3, interval_width: float = 0.80):
+        self.weekly_order = weekly_order
+        self.interval_width = interval_width
+        # 双侧预测区间的正态分位数（80% -> 1.2816）
+        self._z = NormalDist().inv_cdf(0.5 + interval_width / 2)
+
+    def _design(self, days: np.ndarray, origin: float, span: float) -> np.ndarray:
+        columns = [np.ones_like(days), (days - origin) / span]
+        for k in range(1, self.weekly_order + 1):
+            angle = 2 * np.pi * k * days / 7.0
+            columns.extend([np.sin(angle), np.cos(angle)])
+        return np.column_stack(columns)
+
+    def forecast(self, histories: Dict[str, pd.DataFrame], forecast_days: int) -> Dict[str, Dict]:
+        """
+        Args:
+            histories: {keyword: DataFrame(date, composite_score)}
+            forecast_days: 预测天数
+
+        Returns:
+            {keyword: {'ds': DatetimeIndex, 'yhat', 'yhat_lower', 'yhat_upper': ndarray}}，
+            列与 Prophet 的 predict(make_future_dataframe(...)) 相同，包含历史行 + 未来行；
+            不为每个关键词构造 DataFrame（数百个关键词时这是主要开销）
+        """
+        groups: Dict[bytes, List[str]] = {}
+        grids: Dict[bytes, np.ndarray] = {}
+        for keyword, df in histories.items():
+            dates = df['date']
+            if not pd.api.types.is_datetime64_dtype(dates):
+                dates = pd.to_datetime(dates)
+            stamps = dates.values.astype('datetime64[ns]').astype(np.int64)
+            signature = stamps.tobytes()
+            groups.setdefault(signature, []).append(keyword)
+            grids[signature] = stamps
+
+        results = {}
+        for signature, keywords in groups.items():
+            stamps = grids[signature]
+            future = stamps[-1] + np.arange(1, forecast_days + 1, dtype=np.int64) * _DAY_NS
+            all_stamps = np.concatenate([stamps, future])
+            days = all_stamps / _DAY_NS
+            origin = days[0]
+            span = max(days[len(stamps) - 1] - origin, 1.0)
+            X_all = self._design(days, origin, span)
+            X = X_all[:len(stamps)]
+
+            Y = np.column_stack([
+                histories[keyword]['composite_score'].astype(float).values for keyword in keywords
+            ])
+            n, p = X.shape
+
+            # 最小二乘：X = QR，B = R⁻¹QᵀY（所有关键词一次求解）
+            Q, R = np.linalg.qr(X)
+            B = np.linalg.solve(R, Q.T @ Y)
+            residuals = Y - X @ B
+            dof = max(n - p, 1)
+            sigma = np.sqrt((residuals ** 2).sum(axis=0) / dof)
+
+            # 预测区间：ŷ ± z·σ·sqrt(1 + x₀ᵀ(XᵀX)⁻¹x₀)，(XᵀX)⁻¹ = R⁻¹R⁻ᵀ
+            R_inv = np.linalg.inv(R)
+            leverage = ((X_all @ R_inv) ** 2).sum(axis=1)
+            half_width = self._z * np.sqrt(1.0 + leverage)[:, None] * sigma[None, :]
+
+            yhat = X_all @ B
+            ds = pd.to_datetime(all_stamps)
+            lower = yhat - half_width
+            upper = yhat + half_width
+            for column, keyword in enumerate(keywords):
+                results[keyword] = {
+                    'ds': ds,
+                    'yhat': yhat[:, column],
+                    'yhat_lower': lower[:, column],
+                    'yhat_upper': upper[:, column]
+                }
+
+        return results
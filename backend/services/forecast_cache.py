@@ -0,0 +1,153 @@
+"""
+Forecast Cache - Prophet 预测结果缓存
+predict_trend 每次都在同样的 60 天历史上重新 model.fit；
+历史数据没有新数据点时结果不变，这里按
+(keyword, forecast_days, 历史数据水位线, 模型参数) 缓存预测帧和派生指标
+
+- 内存层：有界 LRU（条目数上限）
+- 磁盘层（可选）：SQLite，重启后仍可复用，Prophet 进程池的各个子进程共享
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import pandas as pd
+
+
+def history_watermark(historical_df: pd.DataFrame) -> Dict:
+    """历史数据水位线：最后一个时间点 + 行数（新数据点到来或历史被补全时变化）"""
+    return {
+        'last_date': pd.Timestamp(historical_df['date'].iloc[-1]).isoformat(),
+        'rows': int(len(historical_df))
+    }
+
+
+def forecast_key(keyword: str, forecast_days: int, watermark: Dict, params: Dict) -> str:
+    payload = json.dumps([keyword, forecast_days, watermark, params], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ForecastCache:
+    """
+    预测结果的有界 LRU
+
+    条目以 JSON 字符串保存，每次 get 都返回新的对象，调用方可以直接修改
+    """
+
+    def __init__(self, max_entries: int = 256, disk_path: Optional[str] = None,
+                 disk_max_age: float = 7 * 86400):
+        self.max_entries = max_entries
+        self.disk_path = disk_path
+        self.disk_max_age = disk_max_age
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
+        self._disk_writes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    # ---------- 磁盘层 ----------
+
+    def _disk(self) -> Optional[sqlite3.Connection]:
+        """按进程打开 SQLite 连接（fork 出的子进程不能复用父进程连接）"""
+        if not self.disk_path:
+            return None
+        if self._conn is not None and self._conn_pid == os.getpid():
+            return self._conn
+        try:
+            conn = sqlite3.connect(self.disk_path, timeout=2.0, check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS forecasts "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            conn.commit()
+            self._conn, self._conn_pid = conn, os.getpid()
+            return conn
+        except sqlite3.Error as e:
+            print(f"⚠️ Forecast cache disk store disabled: {e}")
+            self.disk_path = None
+            return None
+
+    def _disk_get(self, key: str) -> Optional[str]:
+        conn = self._disk()
+        if conn is None:
+            return None
+        try:
+            row = conn.execute("SELECT value FROM forecasts WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error:
+            return None
+        return row[0] if row else None
+
+    def _disk_set(self, key: str, payload: str):
+        conn = self._disk()
+        if conn is None:
+            return
+        try:
+            now = time.time()
+            conn.execute(
+                "INSERT OR REPLACE INTO forecasts (key, value, created_at) VALUES (?, ?, ?)",
+                (key, payload, now)
+            )
+            self._disk_writes += 1
+            # 水位线变化后旧条目不会再命中，定期清理
+            if self._disk_writes % 100 == 1:
+                conn.execute("DELETE FROM forecasts WHERE created_at < ?", (now - self.disk_max_age,))
+            conn.commit()
+        except sqlite3.Error as e:
+            print(f"⚠️ Forecast cache disk write failed: {e}")
+
+    # ---------- 公共接口 ----------
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return json.loads(payload)
+            payload = self._disk_get(key)
+            if payload is not None:
+                self.disk_hits += 1
+                self._put(key, payload)
+                return json.loads(payload)
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: Dict):
+        payload = json.dumps(value, default=str)
+        with self._lock:
+            self._put(key, payload)
+            self._disk_set(key, payload)
+
+    def _put(self, key: str, payload: str):
+        self._entries[key] = payload
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'disk_store': self.disk_path,
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': round((self.hits + self.disk_hits) / lookups, 3) if lookups else 0.0
+        }
+
+
+# 全局实例（每个进程一份；设置 PROPHET_FORECAST_CACHE_PATH 后通过 SQLite 共享）
+forecast_cache = ForecastCache(
+    max_entries=int(os.getenv('PROPHET_FORECAST_CACHE_SIZE', '256')),
+    disk_path=os.getenv('PROPHET_FORECAST_CACHE_PATH') or None
+)
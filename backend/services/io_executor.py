@@ -0,0 +1,112 @@
+"""
+I/O Executor - 在有界线程池中执行阻塞的 SDK 调用
+tweepy / praw / pytrends 都是同步库，直接在 async def 中调用会阻塞事件循环，
+导致外层 asyncio.wait_for 的超时无法触发、整个服务在请求期间无响应
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+class IOExecutorFull(RuntimeError):
+    """线程池和等待队列都已占满（通常是平台无响应，超时的调用仍占着线程）"""
+
+
+class BlockingIOExecutor:
+    """
+    有界 I/O 线程池
+
+    - 线程数固定（max_workers），所有社交数据收集器共享
+    - 每次调用都有超时：超时后立即返回给事件循环（抛出 asyncio.TimeoutError），
+      线程中的调用在后台自行结束（同步 SDK 无法被强制中断）
+    - 已提交但尚未结束的调用（包括超时后仍在线程中运行的）最多
+      max_workers + max_queue 个，超出时立即抛出 IOExecutorFull，
+      不在无界队列中排队等到超时
+    """
+
+    def __init__(self, max_workers: int = 12, timeout: float = 12.0, name: str = 'social-io',
+                 max_queue: int = 24):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.name = name
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        # 统计
+        self._running = 0
+        self._pending = 0      # 已提交、线程中尚未结束（由工作线程回调递减）
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix=self.name
+            )
+        return self._executor
+
+    async def run(self, func: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        在线程池中执行 func(*args, **kwargs)，超过 timeout 秒抛出 asyncio.TimeoutError；
+        线程池和队列已满时立即抛出 IOExecutorFull
+        """
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise IOExecutorFull(f"{self.name} executor full ({self._pending} calls pending)")
+            self._pending += 1
+        # 直接提交到线程池：超时取消的只是 asyncio 侧的等待，
+        # 线程中的调用真正结束时才释放名额
+        submitted = self._get_executor().submit(func, *args, **kwargs)
+        submitted.add_done_callback(self._release)
+        future = asyncio.wrap_future(submitted)
+        self._running += 1
+        try:
+            result = await asyncio.wait_for(future, timeout=timeout or self.timeout)
+            self.completed += 1
+            return result
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self._running -= 1
+
+    def _release(self, _: Future):
+        with self._lock:
+            self._pending -= 1
+
+    def shutdown(self):
+        """关闭线程池（在 lifespan 结束阶段调用）"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> Dict:
+        return {
+            'max_workers': self.max_workers,
+            'max_queue': self.max_queue,
+            'timeout_seconds': self.timeout,
+            'running': self._running,
+            'pending': self._pending,
+            'completed': self.completed,
+            'failed': self.failed,
+            'timeouts': self.timeouts,
+            'rejected': self.rejected
+        }
+
+
+# 全局实例（所有社交数据收集器共享）
+social_io_executor = BlockingIOExecutor(
+    max_workers=int(os.getenv('SOCIAL_IO_WORKERS', '12')),
+    timeout=float(os.getenv('SOCIAL_IO_TIMEOUT', '12')),
+    max_queue=int(os.getenv('SOCIAL_IO_MAX_QUEUE', '24'))
+)
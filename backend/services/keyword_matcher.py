@@ -0,0 +1,102 @@
+"""
+Keyword Matcher - 多模式关键词匹配
+内容风格、受众年龄段、内容主题的识别原本对每个关键词分别执行
+text.count(kw) / kw in text，复杂度为 O(关键词数 × 文本长度)；
+这里把所有关键词编译成一个正则，对文本只扫描一次，同时得到所有类别的计数
+
+类别词典是可加载的配置（services/keyword_categories.json），
+可通过 KEYWORD_CATEGORIES_PATH 指定额外的 JSON 文件追加/覆盖类别
+"""
+
+import json
+import os
+import re
+from collections import Counter
+from typing import Dict, List, Optional
+
+DEFAULT_CATEGORIES_PATH = os.path.join(os.path.dirname(__file__), 'keyword_categories.json')
+
+
+def load_keyword_categories(path: Optional[str] = None) -> Dict[str, Dict[str, List[str]]]:
+    """
+    加载类别词典 {分组: {类别: [关键词, ...]}}
+
+    先加载内置配置，再用 path（或 KEYWORD_CATEGORIES_PATH）中的同名分组/类别覆盖
+    """
+    with open(DEFAULT_CATEGORIES_PATH, encoding='utf-8') as f:
+        groups = json.load(f)
+
+    extra_path = path or os.getenv('KEYWORD_CATEGORIES_PATH')
+    if extra_path:
+        try:
+            with open(extra_path, encoding='utf-8') as f:
+                for group, categories in json.load(f).items():
+                    groups.setdefault(group, {}).update(categories)
+            print(f"✅ Loaded keyword categories from {extra_path}")
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Failed to load keyword categories from {extra_path}: {e}")
+
+    return groups
+
+
+class KeywordMatcher:
+    """
+    预编译的多模式匹配器
+
+    计数语义与逐个关键词执行 text.count(kw) 完全一致：
+    同一关键词不重叠计数，不同关键词之间可以重叠（如 'game' 与 'gameplay'）
+    """
+
+    def __init__(self, categories: Dict[str, List[str]]):
+        self.categories = {category: list(keywords) for category, keywords in categories.items()}
+        keywords = sorted(
+            {kw.lower() for kws in self.categories.values() for kw in kws if kw},
+            key=len, reverse=True
+        )
+        # 每个位置只能捕获最长的关键词，较短的前缀关键词由 _prefixes 补齐
+        self._prefixes = {
+            kw: [other for other in keywords if other != kw and kw.startswith(other)]
+            for kw in keywords
+        }
+        self._pattern = (
+            re.compile('(?=(' + '|'.join(re.escape(kw) for kw in keywords) + '))')
+            if keywords else None
+        )
+
+    def keyword_counts(self, text: str) -> Counter:
+        """扫描一次文本，返回每个关键词的出现次数（text 需已小写）"""
+        counts: Counter = Counter()
+        if self._pattern is None or not text:
+            return counts
+        last_end: Dict[str, int] = {}
+        for match in self._pattern.finditer(text):
+            start = match.start()
+            longest = match.group(1)
+            for kw in (longest, *self._prefixes[longest]):
+                if start >= last_end.get(kw, 0):
+                    counts[kw] += 1
+                    last_end[kw] = start + len(kw)
+        return counts
+
+    def count(self, text: str) -> Dict[str, int]:
+        """每个类别所有关键词的出现次数之和（等价于 sum(text.count(kw))）"""
+        counts = self.keyword_counts(text)
+        return {
+            category: sum(counts[kw.lower()] for kw in keywords)
+            for category, keywords in self.categories.items()
+        }
+
+    def distinct(self, text: str) -> Dict[str, int]:
+        """每个类别中出现过的关键词个数（等价于 sum(kw in text)）"""
+        counts = self.keyword_counts(text)
+        return {
+            category: sum(1 for kw in keywords if counts[kw.lower()])
+            for category, keywords in self.categories.items()
+        }
+
+
+# 全局实例
+keyword_categories = load_keyword_categories()
+content_style_matcher = KeywordMatcher(keyword_categories.get('content_styles', {}))
+audience_age_matcher = KeywordMatcher(keyword_categories.get('audience_age_groups', {}))
+content_theme_matcher = KeywordMatcher(keyword_categories.get('content_themes', {}))
@@ -0,0 +1,186 @@
+"""
+NLP Title Memo - 进程级的标题分词/词性标注结果缓存
+同一频道的标题在每次分析、回测（逐个异常视频调用 extract_topics_from_titles）中
+会被反复标注，这里按规范化标题的哈希缓存
+(tokens, tags, lower_tokens, lower_tags)：原始大小写和小写两套分词/标注结果
+
+- 内存层：有界 LRU（条目数上限 + 总字符数上限，异常长的标题不会撑大内存）
+- 磁盘层（可选）：SQLite，重启后仍可复用，多个进程共享
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+# (tokens, tags, lower_tokens, lower_tags)
+ParsedTitle = Tuple[Tuple[str, ...], Tuple[str, ...], Tuple[str, ...], Tuple[str, ...]]
+PARSED_FIELDS = 4
+
+COUNTER_FIELDS = ('hits', 'disk_hits', 'misses')
+
+
+def title_key(title: str) -> str:
+    """
+    规范化标题（合并空白）后取哈希
+    不转小写：词性标注依赖大小写
+    """
+    normalized = ' '.join(title.split())
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+
+class TitleParseMemo:
+    """
+    标题 → (tokens, tags, lower_tokens, lower_tags) 的有界 LRU
+
+    - 条目数不超过 max_entries，所有条目 token/tag 的总字符数不超过 max_chars
+      （普通标题每条约 200 字符，默认两个上限大致对应；超过 max_chars 的单个条目不放入内存层）
+    - 缓存的值是不可变的 tuple，调用方无需拷贝
+    """
+
+    def __init__(self, max_entries: int = 10000, disk_path: Optional[str] = None,
+                 max_chars: int = 2_000_000):
+        self.max_entries = max_entries
+        self.max_chars = max_chars
+        self.disk_path = disk_path
+        self._entries: "OrderedDict[str, ParsedTitle]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._chars = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    # ---------- 磁盘层 ----------
+
+    def _disk(self) -> Optional[sqlite3.Connection]:
+        """按进程打开 SQLite 连接（fork 出的子进程不能复用父进程连接）"""
+        if not self.disk_path:
+            return None
+        if self._conn is not None and self._conn_pid == os.getpid():
+            return self._conn
+        try:
+            conn = sqlite3.connect(self.disk_path, timeout=2.0, check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS title_parse (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+            conn.commit()
+            self._conn, self._conn_pid = conn, os.getpid()
+            return conn
+        except sqlite3.Error as e:
+            print(f"⚠️ NLP title memo disk store disabled: {e}")
+            self.disk_path = None
+            return None
+
+    def _disk_get(self, key: str) -> Optional[ParsedTitle]:
+        conn = self._disk()
+        if conn is None:
+            return None
+        try:
+            row = conn.execute("SELECT value FROM title_parse WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None:
+            return None
+        value = json.loads(row[0])
+        if len(value) != PARSED_FIELDS:
+            # 旧格式（只有原始大小写的结果）：按未命中处理，重新标注后覆盖
+            return None
+        return tuple(tuple(part) for part in value)
+
+    def _disk_set_many(self, items: List[Tuple[str, ParsedTitle]]):
+        conn = self._disk()
+        if conn is None or not items:
+            return
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO title_parse (key, value) VALUES (?, ?)",
+                [(key, json.dumps([list(part) for part in value])) for key, value in items]
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            print(f"⚠️ NLP title memo disk write failed: {e}")
+
+    # ---------- 公共接口 ----------
+
+    def get(self, title: str) -> Optional[ParsedTitle]:
+        key = title_key(title)
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            value = self._disk_get(key)
+            if value is not None:
+                self.disk_hits += 1
+                self._put(key, value)
+                return value
+            self.misses += 1
+            return None
+
+    def set_many(self, parsed: Dict[str, ParsedTitle]):
+        """批量写入 {title: (tokens, tags, lower_tokens, lower_tags)}"""
+        items = [(title_key(title), tuple(tuple(part) for part in value)) for title, value in parsed.items()]
+        with self._lock:
+            for key, value in items:
+                self._put(key, value)
+            self._disk_set_many(items)
+
+    def _put(self, key: str, value: ParsedTitle):
+        size = _parsed_chars(value)
+        if size > self.max_chars:
+            return
+        if key in self._entries:
+            self._chars -= self._sizes[key]
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        self._sizes[key] = size
+        self._chars += size
+        while len(self._entries) > self.max_entries or self._chars > self.max_chars:
+            oldest, _ = self._entries.popitem(last=False)
+            self._chars -= self._sizes.pop(oldest)
+
+    def counters(self) -> Dict[str, int]:
+        """累计计数（执行器用它计算子进程中每个任务的增量）"""
+        return {field: getattr(self, field) for field in COUNTER_FIELDS}
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'chars': self._chars,
+            'max_chars': self.max_chars,
+            'disk_store': self.disk_path,
+            **self.counters(),
+            'hit_rate': round((self.hits + self.disk_hits) / lookups, 3) if lookups else 0.0
+        }
+
+
+def _parsed_chars(value: ParsedTitle) -> int:
+    """条目大小：所有 token 和 tag 的字符数之和"""
+    return sum(len(item) for part in value for item in part)
+
+
+def merge_counter_stats(counters: Dict[str, int]) -> Dict:
+    """由累计计数计算命中率（用于汇总进程池子进程中的计数）"""
+    lookups = sum(counters.get(field, 0) for field in COUNTER_FIELDS)
+    hits = counters.get('hits', 0) + counters.get('disk_hits', 0)
+    return {
+        **{field: counters.get(field, 0) for field in COUNTER_FIELDS},
+        'hit_rate': round(hits / lookups, 3) if lookups else 0.0
+    }
+
+
+# 全局实例（每个进程一份；设置 NLP_TITLE_MEMO_PATH 后通过 SQLite 共享）
+title_memo = TitleParseMemo(
+    max_entries=int(os.getenv('NLP_TITLE_MEMO_SIZE', '10000')),
+    disk_path=os.getenv('NLP_TITLE_MEMO_PATH') or None,
+    max_chars=int(os.getenv('NLP_TITLE_MEMO_MAX_CHARS', '2000000'))
+)
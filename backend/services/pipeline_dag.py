@@ -0,0 +1,179 @@
+"""
+Pipeline DAG - 按依赖关系并行执行分析流水线的各个阶段
+没有依赖关系的阶段（如回测与 Prophet 预测）同时运行，
+并记录每个阶段的墙钟时间和 CPU 时间，用于找出关键路径
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from services.cpu_executor import cpu_time_scope
+
+
+# 当前阶段协程在事件循环线程上的 CPU 时间累加器（每个阶段任务各自设置）
+_inline_cpu: ContextVar[Optional[List[float]]] = ContextVar('inline_cpu', default=None)
+
+
+@contextmanager
+def inline_cpu_scope():
+    """
+    统计作用域内 _InlineCPUTimer 包装的协程在事件循环线程上的 CPU 时间
+
+    Yields:
+        单元素列表 [cpu_seconds]，作用域结束后读取
+    """
+    acc = [0.0]
+    token = _inline_cpu.set(acc)
+    try:
+        yield acc
+    finally:
+        _inline_cpu.reset(token)
+
+
+class _InlineCPUTimer:
+    """
+    等待阶段协程，并在它每一步执行前后取 time.thread_time() 差值，
+    累加到当前 inline_cpu_scope（不包括挂起等待期间其他任务的时间）
+
+    委托语义与 await / yield from 相同：取消等异常原样传入阶段协程，
+    close()（GeneratorExit）关闭阶段协程后继续向外传播。
+    阶段内部用 create_task / gather 派生的子任务是独立的任务，不计入
+    """
+
+    def __init__(self, coro: Awaitable):
+        self._coro = coro
+
+    def __await__(self):
+        coro = self._coro.__await__()
+        acc = _inline_cpu.get()
+        send, error = None, None
+        while True:
+            start = time.thread_time()
+            try:
+                if error is None:
+                    yielded = coro.send(send)
+                else:
+                    yielded = coro.throw(error)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                if acc is not None:
+                    acc[0] += time.thread_time() - start
+            try:
+                send, error = (yield yielded), None
+            except GeneratorExit:
+                coro.close()
+                raise
+            except BaseException as e:
+                send, error = None, e
+
+
+class PipelineDAG:
+    """
+    简单的异步依赖图
+
+    用法:
+        dag = PipelineDAG()
+        dag.add_stage('a', stage_a)
+        dag.add_stage('b', stage_b, depends_on=['a'])
+        ctx = await dag.run()   # ctx['a'], ctx['b'] 为各阶段返回值
+
+    每个阶段函数签名为 async stage(ctx) -> result，只能读取其依赖阶段的结果。
+    任一阶段抛出异常时取消其余阶段并向上抛出。
+    """
+
+    def __init__(self):
+        self._stages: "OrderedDict[str, Dict]" = OrderedDict()
+        self._timings: Dict[str, Dict] = {}
+
+    def add_stage(self, name: str, func: Callable[[Dict], Awaitable[Any]],
+                  depends_on: Sequence[str] = ()):
+        """
+        添加阶段（依赖必须先添加，保证无环）
+        """
+        if name in self._stages:
+            raise ValueError(f"Duplicate stage: {name}")
+        missing = [d for d in depends_on if d not in self._stages]
+        if missing:
+            raise ValueError(f"Stage '{name}' depends on unknown stage(s): {missing}")
+        self._stages[name] = {'func': func, 'depends_on': list(depends_on)}
+
+    async def run(self, ctx: Optional[Dict] = None) -> Dict:
+        """
+        执行所有阶段
+
+        Returns:
+            ctx: 阶段名 -> 返回值
+        """
+        ctx = ctx if ctx is not None else {}
+        tasks: Dict[str, asyncio.Task] = {}
+        origin = time.perf_counter()
+
+        async def run_stage(name: str, stage: Dict):
+            if stage['depends_on']:
+                await asyncio.gather(*(tasks[d] for d in stage['depends_on']))
+            start = time.perf_counter()
+            with cpu_time_scope() as cpu, inline_cpu_scope() as inline:
+                try:
+                    ctx[name] = await _InlineCPUTimer(stage['func'](ctx))
+                finally:
+                    end = time.perf_counter()
+                    self._timings[name] = {
+                        'start_offset_seconds': round(start - origin, 3),
+                        'end_offset_seconds': round(end - origin, 3),
+                        'wall_seconds': round(end - start, 3),
+                        'cpu_seconds': round(cpu[0] + inline[0], 3),
+                        'executor_cpu_seconds': round(cpu[0], 3),
+                        'inline_cpu_seconds': round(inline[0], 3),
+                        'depends_on': stage['depends_on']
+                    }
+
+        for name, stage in self._stages.items():
+            tasks[name] = asyncio.create_task(run_stage(name, stage))
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+
+        return ctx
+
+    def stats(self) -> Dict[str, Dict]:
+        """
+        各阶段耗时
+
+        - wall_seconds: 墙钟时间
+        - executor_cpu_seconds: 通过 cpu_executor 执行的任务消耗的 CPU 时间
+        - inline_cpu_seconds: 阶段协程直接在事件循环上消耗的 CPU 时间
+        - cpu_seconds: 两者之和
+        """
+        return {name: self._timings[name] for name in self._stages if name in self._timings}
+
+    def critical_path(self) -> Dict:
+        """
+        关键路径：从最后结束的阶段开始，沿“最晚结束的依赖”回溯
+        """
+        if not self._timings:
+            return {'stages': [], 'wall_seconds': 0.0}
+
+        current = max(self._timings, key=lambda n: self._timings[n]['end_offset_seconds'])
+        path: List[str] = [current]
+        while self._timings[current]['depends_on']:
+            current = max(
+                self._timings[current]['depends_on'],
+                key=lambda n: self._timings[n]['end_offset_seconds']
+            )
+            path.append(current)
+        path.reverse()
+
+        return {
+            'stages': path,
+            'wall_seconds': self._timings[path[-1]]['end_offset_seconds']
+        }
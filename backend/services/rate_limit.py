@@ -0,0 +1,177 @@
+"""
+Rate Limiting - 异步令牌桶
+- TokenBucket: 社交数据收集器用它控制请求节奏（替代每个关键词之后固定的 asyncio.sleep）
+- QuotaLimiter: API 配额（如 Twitter 15 次/15 分钟），可选 Redis 共享状态，
+  多个 gunicorn worker 共同遵守同一个全局配额
+"""
+
+import asyncio
+import time
+from typing import Dict, Tuple
+
+
+class TokenBucket:
+    """
+    异步令牌桶
+
+    - rate: 每秒补充的令牌数；capacity: 桶容量（允许的突发请求数）
+    - acquire() 先预留令牌再等待，令牌可以透支为负数，
+      因此并发调用方按到达顺序排队，无需锁（只在事件循环线程中使用）
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0, name: str = 'token_bucket'):
+        self.name = name
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self.acquired = 0
+        self.total_wait = 0.0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """预留令牌，返回需要等待的秒数"""
+        self._refill()
+        self._tokens -= tokens
+        self.acquired += 1
+        return max(0.0, -self._tokens / self.rate) if self.rate > 0 else 0.0
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """获取令牌（必要时等待），返回实际等待的秒数"""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            self.total_wait += wait
+            await asyncio.sleep(wait)
+        return wait
+
+    def stats(self) -> Dict:
+        self._refill()
+        return {
+            'rate_per_second': self.rate,
+            'capacity': self.capacity,
+            'tokens': round(self._tokens, 3),
+            'acquired': self.acquired,
+            'total_wait_seconds': round(self.total_wait, 3)
+        }
+
+
+# 原子地补充并取出令牌；使用 Redis 服务器时间，避免各 worker 时钟不一致
+# 返回 {是否获得令牌, 剩余令牌数, 需要等待的毫秒数}
+_QUOTA_SCRIPT = """
+local key = KEYS[1]
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local ttl = tonumber(ARGV[4])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', key, 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local wait_ms = 0
+if tokens >= requested then
+    tokens = tokens - requested
+    allowed = 1
+else
+    wait_ms = math.ceil((requested - tokens) / rate * 1000)
+end
+redis.call('HSET', key, 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', key, ttl)
+return {allowed, tostring(tokens), wait_ms}
+"""
+
+
+class QuotaLimiter:
+    """
+    API 配额令牌桶（并发安全）
+
+    - 容量 = 窗口内允许的调用次数，补充速率 = 容量 / 窗口，
+      例如 Twitter 15/900s、Reddit 60/60s
+    - 本地模式：补充与扣减之间没有 await，在事件循环中天然原子
+    - Redis 模式：Lua 脚本原子执行，所有 worker 共享同一个桶；
+      Redis 出错时退回本地桶
+    - 不透支：令牌不足且等待超过 max_wait 时直接返回 False（调用方快速失败）
+    """
+
+    def __init__(self, name: str, max_calls: int, time_window: float,
+                 redis_client=None, key_prefix: str = 'ratelimit'):
+        self.name = name
+        self.capacity = float(max_calls)
+        self.rate = max_calls / time_window
+        self.redis_client = redis_client
+        self.key = f"{key_prefix}:{name}"
+        self._ttl = int(time_window * 2) + 1
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._script = None
+        self._redis_down_until = 0.0
+        self.allowed = 0
+        self.rejected = 0
+        self.redis_errors = 0
+
+    def _local_take(self, tokens: float) -> Tuple[bool, float]:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return True, 0.0
+        return False, (tokens - self._tokens) / self.rate
+
+    async def _take(self, tokens: float) -> Tuple[bool, float]:
+        """尝试取出令牌，返回 (是否成功, 还需等待的秒数)"""
+        if self.redis_client is not None and time.monotonic() >= self._redis_down_until:
+            try:
+                if self._script is None:
+                    self._script = self.redis_client.register_script(_QUOTA_SCRIPT)
+                allowed, level, wait_ms = await self._script(
+                    keys=[self.key], args=[self.rate, self.capacity, tokens, self._ttl]
+                )
+                self._tokens = float(level)
+                return bool(allowed), int(wait_ms) / 1000
+            except Exception as e:
+                # 30 秒内不再尝试 Redis，避免每次调用都等待超时
+                self.redis_errors += 1
+                self._redis_down_until = time.monotonic() + 30.0
+                print(f"⚠️ Shared rate limit '{self.name}' unavailable ({e}), using local bucket")
+        return self._local_take(tokens)
+
+    async def acquire(self, tokens: float = 1.0, max_wait: float = 0.0) -> bool:
+        """
+        获取令牌；需要等待时最多等待 max_wait 秒
+
+        Returns:
+            是否获得令牌（False 表示配额耗尽，调用方应跳过本次请求）
+        """
+        deadline = time.monotonic() + max_wait
+        while True:
+            ok, wait = await self._take(tokens)
+            if ok:
+                self.allowed += 1
+                return True
+            if time.monotonic() + wait > deadline:
+                self.rejected += 1
+                return False
+            await asyncio.sleep(wait)
+
+    async def level(self) -> float:
+        """当前剩余令牌数（Redis 模式下读取共享状态）"""
+        await self._take(0)
+        return round(self._tokens, 3)
+
+    async def stats(self) -> Dict:
+        return {
+            'backend': 'redis' if self.redis_client is not None else 'local',
+            'capacity': self.capacity,
+            'refill_per_second': round(self.rate, 4),
+            'tokens': await self.level(),
+            'allowed': self.allowed,
+            'rejected': self.rejected,
+            'redis_errors': self.redis_errors
+        }
@@ -0,0 +1,93 @@
+"""
+Single-Flight - 合并并发的相同请求
+同一时刻多个相同的计算（双击、多个标签页打开同一频道）只执行一次，
+其余调用方等待同一个进行中的结果
+"""
+
+import asyncio
+import copy
+from typing import Any, Awaitable, Callable, Dict, Hashable, List
+
+
+class SingleFlight:
+    """
+    按 key 合并并发调用
+
+    - 计算在独立任务中运行：发起者被取消（如 SSE 客户端断开）不会影响其他等待者
+    - 结果对每个调用方深拷贝，调用方可以安全地原地修改
+    - 计算完成后立即移除 key（不做缓存，缓存由调用方负责）
+    """
+
+    def __init__(self, name: str = 'single_flight', copy_results: bool = True):
+        self.name = name
+        self.copy_results = copy_results
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        执行 compute()，若相同 key 的计算正在进行则等待其结果
+
+        Args:
+            key: 去重键（需可哈希）
+            compute: 无参协程工厂
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.ensure_future(compute())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._forget(k, t))
+        else:
+            self.coalesced += 1
+
+        result = await asyncio.shield(task)
+        return copy.deepcopy(result) if self.copy_results else result
+
+    async def do_many(self, keys: List[Hashable],
+                      compute_many: Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]]) -> List[Any]:
+        """
+        批量版本的 do()：没有进行中计算的 key 合并为一次 compute_many(missing) 调用，
+        其余 key 等待各自进行中的结果（例如两个部分重叠的关键词列表，重叠部分只计算一次）
+
+        Args:
+            keys: 去重键列表
+            compute_many: 协程工厂，接收需要计算的 key 列表，返回 {key: result}
+                          （缺少的 key 结果为 None）
+
+        Returns:
+            与 keys 顺序一致的结果列表
+        """
+        keys = list(dict.fromkeys(keys))
+        missing = [key for key in keys if key not in self._inflight]
+        if missing:
+            self.leaders += 1
+            batch = asyncio.ensure_future(compute_many(missing))
+            for key in missing:
+                task = asyncio.ensure_future(self._pick(batch, key))
+                self._inflight[key] = task
+                task.add_done_callback(lambda t, k=key: self._forget(k, t))
+        self.coalesced += len(keys) - len(missing)
+
+        tasks = [self._inflight[key] for key in keys]
+        results = await asyncio.gather(*(asyncio.shield(task) for task in tasks))
+        return [copy.deepcopy(result) if self.copy_results else result for result in results]
+
+    @staticmethod
+    async def _pick(batch: asyncio.Future, key: Hashable) -> Any:
+        return (await batch).get(key)
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # 所有等待者都已取消时避免 "exception was never retrieved" 警告
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict:
+        return {
+            'inflight': len(self._inflight),
+            'leaders': self.leaders,
+            'coalesced': self.coalesced
+        }
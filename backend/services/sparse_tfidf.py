@@ -0,0 +1,125 @@
+"""
+Sparse TF-IDF - 基于 CSR 词项-文档矩阵的向量化 TF-IDF
+不依赖 sklearn/scipy（保持 512MB 轻量级预算），只使用 NumPy
+
+打分公式与 LightweightContentAnalyzer 原有实现完全一致：
+    score(term) = (语料中词频 / 总词数) * log(文档数 / 文档频率)
+"""
+
+from typing import Dict, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+
+class TermDocumentMatrix:
+    """
+    CSR 格式的词项-文档矩阵
+
+    - vocabulary: 按首次出现顺序编号的词项（与 Counter 的插入顺序一致）
+    - indptr / indices / data: 第 d 行为文档 d，indices 为词项编号，data 为词频
+    """
+
+    def __init__(self, docs: Sequence[Sequence[str]]):
+        self.num_docs = len(docs)
+        vocab: Dict[str, int] = {}
+        lengths = np.fromiter((len(doc) for doc in docs), dtype=np.int64, count=len(docs))
+        term_ids = np.fromiter(
+            (vocab.setdefault(term, len(vocab)) for doc in docs for term in doc),
+            dtype=np.int64, count=int(lengths.sum())
+        )
+        self.vocabulary: List[str] = list(vocab)
+        self.term_ids = term_ids
+
+        num_terms = len(self.vocabulary)
+        if num_terms == 0:
+            self.indptr = np.zeros(self.num_docs + 1, dtype=np.int64)
+            self.indices = np.zeros(0, dtype=np.int64)
+            self.data = np.zeros(0, dtype=np.int64)
+            return
+
+        # (文档, 词项) 组合编码为一个整数，np.unique 同时完成去重、计数和按行排序
+        doc_ids = np.repeat(np.arange(self.num_docs, dtype=np.int64), lengths)
+        cells, counts = np.unique(doc_ids * num_terms + term_ids, return_counts=True)
+        rows = cells // num_terms
+        self.indices = cells % num_terms
+        self.data = counts
+        self.indptr = np.searchsorted(rows, np.arange(self.num_docs + 1, dtype=np.int64))
+
+    @property
+    def total_terms(self) -> int:
+        return int(self.term_ids.size)
+
+    def term_frequency(self) -> np.ndarray:
+        """每个词项在整个语料中的出现次数"""
+        return np.bincount(self.term_ids, minlength=len(self.vocabulary))
+
+    def document_frequency(self) -> np.ndarray:
+        """包含每个词项的文档数"""
+        return np.bincount(self.indices, minlength=len(self.vocabulary))
+
+
+def tfidf_scores(matrix: TermDocumentMatrix) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns:
+        (scores, term_frequency)，按 matrix.vocabulary 顺序
+    """
+    tf = matrix.term_frequency()
+    if not matrix.total_terms:
+        return np.zeros(len(tf), dtype=np.float64), tf
+    df = matrix.document_frequency()
+    idf = np.log(matrix.num_docs / df)
+    return (tf / matrix.total_terms) * idf, tf
+
+
+def min_max_normalize(scores: np.ndarray) -> np.ndarray:
+    """归一化到 0-1（所有分数相同时为 0，与原实现一致）"""
+    if scores.size == 0:
+        return scores
+    max_score = scores.max()
+    min_score = scores.min()
+    score_range = max_score - min_score if max_score > min_score else 1.0
+    return (scores - min_score) / score_range
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    按分数降序取前 k 个下标；同分时保持原顺序（与 Python sorted 的稳定排序一致）
+
+    先用 argpartition 找出第 k 大的分数，只对不低于该分数的候选排序
+    """
+    n = scores.size
+    if n == 0 or k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    if k < n:
+        kth = -np.partition(-scores, k - 1)[k - 1]
+        candidates = np.flatnonzero(scores >= kth)
+    else:
+        candidates = np.arange(n)
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order][:k]
+
+
+def rank_terms(docs: Sequence[Sequence[str]], bigrams: Mapping[str, int],
+               k: int = 20, bigram_weight: float = 1.5) -> List[Dict]:
+    """
+    LightweightContentAnalyzer._extract_tfidf_topics 的打分与排序：
+    词项按 TF-IDF、bigram 按 出现次数 × bigram_weight 打分，归一化后取前 k 个
+
+    Args:
+        docs: 每个标题过滤后的名词 token
+        bigrams: {bigram: 出现次数}（按插入顺序参与同分排序）
+
+    Returns:
+        [{'topic', 'score'（0-1）, 'frequency'}]
+    """
+    matrix = TermDocumentMatrix(docs)
+    scores, word_freq = tfidf_scores(matrix)
+    bigram_counts = np.fromiter(bigrams.values(), dtype=np.int64, count=len(bigrams))
+    terms = matrix.vocabulary + list(bigrams)
+    scores = np.concatenate([scores, bigram_counts * bigram_weight])
+    frequencies = np.concatenate([word_freq, bigram_counts])
+    normalized = min_max_normalize(scores)
+    return [
+        {'topic': terms[i], 'score': float(normalized[i]), 'frequency': int(frequencies[i])}
+        for i in top_k(scores, k)
+    ]
@@ -7,7 +7,18 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Tuple
+from concurrent.futures import CancelledError, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from statistics import NormalDist
 import json
+import multiprocessing
+import os
+import threading
+import time
+import zlib
+
+from services.fast_forecaster import BatchedSeasonalForecaster
+from services.forecast_cache import forecast_cache, forecast_key, history_watermark
 
 # Prophet for time series forecasting
 try:
@@ -17,9 +28,48 @@ except ImportError:
     PROPHET_AVAILABLE = False
     print("⚠️ Prophet not installed. Install: pip install prophet")
 
+# Prophet model parameters (also part of the forecast cache key)
+# Tuned for higher prediction confidence
+PROPHET_PARAMS = {
+    'changepoint_prior_scale': 0.01,  # Lower = more stable trends (higher confidence)
+    'seasonality_prior_scale': 15.0,  # Higher = stronger seasonality patterns
+    'seasonality_mode': 'additive',   # Additive seasonality
+    'daily_seasonality': False,
+    'weekly_seasonality': True,
+    'yearly_seasonality': False,
+    'interval_width': 0.80,           # 80% confidence interval (tighter = higher confidence score)
+    'mcmc_samples': 0,                # Disable MCMC for faster fitting (use MAP instead)
+    'n_changepoints': 5,              # Fewer changepoints = more stable predictions
+    'growth': 'linear',               # Linear growth for more predictable patterns
+    'uncertainty_samples': 1000       # More samples for better confidence estimation
+}
+
+# Prophet draws its uncertainty samples from the global NumPy RNG; predictions
+# reseed it per keyword under this lock, so a keyword's intervals don't depend on
+# whether it was fitted serially, in a request thread or in a pool worker
+_PROPHET_RNG_LOCK = threading.Lock()
+
+
+def _default_workers() -> int:
+    # Each worker holds a Prophet/Stan model; keep small instances within memory
+    return max(1, min(2, os.cpu_count() or 1))
+
+
+def _default_start_method() -> str:
+    # Workers must not be forked from the threaded API process
+    return 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+
+# Prediction interval estimation (uncertainty=...):
+# - 'full':     Prophet simulation with PROPHET_PARAMS['uncertainty_samples'] draws
+# - 'fast':     Prophet simulation with fewer draws (FAST_UNCERTAINTY_SAMPLES by default)
+# - 'analytic': no simulation; yhat ± z·σ·sqrt(1 + h/n) from in-sample residuals
+UNCERTAINTY_MODES = ('full', 'fast', 'analytic')
+FAST_UNCERTAINTY_SAMPLES = 200
+
 # For data storage
 try:
-    from sqlalchemy import create_engine, Column, String, Float, DateTime, Integer, JSON
+    from sqlalchemy import create_engine, select, Column, String, Float, DateTime, Integer, JSON
     from sqlalchemy.ext.declarative import declarative_base
     from sqlalchemy.orm import sessionmaker
     SQLALCHEMY_AVAILABLE = True
@@ -57,17 +107,60 @@ class TrendPredictionEngine:
     - Trend direction detection
     - Seasonality analysis
     - Anomaly detection
+    - Optional batched NumPy forecaster (forecaster='fast') when Prophet is unavailable or too slow
     """
     
-    def __init__(self, db_url: Optional[str] = None, min_history_days: int = 30):
+    def __init__(self, db_url: Optional[str] = None, min_history_days: int = 30,
+                 max_workers: Optional[int] = None, keyword_timeout: float = 60.0,
+                 forecaster: str = 'auto', uncertainty: str = 'full',
+                 uncertainty_samples: Optional[int] = None,
+                 start_method: Optional[str] = None):
         """
         Initialize prediction engine
         
         Args:
             db_url: Database connection string (e.g., 'postgresql://...')
             min_history_days: Minimum days of historical data required
+            max_workers: Processes for parallel batch_predict (default: min(2, CPU cores), 1 = serial)
+            keyword_timeout: Per-keyword timeout (seconds) in parallel batch_predict
+            forecaster: 'prophet', 'fast' (batched NumPy regression) or
+                        'auto' (Prophet when installed, otherwise fast)
+            uncertainty: Prophet interval estimation, 'full', 'fast' or 'analytic'
+                         (see UNCERTAINTY_MODES)
+            uncertainty_samples: Simulation draws for uncertainty='fast'
+                                 (default: FAST_UNCERTAINTY_SAMPLES)
+            start_method: multiprocessing start method of the process pool
+                          ('forkserver' where available, otherwise 'spawn')
         """
+        if forecaster == 'auto':
+            forecaster = 'prophet' if PROPHET_AVAILABLE else 'fast'
+        if forecaster not in ('prophet', 'fast'):
+            print(f"⚠️ Unknown forecaster '{forecaster}', using Prophet")
+            forecaster = 'prophet'
+        self.forecaster = forecaster
+        if uncertainty not in UNCERTAINTY_MODES:
+            print(f"⚠️ Unknown uncertainty mode '{uncertainty}', using full sampling")
+            uncertainty = 'full'
+        if uncertainty == 'full':
+            samples = PROPHET_PARAMS['uncertainty_samples']
+        elif uncertainty == 'fast':
+            samples = uncertainty_samples or FAST_UNCERTAINTY_SAMPLES
+        else:
+            samples = 0
+        self.uncertainty = uncertainty
+        # Per-engine Prophet kwargs (also the forecast cache key params)
+        self.prophet_params = {**PROPHET_PARAMS, 'uncertainty_samples': samples}
+        self.fast_forecaster = BatchedSeasonalForecaster(interval_width=PROPHET_PARAMS['interval_width'])
+        self.db_url = db_url
         self.min_history_days = min_history_days
+        self.max_workers = max_workers or _default_workers()
+        self.start_method = start_method or _default_start_method()
+        self.keyword_timeout = keyword_timeout
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # batch_predict runs in several request threads at once (cpu_executor.run_thread)
+        self._pool_lock = threading.Lock()
+        # Fitted forecasts keyed by (keyword, forecast_days, history watermark, params)
+        self.forecast_cache = forecast_cache
         self.db_engine = None
         self.Session = None
         
@@ -127,55 +220,81 @@ class TrendPredictionEngine:
             print("⚠️ Database not available, using mock data")
             return self._generate_mock_historical_data(keyword, days)
         
-        session = self.Session()
+        return self.get_historical_data_bulk([keyword], days).get(keyword)
+    
+    def get_historical_data_bulk(self, keywords: List[str], days: int = 90) -> Dict[str, pd.DataFrame]:
+        """
+        Retrieve historical trend data for many keywords in one query
+        
+        Selects only the columns the forecasters use (no ORM objects) and
+        splits the rows into one frame per keyword.
+        
+        Args:
+            keywords: Keywords to query
+            days: Number of days of history to retrieve
+        
+        Returns:
+            {keyword: DataFrame(date, composite_score, google_score, twitter_score, reddit_score)};
+            keywords with fewer than min_history_days rows are left out
+        """
+        keywords = list(dict.fromkeys(keywords))
+        if not self.Session:
+            print("⚠️ Database not available, using mock data")
+            return {keyword: self._generate_mock_historical_data(keyword, days) for keyword in keywords}
+        if not keywords:
+            return {}
+        
+        cutoff_date = datetime.utcnow() - timedelta(days=days)
+        query = select(
+            TrendHistoryModel.keyword,
+            TrendHistoryModel.date,
+            TrendHistoryModel.composite_score,
+            TrendHistoryModel.google_score,
+            TrendHistoryModel.twitter_score,
+            TrendHistoryModel.reddit_score
+        ).where(
+            TrendHistoryModel.keyword.in_(keywords),
+            TrendHistoryModel.date >= cutoff_date
+        ).order_by(TrendHistoryModel.keyword, TrendHistoryModel.date)
+        
         try:
-            cutoff_date = datetime.utcnow() - timedelta(days=days)
-            
-            records = session.query(TrendHistoryModel).filter(
-                TrendHistoryModel.keyword == keyword,
-                TrendHistoryModel.date >= cutoff_date
-            ).order_by(TrendHistoryModel.date).all()
-            
-            if len(records) < self.min_history_days:
-                print(f"⚠️ Insufficient historical data for {keyword} ({len(records)} days)")
-                return None
-            
-            df = pd.DataFrame([
-                {
-                    'date': r.date,
-                    'composite_score': r.composite_score,
-                    'google_score': r.google_score,
-                    'twitter_score': r.twitter_score,
-                    'reddit_score': r.reddit_score
-                }
-                for r in records
-            ])
-            
-            return df
-            
+            with self.db_engine.connect() as conn:
+                result = conn.execute(query)
+                rows = pd.DataFrame(result.fetchall(), columns=list(result.keys()))
         except Exception as e:
             print(f"Error retrieving historical data: {e}")
-            return None
-        finally:
-            session.close()
+            return {}
+        
+        histories = {}
+        for keyword, df in rows.groupby('keyword', sort=False):
+            histories[keyword] = df.drop(columns='keyword').reset_index(drop=True)
+        for keyword in keywords:
+            count = len(histories.get(keyword, ()))
+            if count < self.min_history_days:
+                print(f"⚠️ Insufficient historical data for {keyword} ({count} days)")
+                histories.pop(keyword, None)
+        
+        return histories
     
     def _generate_mock_historical_data(self, keyword: str, days: int) -> pd.DataFrame:
         """
         Generate mock historical data for testing
         """
         # Create synthetic trend data with realistic patterns
-        dates = pd.date_range(end=datetime.utcnow(), periods=days, freq='D')
+        # (seeded per keyword so serial and parallel batch runs produce the same data)
+        rng = np.random.RandomState(_keyword_seed(keyword))
+        dates = pd.date_range(end=pd.Timestamp(datetime.utcnow()).normalize(), periods=days, freq='D')
         
         # Base trend with noise
-        base_trend = 50 + np.random.randn(days).cumsum() * 2
+        base_trend = 50 + rng.randn(days).cumsum() * 2
         
         # Add weekly seasonality
         weekly_pattern = 10 * np.sin(np.arange(days) * 2 * np.pi / 7)
         
         # Add random spikes (viral moments)
         spikes = np.zeros(days)
-        spike_indices = np.random.choice(days, size=max(1, days // 20), replace=False)
-        spikes[spike_indices] = np.random.uniform(20, 50, size=len(spike_indices))
+        spike_indices = rng.choice(days, size=max(1, days // 20), replace=False)
+        spikes[spike_indices] = rng.uniform(20, 50, size=len(spike_indices))
         
         composite_score = base_trend + weekly_pattern + spikes
         composite_score = np.clip(composite_score, 0, 100)
@@ -183,20 +302,22 @@ class TrendPredictionEngine:
         df = pd.DataFrame({
             'date': dates,
             'composite_score': composite_score,
-            'google_score': composite_score * 0.4 + np.random.randn(days) * 2,
-            'twitter_score': composite_score * 0.3 + np.random.randn(days) * 3,
-            'reddit_score': composite_score * 0.3 + np.random.randn(days) * 3
+            'google_score': composite_score * 0.4 + rng.randn(days) * 2,
+            'twitter_score': composite_score * 0.3 + rng.randn(days) * 3,
+            'reddit_score': composite_score * 0.3 + rng.randn(days) * 3
         })
         
         return df
     
-    def predict_trend(self, keyword: str, forecast_days: int = 7) -> Optional[Dict]:
+    def predict_trend(self, keyword: str, forecast_days: int = 7,
+                      historical_df: Optional[pd.DataFrame] = None) -> Optional[Dict]:
         """
         Predict future trend for a keyword using Prophet
         
         Args:
             keyword: Keyword to predict
             forecast_days: Number of days to forecast (default: 7)
+            historical_df: Preloaded history (from _load_histories); loaded here when omitted
         
         Returns:
             {
@@ -209,82 +330,77 @@ class TrendPredictionEngine:
                 'model_accuracy': Dict
             }
         """
+        if self.forecaster == 'fast':
+            return self.predict_fast([keyword], forecast_days).get(keyword)
+        
         if not PROPHET_AVAILABLE:
             print("⚠️ Prophet not available")
             return None
         
-        # Get historical data (reduced to 60 days for faster processing)
-        historical_df = self.get_historical_data(keyword, days=60)
+        if historical_df is None:
+            historical_df = self._load_history(keyword)
+        if historical_df is None:
+            return None
         
-        # If no database data, generate mock data quickly
-        if historical_df is None or len(historical_df) < self.min_history_days:
-            print(f"⚠️ Insufficient historical data for {keyword}, generating mock data...")
-            historical_df = self._generate_mock_historical_data(keyword, days=60)
+        # Same history + same params => same forecast: skip model.fit until new data lands
+        cache_key = self._forecast_cache_key(keyword, forecast_days, historical_df)
+        cached = self.forecast_cache.get(cache_key)
+        if cached is not None:
+            print(f"📦 Using cached forecast for {keyword}")
+            return self._with_forecast_window(cached['result'], forecast_days)
         
-        if historical_df is None or len(historical_df) < self.min_history_days:
-            print(f"⚠️ Failed to generate data for {keyword}")
+        entry = self._fit_prophet(keyword, forecast_days, historical_df)
+        if entry is None:
             return None
+        self.forecast_cache.set(cache_key, entry)
+        return self._with_forecast_window(entry['result'], forecast_days)
+    
+    def _forecast_cache_key(self, keyword: str, forecast_days: int, historical_df: pd.DataFrame) -> str:
+        return forecast_key(keyword, forecast_days, history_watermark(historical_df), self.prophet_params)
+    
+    def _fit_prophet(self, keyword: str, forecast_days: int,
+                     historical_df: pd.DataFrame) -> Optional[Dict]:
+        """
+        Fit Prophet on the history and summarize the forecast
         
+        Returns:
+            Forecast cache entry {'forecast': {ds, yhat, yhat_lower, yhat_upper},
+            'result': prediction without the forecast window}, None on failure
+        """
         try:
             # Prepare data for Prophet
             prophet_df = historical_df[['date', 'composite_score']].copy()
             prophet_df.columns = ['ds', 'y']
             
             # Initialize Prophet model with optimized parameters for higher confidence
-            # Adjusted parameters to improve prediction confidence
-            model = Prophet(
-                changepoint_prior_scale=0.01,  # Lower = more stable trends (higher confidence)
-                seasonality_prior_scale=15.0,   # Higher = stronger seasonality patterns
-                seasonality_mode='additive',    # Additive seasonality
-                daily_seasonality=False,
-                weekly_seasonality=True,
-                yearly_seasonality=False,
-                interval_width=0.80,          # 80% confidence interval (tighter = higher confidence score)
-                mcmc_samples=0,               # Disable MCMC for faster fitting (use MAP instead)
-                n_changepoints=5,              # Fewer changepoints = more stable predictions
-                growth='linear',               # Linear growth for more predictable patterns
-                uncertainty_samples=1000       # More samples for better confidence estimation
-            )
+            model = Prophet(**self.prophet_params)
             
             # Fit model
             model.fit(prophet_df)
             
-            # Make future predictions
+            # Make future predictions (the frame also covers the history dates,
+            # which the in-sample accuracy below reuses instead of predicting again)
             future = model.make_future_dataframe(periods=forecast_days, freq='D')
-            forecast = model.predict(future)
-            
-            # Extract predictions
-            predictions = self._extract_predictions(forecast, forecast_days)
-            
-            # Analyze trend direction
-            trend_analysis = self._analyze_trend_direction(forecast, forecast_days)
-            
-            # Calculate confidence
-            confidence = self._calculate_prediction_confidence(forecast, historical_df)
-            
-            # Detect peak
-            peak_info = self._detect_peak(predictions)
-            
-            # Generate summary
-            summary = self._generate_prediction_summary(
-                keyword, trend_analysis, confidence, peak_info
-            )
+            with _PROPHET_RNG_LOCK:
+                np.random.seed(_keyword_seed(keyword))
+                forecast = model.predict(future)
+            if self.uncertainty == 'analytic':
+                forecast = self._analytic_intervals(forecast, prophet_df)
             
             # Model accuracy metrics
-            accuracy = self._calculate_model_accuracy(model, prophet_df)
+            accuracy = self._calculate_model_accuracy(forecast, prophet_df)
             
+            result = self._summarize_forecast(keyword, forecast, historical_df, forecast_days, accuracy)
+            
+            # Forecast frame and derived metrics (the forecast cache entry)
+            frame = forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']]
             return {
-                'keyword': keyword,
-                'predictions': predictions,
-                'trend_direction': trend_analysis['direction'],
-                'trend_strength': trend_analysis['strength'],
-                'confidence': confidence,
-                'peak_day': peak_info['peak_day'],
-                'peak_score': peak_info['peak_score'],
-                'summary': summary,
-                'model_accuracy': accuracy,
-                'forecast_start': datetime.utcnow().isoformat(),
-                'forecast_end': (datetime.utcnow() + timedelta(days=forecast_days)).isoformat()
+                'forecast': {
+                    'ds': [ts.isoformat() for ts in frame['ds']],
+                    **{column: frame[column].astype(float).round(4).tolist()
+                       for column in ('yhat', 'yhat_lower', 'yhat_upper')}
+                },
+                'result': result
             }
             
         except Exception as e:
@@ -293,22 +409,128 @@ class TrendPredictionEngine:
             traceback.print_exc()
             return None
     
+    def predict_fast(self, keywords: List[str], forecast_days: int = 7) -> Dict[str, Dict]:
+        """
+        Predict all keywords at once with the batched NumPy forecaster
+        (linear trend + weekly seasonality, analytic prediction intervals)
+        
+        Returns:
+            {keyword: prediction} with the same schema as predict_trend
+        """
+        histories = self._load_histories(keywords)
+        
+        try:
+            forecasts = self.fast_forecaster.forecast(histories, forecast_days)
+        except Exception as e:
+            print(f"❌ Fast forecast failed: {e}")
+            return {}
+        
+        results = {}
+        for keyword, forecast in forecasts.items():
+            historical_df = histories[keyword]
+            # In-sample accuracy on the last 14 days of history (rows before the horizon)
+            n = len(historical_df)
+            eval_window = min(14, n)
+            accuracy = self._accuracy_metrics(
+                historical_df['composite_score'].astype(float).values[n - eval_window:],
+                *(forecast[column][n - eval_window:n] for column in ('yhat', 'yhat_lower', 'yhat_upper'))
+            )
+            result = self._summarize_forecast(keyword, forecast, historical_df, forecast_days, accuracy)
+            results[keyword] = self._with_forecast_window(result, forecast_days)
+        return results
+    
+    def _load_history(self, keyword: str) -> Optional[pd.DataFrame]:
+        """History used for forecasting (mock data when the DB has too little)"""
+        return self._load_histories([keyword]).get(keyword)
+    
+    def _load_histories(self, keywords: List[str]) -> Dict[str, pd.DataFrame]:
+        """
+        History for all keywords with one DB query (mock data for keywords
+        the DB has too little of); keywords without usable data are left out
+        """
+        # Get historical data (reduced to 60 days for faster processing)
+        loaded = self.get_historical_data_bulk(keywords, days=60)
+        
+        histories = {}
+        for keyword in dict.fromkeys(keywords):
+            historical_df = loaded.get(keyword)
+            
+            # If no database data, generate mock data quickly
+            if historical_df is None or len(historical_df) < self.min_history_days:
+                print(f"⚠️ Insufficient historical data for {keyword}, generating mock data...")
+                historical_df = self._generate_mock_historical_data(keyword, days=60)
+            
+            if historical_df is None or len(historical_df) < self.min_history_days:
+                print(f"⚠️ Failed to generate data for {keyword}")
+                continue
+            histories[keyword] = historical_df
+        return histories
+    
+    def _summarize_forecast(self, keyword: str, forecast, historical_df: pd.DataFrame,
+                            forecast_days: int, accuracy: Dict) -> Dict:
+        """
+        Derive the prediction result from a forecast (ds, yhat, yhat_lower, yhat_upper columns:
+        a Prophet frame or the fast forecaster's arrays). Shared by both forecasters
+        """
+        # Extract predictions
+        predictions = self._extract_predictions(forecast, forecast_days)
+        
+        # Analyze trend direction
+        trend_analysis = self._analyze_trend_direction(forecast, forecast_days)
+        
+        # Calculate confidence
+        confidence = self._calculate_prediction_confidence(forecast, historical_df)
+        
+        # Detect peak
+        peak_info = self._detect_peak(predictions)
+        
+        # Generate summary
+        summary = self._generate_prediction_summary(
+            keyword, trend_analysis, confidence, peak_info
+        )
+        
+        return {
+            'keyword': keyword,
+            'predictions': predictions,
+            'trend_direction': trend_analysis['direction'],
+            'trend_strength': trend_analysis['strength'],
+            'confidence': confidence,
+            'peak_day': peak_info['peak_day'],
+            'peak_score': peak_info['peak_score'],
+            'summary': summary,
+            'model_accuracy': accuracy
+        }
+    
+    def _with_forecast_window(self, result: Dict, forecast_days: int) -> Dict:
+        """Add forecast_start/end (relative to now, also for cached forecasts)"""
+        now = datetime.utcnow()
+        return {
+            **result,
+            'forecast_start': now.isoformat(),
+            'forecast_end': (now + timedelta(days=forecast_days)).isoformat()
+        }
+    
     def _extract_predictions(self, forecast: pd.DataFrame, days: int) -> List[Dict]:
         """
         Extract daily predictions with confidence intervals
         """
         predictions = []
         
-        # Get last N rows (future predictions)
-        future_forecast = forecast.tail(days)
+        # Get last N rows (future predictions); column access works for both a
+        # Prophet frame and the fast forecaster's column arrays
+        dates = pd.DatetimeIndex(forecast['ds'])[-days:]
+        yhat, lower, upper = (
+            np.asarray(forecast[column], dtype=float)[-days:]
+            for column in ('yhat', 'yhat_lower', 'yhat_upper')
+        )
         
-        for _, row in future_forecast.iterrows():
+        for date, y, lo, hi in zip(dates, yhat, lower, upper):
             predictions.append({
-                'date': row['ds'].isoformat(),
-                'predicted_score': round(float(row['yhat']), 2),
-                'lower_bound': round(float(row['yhat_lower']), 2),
-                'upper_bound': round(float(row['yhat_upper']), 2),
-                'confidence_range': round(float(row['yhat_upper'] - row['yhat_lower']), 2)
+                'date': date.isoformat(),
+                'predicted_score': round(float(y), 2),
+                'lower_bound': round(float(lo), 2),
+                'upper_bound': round(float(hi), 2),
+                'confidence_range': round(float(hi - lo), 2)
             })
         
         return predictions
@@ -317,7 +539,7 @@ class TrendPredictionEngine:
         """
         Determine if trend is rising, falling, or stable
         """
-        recent_values = forecast['yhat'].tail(days).values
+        recent_values = np.asarray(forecast['yhat'], dtype=float)[-days:]
         
         if len(recent_values) < 2:
             return {'direction': 'stable', 'strength': 0}
@@ -359,18 +581,19 @@ class TrendPredictionEngine:
             Confidence score 75-100 (minimum 75% for high-quality predictions)
         """
         # Get future predictions
-        future_forecast = forecast.tail(7)
+        yhat, lower, upper = (
+            np.asarray(forecast[column], dtype=float)[-7:]
+            for column in ('yhat', 'yhat_lower', 'yhat_upper')
+        )
         
         # Calculate average confidence interval width
-        avg_interval_width = (
-            future_forecast['yhat_upper'] - future_forecast['yhat_lower']
-        ).mean()
+        avg_interval_width = (upper - lower).mean()
         
         # Calculate average predicted value
-        avg_prediction = future_forecast['yhat'].mean()
+        avg_prediction = yhat.mean()
         
         # Calculate coefficient of variation (CV) for trend stability
-        prediction_std = future_forecast['yhat'].std()
+        prediction_std = yhat.std(ddof=1) if len(yhat) > 1 else float('nan')
         cv = prediction_std / avg_prediction if avg_prediction > 0 else 1.0
         
         # Base confidence from interval width (tighter = higher confidence)
@@ -501,7 +724,7 @@ class TrendPredictionEngine:
         
         return summary
     
-    def _calculate_model_accuracy(self, model, df: pd.DataFrame) -> Dict:
+    def _calculate_model_accuracy(self, forecast: pd.DataFrame, df: pd.DataFrame) -> Dict:
         """
         Calculate model accuracy metrics (fast path).
         
@@ -512,38 +735,28 @@ class TrendPredictionEngine:
         We instead compute lightweight in-sample accuracy on the most recent
         14 days of available history. This is deterministic and fast enough
         for interactive UI.
+        
+        The history rows come from the forecast frame predict_trend already
+        computed (make_future_dataframe includes the history), so the
+        uncertainty simulation is not run a second time.
         """
         try:
             if df is None or len(df) < 10:
                 return {'mae': 0, 'rmse': 0, 'mape': 0, 'coverage': 0.8}
             
             eval_window = min(14, len(df))
-            df_eval = df.tail(eval_window).copy()
-            df_pred = model.predict(df_eval[['ds']])
+            df_eval = df.tail(eval_window)[['ds', 'y']]
+            df_pred = df_eval.merge(
+                forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']], on='ds', how='left'
+            )
             
             # Align arrays
-            y_true = df_eval['y'].astype(float).values
-            y_hat = df_pred['yhat'].astype(float).values
-            y_lo = df_pred['yhat_lower'].astype(float).values
-            y_hi = df_pred['yhat_upper'].astype(float).values
-            
-            abs_err = (y_true - y_hat)
-            mae = float((abs_err.__abs__()).mean())
-            rmse = float(((abs_err ** 2).mean()) ** 0.5)
-            
-            # MAPE with safe denominator
-            denom = (y_true.copy())
-            denom[denom == 0] = 1.0
-            mape = float(((abs_err.__abs__()) / denom).mean())
-            
-            coverage = float(((y_true >= y_lo) & (y_true <= y_hi)).mean())
-            
-            return {
-                'mae': round(mae, 2),
-                'rmse': round(rmse, 2),
-                'mape': round(mape, 2),
-                'coverage': round(coverage, 2),
-            }
+            return self._accuracy_metrics(
+                df_pred['y'].astype(float).values,
+                df_pred['yhat'].astype(float).values,
+                df_pred['yhat_lower'].astype(float).values,
+                df_pred['yhat_upper'].astype(float).values
+            )
         except Exception as e:
             print(f"⚠️ Accuracy calc failed (fast path): {e}")
             return {
@@ -553,9 +766,60 @@ class TrendPredictionEngine:
                 'coverage': 0.8
             }
     
+    def _analytic_intervals(self, forecast: pd.DataFrame, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Prediction intervals without Prophet's simulation (uncertainty='analytic')
+        
+        σ is the in-sample residual standard deviation; the interval widens with
+        the horizon h (days past the last observation) as yhat ± z·σ·sqrt(1 + h/n),
+        a cheap stand-in for Prophet's sampled trend uncertainty.
+        """
+        fitted = df[['ds', 'y']].merge(forecast[['ds', 'yhat']], on='ds', how='left')
+        residuals = (fitted['y'].astype(float) - fitted['yhat'].astype(float)).values
+        n = len(residuals)
+        sigma = float(np.sqrt(np.nansum(residuals ** 2) / max(n - 2, 1)))
+        z = NormalDist().inv_cdf(0.5 + self.prophet_params['interval_width'] / 2)
+        
+        ds = pd.DatetimeIndex(forecast['ds'])
+        horizon = np.clip((ds - pd.Timestamp(df['ds'].max())).days.values, 0, None)
+        half_width = z * sigma * np.sqrt(1.0 + horizon / max(n, 1))
+        
+        forecast = forecast.copy()
+        forecast['yhat_lower'] = forecast['yhat'].values - half_width
+        forecast['yhat_upper'] = forecast['yhat'].values + half_width
+        return forecast
+    
+    @staticmethod
+    def _accuracy_metrics(y_true: np.ndarray, y_hat: np.ndarray,
+                          y_lo: np.ndarray, y_hi: np.ndarray) -> Dict:
+        """MAE / RMSE / MAPE / interval coverage on aligned arrays"""
+        abs_err = (y_true - y_hat)
+        mae = float((abs_err.__abs__()).mean())
+        rmse = float(((abs_err ** 2).mean()) ** 0.5)
+        
+        # MAPE with safe denominator
+        denom = (y_true.copy())
+        denom[denom == 0] = 1.0
+        mape = float(((abs_err.__abs__()) / denom).mean())
+        
+        coverage = float(((y_true >= y_lo) & (y_true <= y_hi)).mean())
+        
+        return {
+            'mae': round(mae, 2),
+            'rmse': round(rmse, 2),
+            'mape': round(mape, 2),
+            'coverage': round(coverage, 2),
+        }
+    
+    @property
+    def available(self) -> bool:
+        """Whether predictions can be produced with the selected forecaster"""
+        return self.forecaster == 'fast' or PROPHET_AVAILABLE
+    
     def batch_predict(self, keywords: List[str], 
                      forecast_days: int = 7, 
-                     min_confidence: float = 75.0) -> List[Dict]:
+                     min_confidence: float = 75.0,
+                     parallel: Optional[bool] = None) -> List[Dict]:
         """
         Predict trends for multiple keywords
         
@@ -563,31 +827,195 @@ class TrendPredictionEngine:
             keywords: List of keywords to predict
             forecast_days: Days to forecast for each
             min_confidence: Minimum confidence threshold (default: 75%)
+            parallel: Fit keywords in the process pool (default: when max_workers > 1,
+                      there is more than one keyword and we are not already inside a
+                      pool worker, e.g. the predictive recommender's CPU executor task)
         
         Returns:
             List of prediction results (filtered by confidence >= min_confidence)
         """
-        predictions = []
+        predictions = self.predict_many(keywords, forecast_days, parallel)
+        raw_predictions = [predictions[k] for k in dict.fromkeys(keywords) if k in predictions]
+        return self.rank_predictions(raw_predictions, len(keywords), min_confidence)
+    
+    def predict_many(self, keywords: List[str], forecast_days: int = 7,
+                     parallel: Optional[bool] = None) -> Dict[str, Dict]:
+        """
+        Unranked predictions for multiple keywords (see batch_predict)
         
-        for keyword in keywords:
+        Returns:
+            {keyword: prediction}; keywords that could not be predicted are left out
+        """
+        keywords = list(dict.fromkeys(keywords))
+        if self.forecaster == 'fast':
+            # One batched least-squares solve for all keywords (milliseconds, no pool needed)
+            return self.predict_fast(keywords, forecast_days)
+        
+        if parallel is None:
+            parallel = (
+                self.max_workers > 1 and len(keywords) > 1
+                and multiprocessing.parent_process() is None
+            )
+        
+        # One query for every keyword's history instead of one per keyword
+        histories = self._load_histories(keywords)
+        loaded = [keyword for keyword in keywords if keyword in histories]
+        
+        if parallel:
+            return self._predict_parallel(loaded, forecast_days, histories)
+        
+        predictions = {}
+        for keyword in loaded:
             print(f"🔮 Predicting trend for: {keyword}")
-            prediction = self.predict_trend(keyword, forecast_days)
+            prediction = self.predict_trend(keyword, forecast_days, histories[keyword])
             
             if prediction:
-                # Filter by confidence threshold
-                if prediction.get('confidence', 0) >= min_confidence:
-                    predictions.append(prediction)
-                else:
-                    print(f"   ⚠️ Filtered out {keyword}: confidence {prediction.get('confidence', 0):.1f}% < {min_confidence}%")
+                predictions[keyword] = prediction
+        return predictions
+    
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                context = multiprocessing.get_context(self.start_method)
+                if self.start_method == 'forkserver':
+                    # The fork server imports only this module (and Prophet), not the app
+                    context.set_forkserver_preload([__name__])
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+                print(f"✅ Prophet process pool started ({self.max_workers} workers, {self.start_method})")
+            return self._pool
+    
+    def _recycle_pool(self, pool: ProcessPoolExecutor):
+        """
+        Discard a pool whose workers are stuck (timed-out fit) or dead
+        
+        The old pool stops taking work (queued fits are cancelled) and the
+        next _get_pool() starts a fresh one, so later keywords don't queue
+        behind a stuck fit; a worker that is still fitting exits when its fit
+        ends. Only the first caller for a given pool replaces it.
+        """
+        with self._pool_lock:
+            if self._pool is not pool:
+                return
+            self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+        print("♻️ Prophet process pool recycled")
+    
+    def _predict_parallel(self, keywords: List[str], forecast_days: int,
+                          histories: Dict[str, pd.DataFrame]) -> Dict[str, Dict]:
+        """
+        Fit each keyword in its own pool task (one Prophet fit per process at a time)
+        
+        - Histories are loaded once in the parent and shipped with each task,
+          so workers don't query the DB
+        - The forecast cache lives in the parent: cached keywords are not
+          submitted, and fitted results are stored here (workers' per-process
+          caches would be lost whenever the pool is recycled)
+        - Each keyword has its own timeout (keyword_timeout, counted from when the
+          batch is submitted plus its queue position) and failures are isolated:
+          a crashed/timed-out keyword is dropped, the others are kept
+        - A timeout recycles the pool (the stuck fit keeps its worker busy
+          otherwise) and the keywords that hadn't finished are resubmitted;
+          keywords lost to a dead pool are retried once
+        - Results are returned in keyword order, so ranking matches the serial path
+        """
+        results: Dict[str, Dict] = {}
+        cache_keys = {}
+        remaining = []
+        for keyword in keywords:
+            cache_keys[keyword] = self._forecast_cache_key(keyword, forecast_days, histories[keyword])
+            cached = self.forecast_cache.get(cache_keys[keyword])
+            if cached is not None:
+                results[keyword] = self._with_forecast_window(cached['result'], forecast_days)
+            else:
+                remaining.append(keyword)
+        
+        if remaining:
+            print(f"🔮 Predicting trends for {len(remaining)} keywords ({self.max_workers} processes, "
+                  f"{len(results)} cached)")
+        waves = max(1, self.max_workers)
+        attempts: Dict[str, int] = {}
+        
+        while remaining:
+            pool = self._get_pool()
+            submitted = [
+                (keyword, pool.submit(
+                    _fit_keyword_task, self.min_history_days,
+                    self.uncertainty, self.prophet_params['uncertainty_samples'],
+                    keyword, forecast_days, histories[keyword]
+                ))
+                for keyword in remaining
+            ]
+            for keyword in remaining:
+                attempts[keyword] = attempts.get(keyword, 0) + 1
+            remaining = []
+            start = time.monotonic()
+            recycled = False
+            
+            for index, (keyword, future) in enumerate(submitted):
+                if recycled and not future.done():
+                    # Lost its worker/queue slot when the pool was recycled
+                    remaining.append(keyword)
+                    continue
+                # keyword i starts after the (i // workers) fits queued before it
+                deadline = start + self.keyword_timeout * (index // waves + 1)
+                try:
+                    entry = future.result(timeout=max(0.0, deadline - time.monotonic()))
+                except FutureTimeoutError:
+                    print(f"⚠️ Prediction timeout for {keyword} ({self.keyword_timeout:.0f}s), "
+                          f"skipping and recycling the pool")
+                    self._recycle_pool(pool)
+                    recycled = True
+                    continue
+                except (BrokenProcessPool, CancelledError) as e:
+                    # Worker killed (e.g. OOM) or the pool was recycled by another batch
+                    self._recycle_pool(pool)
+                    recycled = True
+                    if attempts[keyword] < 2:
+                        remaining.append(keyword)
+                    else:
+                        print(f"❌ Prediction failed for {keyword}: prophet worker died ({e!r})")
+                    continue
+                except Exception as e:
+                    print(f"❌ Prediction failed for {keyword}: {type(e).__name__} {e}")
+                    continue
+                if entry:
+                    self.forecast_cache.set(cache_keys[keyword], entry)
+                    results[keyword] = self._with_forecast_window(entry['result'], forecast_days)
+        
+        return {keyword: results[keyword] for keyword in keywords if keyword in results}
+    
+    def shutdown(self):
+        """Stop the process pool (called from the app lifespan)"""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+    
+    def rank_predictions(self, predictions: List[Dict], total_keywords: int,
+                         min_confidence: float = 75.0) -> List[Dict]:
+        """
+        Filter predictions by confidence and sort by confidence * trend strength
+        
+        Args:
+            predictions: Successful predict_trend results
+            total_keywords: Number of keywords requested (for logging)
+            min_confidence: Minimum confidence threshold (default: 75%)
+        """
+        ranked = []
+        for prediction in predictions:
+            if prediction.get('confidence', 0) >= min_confidence:
+                ranked.append(prediction)
+            else:
+                print(f"   ⚠️ Filtered out {prediction['keyword']}: confidence {prediction.get('confidence', 0):.1f}% < {min_confidence}%")
         
         # Sort by confidence * trend strength
-        predictions.sort(
+        ranked.sort(
             key=lambda x: x['confidence'] * x['trend_strength'],
             reverse=True
         )
         
-        print(f"   ✅ High-confidence predictions ({min_confidence}%+): {len(predictions)}/{len(keywords)}")
-        return predictions
+        print(f"   ✅ High-confidence predictions ({min_confidence}%+): {len(ranked)}/{total_keywords}")
+        return ranked
     
     def detect_emerging_trends(self, predictions: List[Dict], 
                               threshold: float = 75.0) -> List[Dict]:
@@ -674,14 +1102,48 @@ class TrendPredictionEngine:
         }
 
 
+def _keyword_seed(keyword: str) -> int:
+    """Stable per-keyword RNG seed (hash() is randomized per process)"""
+    return zlib.crc32(keyword.encode('utf-8'))
+
+
+# Engines used inside pool workers, one per (min_history_days, uncertainty settings);
+# the parent ships each keyword's history, so workers don't connect to the DB
+_worker_engines: Dict[Tuple[int, str, int], 'TrendPredictionEngine'] = {}
+
+
+def _fit_keyword_task(min_history_days: int, uncertainty: str, uncertainty_samples: int,
+                      keyword: str, forecast_days: int,
+                      historical_df: pd.DataFrame) -> Optional[Dict]:
+    """Process-pool task: fit one keyword, returns its forecast cache entry (see _fit_prophet)"""
+    engine_key = (min_history_days, uncertainty, uncertainty_samples)
+    engine = _worker_engines.get(engine_key)
+    if engine is None:
+        engine = TrendPredictionEngine(
+            db_url=None, min_history_days=min_history_days, max_workers=1, forecaster='prophet',
+            uncertainty=uncertainty, uncertainty_samples=uncertainty_samples
+        )
+        _worker_engines[engine_key] = engine
+    print(f"🔮 Predicting trend for: {keyword} (pid {os.getpid()})")
+    return engine._fit_prophet(keyword, forecast_days, historical_df)
+
+
 # Initialize predictor (without DB for now, can be configured later)
 # Can be configured with DATABASE_URL from environment
-import os
 from dotenv import load_dotenv
 load_dotenv()
 
 db_url = os.getenv('DATABASE_URL')
-trend_predictor = TrendPredictionEngine(db_url=db_url, min_history_days=30)
+trend_predictor = TrendPredictionEngine(
+    db_url=db_url,
+    min_history_days=30,
+    max_workers=int(os.getenv('PROPHET_WORKERS', '0')) or None,
+    start_method=os.getenv('PROPHET_POOL_START_METHOD') or None,
+    keyword_timeout=float(os.getenv('PROPHET_KEYWORD_TIMEOUT', '60')),
+    forecaster=os.getenv('TREND_FORECASTER', 'auto'),
+    uncertainty=os.getenv('PROPHET_UNCERTAINTY', 'full'),
+    uncertainty_samples=int(os.getenv('PROPHET_UNCERTAINTY_SAMPLES', '0')) or None
+)
 
 # Export for use in other modules
 __all__ = ['TrendPredictionEngine', 'TrendHistoryModel', 'trend_predictor']
@@ -0,0 +1,321 @@
+"""
+Trend Pre-warmer - 热门关键词后台预热
+大部分频道集中在几百个反复出现的主题上：记录每个关键词的请求频率，
+定期在缓存进入 soft TTL 之前刷新 top-N 关键词，使 collect_all_trends 几乎总是命中缓存
+
+- KeywordPopularity: 按天分桶的请求计数（有 Redis 时各 worker / CLI 进程共享）
+- TrendPrewarmer: 周期性预热任务，可在 FastAPI 进程内运行（TREND_PREWARM_ENABLED=true），
+  也可作为独立进程运行（需要 Redis 共享计数和缓存）:
+
+    python -m services.trend_prewarmer            # 按间隔持续运行
+    python -m services.trend_prewarmer --once     # 只运行一轮（适合 cron）
+"""
+
+import asyncio
+import os
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+# 可预热的数据源（与 collect_all_trends 的 cache 统计名称一致）
+PREWARM_SOURCES = ('twitter', 'reddit', 'google_trends', 'serpapi')
+
+
+class KeywordPopularity:
+    """
+    关键词请求频率（最近 window_days 天）
+
+    - 成员为 (geo, keyword)；每天一个计数桶，过期的桶自动丢弃
+    - Redis 可用时写入有序集合 {key_prefix}:{YYYYMMDD}（ZINCRBY，一次 pipeline），
+      否则只在进程内计数
+    """
+
+    def __init__(self, cache_manager, window_days: int = 7, key_prefix: str = 'prewarm:popularity'):
+        self.cache = cache_manager
+        self.window_days = max(1, window_days)
+        self.key_prefix = key_prefix
+        self._buckets: Dict[str, Counter] = {}
+        self.recorded = 0
+
+    @staticmethod
+    def _member(keyword: str, geo: str) -> str:
+        return f"{geo}|{keyword}"
+
+    def _days(self) -> List[str]:
+        today = datetime.utcnow().date()
+        return [(today - timedelta(days=i)).strftime('%Y%m%d') for i in range(self.window_days)]
+
+    async def record(self, keywords: List[str], geo: str = 'US'):
+        """记录一次请求中的关键词"""
+        members = [self._member(keyword, geo) for keyword in keywords if keyword]
+        if not members:
+            return
+        self.recorded += len(members)
+
+        day = self._days()[0]
+        self._buckets.setdefault(day, Counter()).update(members)
+        for old in [d for d in self._buckets if d not in self._days()]:
+            del self._buckets[old]
+
+        if self.cache.redis_available:
+            key = f"{self.key_prefix}:{day}"
+            pipe = self.cache.redis_client.pipeline(transaction=False)
+            for member in members:
+                pipe.zincrby(key, 1, member)
+            pipe.expire(key, (self.window_days + 1) * 86400)
+            await self.cache._redis_call('popularity', pipe.execute())
+
+    async def top(self, n: int) -> List[Tuple[str, str, float]]:
+        """
+        请求最多的 n 个关键词
+
+        Returns:
+            [(keyword, geo, count), ...]，按次数降序
+        """
+        totals: Counter = Counter()
+        shared = False
+        if self.cache.redis_available:
+            # 每个桶取前 n*4 个再合并，足以覆盖跨天的 top-N
+            pipe = self.cache.redis_client.pipeline(transaction=False)
+            for day in self._days():
+                pipe.zrevrange(f"{self.key_prefix}:{day}", 0, n * 4 - 1, withscores=True)
+            buckets = await self.cache._redis_call('popularity', pipe.execute())
+            if buckets is not None:
+                shared = True
+                for bucket in buckets:
+                    for member, score in bucket:
+                        member = member.decode() if isinstance(member, bytes) else member
+                        totals[member] += score
+        if not shared:
+            for day in self._days():
+                totals.update(self._buckets.get(day, {}))
+
+        ranked = []
+        for member, count in totals.most_common(n):
+            geo, _, keyword = member.partition('|')
+            ranked.append((keyword, geo, count))
+        return ranked
+
+    def stats(self) -> Dict:
+        return {
+            'backend': 'redis' if self.cache.redis_client is not None else 'local',
+            'window_days': self.window_days,
+            'recorded': self.recorded,
+            'local_keywords': len(set().union(*self._buckets.values())) if self._buckets else 0
+        }
+
+
+class TrendPrewarmer:
+    """
+    热门关键词预热任务
+
+    - 每 interval 秒取 top_n 个关键词，刷新缓存缺失或写入时间超过
+      soft_ttl - interval 的条目：下一轮之前它们都不会变成 stale
+    - 预算：Twitter / Reddit 只使用配额中超过 quota_reserve 比例的部分
+      （其余留给用户请求）；其他数据源每轮最多 max_per_cycle 个关键词。
+      抓取走收集器自身的 fan_out / quota，与用户请求共享同一套速率控制
+    - 多个 worker 同时运行时，每一轮通过 Redis 锁只由一个进程执行
+    """
+
+    def __init__(self, aggregator, top_n: int = 50, interval: float = 300.0,
+                 quota_reserve: float = 0.5, max_per_cycle: int = 25,
+                 sources: Tuple[str, ...] = PREWARM_SOURCES, lock_key: str = 'prewarm:lock'):
+        self.aggregator = aggregator
+        self.popularity: KeywordPopularity = aggregator.popularity
+        self.cache = aggregator.cache
+        self.top_n = top_n
+        self.interval = interval
+        self.quota_reserve = quota_reserve
+        self.max_per_cycle = max_per_cycle
+        self.sources = tuple(source for source in sources if source in PREWARM_SOURCES)
+        self.lock_key = lock_key
+        self._task: Optional[asyncio.Task] = None
+
+        # 统计
+        self.cycles = 0
+        self.skipped_cycles = 0
+        self.refreshed: Counter = Counter()
+        self.last_run: Optional[Dict] = None
+
+    @property
+    def refresh_after(self) -> float:
+        return max(0.0, self.cache.soft_ttl - self.interval)
+
+    def start(self):
+        """启动后台循环（在 lifespan 启动阶段调用）"""
+        if self._task is not None:
+            return
+        self._task = asyncio.create_task(self._loop())
+        print(f"✅ Trend pre-warmer started (top {self.top_n}, every {self.interval:.0f}s, "
+              f"sources: {', '.join(self.sources)})")
+
+    async def stop(self):
+        """停止后台循环（在 lifespan 结束阶段调用）"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        print("🛑 Trend pre-warmer stopped")
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                print(f"⚠️ Trend pre-warm cycle failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def _acquire_cycle(self) -> bool:
+        """同一轮只由一个进程执行（Redis 不可用时各进程各自运行）"""
+        if not self.cache.redis_available:
+            return True
+        acquired = await self.cache._redis_call(
+            'prewarm lock',
+            self.cache.redis_client.set(self.lock_key, os.getpid(), nx=True, ex=max(1, int(self.interval * 0.9)))
+        )
+        # SET NX 未获得锁时返回 None；Redis 出错时 _redis_call 同样返回 None，但会标记 Redis 不可用
+        return bool(acquired) or not self.cache.redis_available
+
+    async def _budget(self, source: str) -> int:
+        """本轮该数据源最多抓取的关键词数"""
+        collector = getattr(self.aggregator, source)
+        quota = getattr(collector, 'quota', None)
+        if quota is None:
+            return self.max_per_cycle
+        spare = await quota.level() - quota.capacity * self.quota_reserve
+        return max(0, min(self.max_per_cycle, int(spare)))
+
+    async def run_once(self) -> Dict:
+        """
+        执行一轮预热
+
+        Returns:
+            {'keywords': 候选数, 'refreshed': {source: 刷新数}, 'duration_seconds': ...}
+        """
+        if not await self._acquire_cycle():
+            self.skipped_cycles += 1
+            return {'skipped': True}
+
+        started = time.time()
+        ranked = await self.popularity.top(self.top_n)
+        by_geo: Dict[str, List[str]] = {}
+        for keyword, geo, _ in ranked:
+            by_geo.setdefault(geo, []).append(keyword)
+        # Twitter / Reddit 的缓存键不含 geo
+        keywords = list(dict.fromkeys(keyword for keyword, _, _ in ranked))
+
+        async def warm(source: str) -> int:
+            collector = getattr(self.aggregator, source)
+            budget = await self._budget(source)
+            if budget <= 0 or not keywords:
+                return 0
+            if source in ('twitter', 'reddit'):
+                return await collector.prewarm(keywords, self.refresh_after, max_fetch=budget)
+            refreshed = 0
+            for geo, geo_keywords in by_geo.items():
+                if refreshed >= budget:
+                    break
+                refreshed += await collector.prewarm(
+                    geo_keywords, self.refresh_after, max_fetch=budget - refreshed, geo=geo
+                )
+            return refreshed
+
+        counts = await asyncio.gather(*(warm(source) for source in self.sources), return_exceptions=True)
+        refreshed = {}
+        for source, count in zip(self.sources, counts):
+            if isinstance(count, Exception):
+                print(f"⚠️ {source} pre-warm failed: {count}")
+                count = 0
+            refreshed[source] = count
+            self.refreshed[source] += count
+
+        self.cycles += 1
+        self.last_run = {
+            'at': datetime.utcnow().isoformat(),
+            'keywords': len(ranked),
+            'refreshed': refreshed,
+            'duration_seconds': round(time.time() - started, 3)
+        }
+        if any(refreshed.values()):
+            print(f"🔥 Pre-warmed {sum(refreshed.values())} trend cache entries "
+                  f"for {len(ranked)} popular keywords: {refreshed}")
+        return self.last_run
+
+    def stats(self) -> Dict:
+        return {
+            'running': self._task is not None,
+            'top_n': self.top_n,
+            'interval_seconds': self.interval,
+            'refresh_after_seconds': self.refresh_after,
+            'sources': list(self.sources),
+            'cycles': self.cycles,
+            'skipped_cycles': self.skipped_cycles,
+            'refreshed': dict(self.refreshed),
+            'last_run': self.last_run,
+            'popularity': self.popularity.stats()
+        }
+
+
+def create_prewarmer(aggregator) -> TrendPrewarmer:
+    """按环境变量创建预热任务"""
+    sources = os.getenv('TREND_PREWARM_SOURCES', ','.join(PREWARM_SOURCES))
+    return TrendPrewarmer(
+        aggregator,
+        top_n=int(os.getenv('TREND_PREWARM_TOP_N', '50')),
+        interval=float(os.getenv('TREND_PREWARM_INTERVAL', '300')),
+        quota_reserve=float(os.getenv('TREND_PREWARM_QUOTA_RESERVE', '0.5')),
+        max_per_cycle=int(os.getenv('TREND_PREWARM_MAX_PER_CYCLE', '25')),
+        sources=tuple(source.strip() for source in sources.split(',') if source.strip())
+    )
+
+
+async def _main(args):
+    import urllib.parse
+    from dotenv import load_dotenv
+    from services.enhanced_social_collector import EnhancedSocialMediaAggregator
+    from services.io_executor import social_io_executor
+
+    load_dotenv()
+    twitter_token = os.getenv('TWITTER_BEARER_TOKEN')
+    aggregator = EnhancedSocialMediaAggregator(
+        twitter_token=urllib.parse.unquote(twitter_token) if twitter_token else None,
+        reddit_id=os.getenv('REDDIT_CLIENT_ID'),
+        reddit_secret=os.getenv('REDDIT_CLIENT_SECRET'),
+        serpapi_key=os.getenv('SERPAPI_KEY'),
+        redis_url=os.getenv('REDIS_URL')
+    )
+    if aggregator.cache.redis_client is None:
+        print("⚠️ REDIS_URL not configured: a separate pre-warm process cannot share "
+              "keyword counts or cache with the API workers")
+
+    prewarmer = create_prewarmer(aggregator)
+    if args.top_n:
+        prewarmer.top_n = args.top_n
+    if args.interval:
+        prewarmer.interval = args.interval
+
+    try:
+        if args.once:
+            print(await prewarmer.run_once())
+        else:
+            prewarmer.start()
+            await prewarmer._task
+    finally:
+        await prewarmer.stop()
+        social_io_executor.shutdown()
+        await aggregator.cache.close()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Pre-warm social trend cache for popular keywords")
+    parser.add_argument('--once', action='store_true', help="run a single cycle and exit")
+    parser.add_argument('--top-n', type=int, default=None)
+    parser.add_argument('--interval', type=float, default=None, help="seconds between cycles")
+    try:
+        asyncio.run(_main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
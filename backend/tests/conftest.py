@@ -0,0 +1,71 @@
+"""
+pytest 配置：在 backend/ 下运行 python -m pytest tests，
+测试直接 import services.*（与 app_v2.py 相同的导入方式）
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+
+@pytest.fixture(scope='session')
+def app_module():
+    """app_v2 模块（导入时需要 NLTK 数据，缺少时跳过接口测试）"""
+    try:
+        import app_v2
+    except LookupError as e:
+        pytest.skip(f"NLTK data not available: {e}")
+    return app_v2
+
+
+class FakeProphet:
+    """
+    Prophet 的替身：线性趋势 + 周季节性最小二乘，
+    预测区间与 Prophet 一样从全局 NumPy RNG 抽样（uncertainty_samples=0 时不输出区间）
+    """
+
+    def __init__(self, **params):
+        self.params = params
+
+    def _design(self, ds):
+        days = (pd.DatetimeIndex(ds) - pd.Timestamp('1970-01-01')).days.values.astype(float)
+        return np.column_stack([np.ones_like(days), days, np.sin(2 * np.pi * days / 7.0)])
+
+    def fit(self, df):
+        self.history = df
+        X = self._design(df['ds'])
+        self.coef, *_ = np.linalg.lstsq(X, df['y'].values.astype(float), rcond=None)
+        self.sigma = float(np.std(df['y'].values - X @ self.coef)) or 1.0
+        return self
+
+    def make_future_dataframe(self, periods, freq='D'):
+        last = self.history['ds'].iloc[-1]
+        future = pd.date_range(last, periods=periods + 1, freq=freq)[1:]
+        return pd.DataFrame({'ds': list(self.history['ds']) + list(future)})
+
+    def predict(self, df):
+        yhat = self._design(df['ds']) @ self.coef
+        forecast = pd.DataFrame({'ds': pd.DatetimeIndex(df['ds']), 'trend': yhat, 'yhat': yhat})
+        samples = self.params.get('uncertainty_samples', 1000)
+        if samples:
+            draws = yhat[:, None] + np.random.normal(0, self.sigma, size=(len(yhat), samples))
+            width = self.params.get('interval_width', 0.8)
+            forecast['yhat_lower'] = np.quantile(draws, (1 - width) / 2, axis=1)
+            forecast['yhat_upper'] = np.quantile(draws, (1 + width) / 2, axis=1)
+        return forecast
+
+
+@pytest.fixture
+def fake_prophet(monkeypatch):
+    """在当前进程中用 FakeProphet 代替 Prophet（进程池子进程不受影响）"""
+    from services import trend_predictor
+    monkeypatch.setattr(trend_predictor, 'Prophet', FakeProphet, raising=False)
+    monkeypatch.setattr(trend_predictor, 'PROPHET_AVAILABLE', True)
+    return FakeProphet
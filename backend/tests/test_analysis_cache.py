@@ -0,0 +1,62 @@
+"""AnalysisResultCache 与缓存键"""
+
+import time
+
+from services.analysis_cache import (
+    AnalysisResultCache, fingerprint_videos, make_cache_key, view_count_bucket
+)
+
+
+def test_view_count_bucket_keeps_two_significant_digits():
+    assert view_count_bucket(12345) == 12000
+    assert view_count_bucket(987) == 990
+    assert view_count_bucket(42) == 42
+    assert view_count_bucket(None) == 0
+    assert view_count_bucket('not a number') == 0
+
+
+def test_fingerprint_ignores_order_and_small_view_changes():
+    videos = [
+        {'videoId': 'a', 'viewCount': 12345, 'publishedAt': '2024-01-01'},
+        {'videoId': 'b', 'viewCount': 500, 'publishedAt': '2024-01-02'},
+    ]
+    reordered = [dict(videos[1]), dict(videos[0], viewCount=12390)]
+    assert fingerprint_videos(videos) == fingerprint_videos(reordered)
+
+    grown = [dict(videos[0], viewCount=20000), videos[1]]
+    assert fingerprint_videos(videos) != fingerprint_videos(grown)
+
+
+def test_make_cache_key_is_stable_for_dict_order():
+    assert make_cache_key({'a': 1, 'b': 2}, 'x') == make_cache_key({'b': 2, 'a': 1}, 'x')
+    assert make_cache_key('x') != make_cache_key('y')
+
+
+def test_get_returns_copies():
+    cache = AnalysisResultCache()
+    cache.set('channel', 'k', {'topics': [1, 2]})
+    value = cache.get('channel', 'k')
+    value['topics'].append(3)
+    assert cache.get('channel', 'k') == {'topics': [1, 2]}
+
+
+def test_stage_ttl_and_disabled_stage():
+    cache = AnalysisResultCache(stage_ttls={'social': 1, 'predictions': 0})
+    cache.set('social', 'k', 'v')
+    cache.set('predictions', 'k', 'v')
+    assert cache.get('predictions', 'k') is None
+
+    cache._entries['social:k']['expires_at'] = time.time() - 1
+    assert cache.get('social', 'k') is None
+    assert cache.stats()['entries'] == 0
+
+
+def test_lru_eviction():
+    cache = AnalysisResultCache(max_entries=2)
+    cache.set('channel', 'a', 1)
+    cache.set('channel', 'b', 2)
+    cache.get('channel', 'a')
+    cache.set('channel', 'c', 3)
+    assert cache.get('channel', 'b') is None
+    assert cache.get('channel', 'a') == 1
+    assert cache.get('channel', 'c') == 3
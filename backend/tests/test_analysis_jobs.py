@@ -0,0 +1,93 @@
+"""AnalysisJob / JobStore / JobManager"""
+
+import asyncio
+import time
+
+import pytest
+
+from services.analysis_jobs import AnalysisJob, JobManager, JobQueueFullError, JobStore
+
+
+def test_job_step_progress_and_partial_results():
+    job = AnalysisJob('full-analysis', ['channel', 'social'])
+    job.on_step('channel', 'running')
+    job.on_step('channel', 'completed', {'channel': {'topics': 3}})
+
+    data = job.to_dict()
+    assert data['steps']['channel']['status'] == 'completed'
+    assert data['steps']['channel']['duration_seconds'] is not None
+    assert data['steps']['social']['status'] == 'pending'
+    assert data['partial_results'] == {'channel': {'topics': 3}}
+    assert 'partial_results' not in job.to_dict(include_partial=False)
+
+
+def test_store_evicts_only_finished_jobs():
+    store = JobStore(max_jobs=2, ttl=3600)
+    running = AnalysisJob('a', [])
+    running.mark_running()
+    done = AnalysisJob('b', [])
+    done.mark_completed({})
+    newest = AnalysisJob('c', [])
+    for job in (running, done, newest):
+        store.put(job)
+
+    assert store.get(done.id) is None
+    assert store.get(running.id) is running
+    assert store.get(newest.id) is newest
+
+
+def test_store_expires_finished_jobs_after_ttl():
+    store = JobStore(ttl=60)
+    job = AnalysisJob('a', [])
+    job.mark_completed({})
+    store.put(job)
+    job.finished_at = time.time() - 61
+    assert store.get(job.id) is None
+
+
+def test_manager_runs_jobs_and_records_failures():
+    async def ok(job):
+        job.on_step('only', 'completed', {'partial': 1})
+        return {'answer': 42}
+
+    async def broken(job):
+        raise RuntimeError("stage failed")
+
+    async def scenario():
+        manager = JobManager(max_workers=1, max_queue=4)
+        manager.start()
+        try:
+            good = manager.submit('full-analysis', ['only'], ok)
+            bad = manager.submit('full-analysis', ['only'], broken)
+            await manager._queue.join()
+            return good, bad
+        finally:
+            await manager.shutdown()
+
+    good, bad = asyncio.run(scenario())
+    assert good.status == 'completed' and good.result == {'answer': 42}
+    assert bad.status == 'failed' and bad.error == "stage failed"
+
+
+def test_manager_rejects_when_queue_is_full():
+    async def never(job):
+        await asyncio.sleep(10)
+
+    async def scenario():
+        manager = JobManager(max_workers=1, max_queue=1)
+        manager.start()
+        try:
+            manager.submit('a', [], never)
+            await asyncio.sleep(0)   # worker 取走第一个任务
+            manager.submit('a', [], never)
+            with pytest.raises(JobQueueFullError):
+                manager.submit('a', [], never)
+        finally:
+            await manager.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_submit_requires_started_manager():
+    with pytest.raises(RuntimeError):
+        JobManager().submit('a', [], None)
@@ -0,0 +1,101 @@
+"""uncertainty='analytic' 的预测区间，以及 benchmark_prophet_uncertainty 的对比流程"""
+
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import benchmark_prophet_uncertainty as benchmark
+from services.forecast_cache import ForecastCache
+from services.trend_predictor import TrendPredictionEngine
+
+
+def make_engine(uncertainty='analytic', samples=None):
+    engine = TrendPredictionEngine(max_workers=1, forecaster='prophet',
+                                   uncertainty=uncertainty, uncertainty_samples=samples)
+    engine.forecast_cache = ForecastCache(max_entries=0)
+    return engine
+
+
+def make_history(days=40, seed=0):
+    rng = np.random.RandomState(seed)
+    return pd.DataFrame({
+        'date': pd.date_range('2024-01-01', periods=days, freq='D'),
+        'composite_score': 40 + 0.5 * np.arange(days) + rng.normal(0, 4, days)
+    })
+
+
+def test_analytic_intervals_are_well_formed_and_widen_with_horizon():
+    engine = make_engine()
+    history = make_history()
+    df = history.rename(columns={'date': 'ds', 'composite_score': 'y'})
+    future = pd.date_range(df['ds'].iloc[-1], periods=15, freq='D')[1:]
+    ds = pd.DatetimeIndex(list(df['ds']) + list(future))
+    days = np.arange(len(ds), dtype=float)
+    forecast = pd.DataFrame({'ds': ds, 'yhat': 40 + 0.5 * days})
+
+    result = engine._analytic_intervals(forecast, df)
+    lower, yhat, upper = (result[column].values for column in ('yhat_lower', 'yhat', 'yhat_upper'))
+    width = upper - lower
+    n = len(df)
+
+    assert np.all(lower <= yhat) and np.all(yhat <= upper)
+    np.testing.assert_allclose(yhat - lower, upper - yhat)
+    # 样本内宽度不变，之后随预测步数单调变宽
+    np.testing.assert_allclose(width[:n], width[0])
+    assert np.all(np.diff(width[n - 1:]) > 0)
+
+    residuals = df['y'].values - yhat[:n]
+    sigma = np.sqrt(np.sum(residuals ** 2) / (n - 2))
+    z = NormalDist().inv_cdf(0.5 + engine.prophet_params['interval_width'] / 2)
+    np.testing.assert_allclose(width[-1] / 2, z * sigma * np.sqrt(1 + 14 / n))
+    # 不修改传入的 forecast
+    assert 'yhat_lower' not in forecast
+
+
+def test_analytic_intervals_collapse_on_a_perfect_fit():
+    engine = make_engine()
+    df = pd.DataFrame({'ds': pd.date_range('2024-01-01', periods=10), 'y': np.arange(10.0)})
+    forecast = pd.DataFrame({'ds': df['ds'], 'yhat': np.arange(10.0)})
+    result = engine._analytic_intervals(forecast, df)
+    np.testing.assert_allclose(result['yhat_lower'], result['yhat'])
+    np.testing.assert_allclose(result['yhat_upper'], result['yhat'])
+
+
+def test_analytic_mode_predictions_have_widening_bounds(fake_prophet):
+    engine = make_engine()
+    assert engine.prophet_params['uncertainty_samples'] == 0
+    prediction = engine.predict_trend('ai', 7, make_history())
+
+    days = prediction['predictions']
+    assert len(days) == 7
+    for day in days:
+        assert day['lower_bound'] <= day['predicted_score'] <= day['upper_bound']
+        assert day['confidence_range'] > 0
+    ranges = [day['confidence_range'] for day in days]
+    assert ranges == sorted(ranges) and ranges[-1] > ranges[0]
+    assert 0 < prediction['model_accuracy']['coverage'] <= 1
+
+
+def test_benchmark_compares_settings_against_the_baseline(fake_prophet, monkeypatch):
+    monkeypatch.setattr(TrendPredictionEngine, '_load_history',
+                        lambda self, keyword: make_history(seed=sum(map(ord, keyword))))
+    keywords = [f'benchmark topic {i}' for i in range(3)]
+
+    _, full = benchmark.run_setting('full', keywords, 7)
+    _, analytic = benchmark.run_setting('analytic', keywords, 7)
+    assert set(full) == set(analytic) == set(keywords)
+
+    # 基准与自身对比：零误差
+    same = benchmark.compare(full, full)
+    assert same['bound_error'] == 0 and same['width_ratio'] == pytest.approx(1.0)
+
+    # analytic 与模拟得到的区间同一量级，覆盖率接近 interval_width
+    quality = benchmark.compare(analytic, full)
+    assert quality['bound_error'] < 0.15
+    assert 0.85 < quality['width_ratio'] < 1.3
+    assert 0.7 <= quality['coverage'] <= 0.95
+
+    assert benchmark.parse_setting('fast:200') == ('fast', 200)
+    assert benchmark.parse_setting('full') == ('full', None)
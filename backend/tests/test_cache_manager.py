@@ -0,0 +1,288 @@
+"""CacheManager 批量读写、Redis 故障退回本地缓存与关闭；L1 LocalCacheTier"""
+
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from services.enhanced_social_collector import CacheManager, LocalCacheTier
+
+fakeredis = pytest.importorskip('fakeredis')
+
+
+def make_cache(server=None, **kwargs):
+    cache = CacheManager(**kwargs)
+    cache.redis_client = fakeredis.aioredis.FakeRedis(server=server or fakeredis.FakeServer())
+    return cache
+
+
+def test_set_many_then_get_many_entries_roundtrip():
+    async def scenario():
+        server = fakeredis.FakeServer()
+        writer = make_cache(server, ttl=600)
+        await writer.set_many({'a': {'v': 1}, 'b': {'v': 2}})
+
+        # 新实例的 L1 为空，只能从 Redis 读到
+        reader = make_cache(server, ttl=600)
+        found = await reader.get_many_entries(['a', 'b', 'missing'])
+        ttl = await reader.redis_client.ttl('a')
+        stored = json.loads(await reader.redis_client.get('b'))
+        return found, ttl, stored, reader
+
+    found, ttl, stored, reader = asyncio.run(scenario())
+    assert set(found) == {'a', 'b'}
+    assert found['a'][0] == {'v': 1}
+    assert found['a'][1] is not None
+    assert 0 < ttl <= 600
+    assert stored['__swr__'] == 1 and stored['data'] == {'v': 2}
+    # Redis 命中的条目写入 L1 near-cache
+    assert len(reader.local_cache) == 2
+
+
+def test_set_many_custom_ttl_and_empty_inputs():
+    async def scenario():
+        cache = make_cache(ttl=3600)
+        await cache.set_many({})
+        empty = await cache.get_many_entries([])
+        await cache.set_many({'k': {'v': 1}}, ttl=120)
+        return empty, await cache.redis_client.ttl('k')
+
+    empty, ttl = asyncio.run(scenario())
+    assert empty == {}
+    assert 0 < ttl <= 120
+
+
+def test_get_many_reads_legacy_entries_without_timestamp():
+    async def scenario():
+        cache = make_cache()
+        await cache.redis_client.set('old', json.dumps({'v': 'legacy'}))
+        return await cache.get_many_entries(['old']), await cache.get_many(['old'])
+
+    entries, data = asyncio.run(scenario())
+    assert entries == {'old': ({'v': 'legacy'}, None)}
+    assert data == {'old': {'v': 'legacy'}}
+
+
+def test_redis_failure_falls_back_to_local_cache():
+    async def scenario():
+        server = fakeredis.FakeServer()
+        cache = make_cache(server, retry_interval=30.0)
+        server.connected = False
+        await cache.set_many({'a': {'v': 1}})
+        errors_after_set = cache.redis_errors
+        available = cache.redis_available
+        # 退避期内不再访问 Redis，直接读 L1
+        found = await cache.get_many(['a', 'b'])
+        return errors_after_set, available, found, cache
+
+    errors_after_set, available, found, cache = asyncio.run(scenario())
+    assert errors_after_set == 1
+    assert available is False
+    assert found == {'a': {'v': 1}}
+    assert cache.redis_errors == 1
+    assert cache.stats()['redis_configured'] is True
+    assert cache.stats()['redis_available'] is False
+
+
+def test_redis_retried_after_retry_interval():
+    async def scenario():
+        server = fakeredis.FakeServer()
+        cache = make_cache(server, retry_interval=30.0)
+        server.connected = False
+        assert await cache.get_many(['a']) == {}
+        server.connected = True
+        await cache.redis_client.set('a', json.dumps({'v': 1}))
+        before = await cache.get_many(['a'])
+        cache._redis_down_until = 0.0
+        after = await cache.get_many(['a'])
+        return before, after
+
+    before, after = asyncio.run(scenario())
+    assert before == {}
+    assert after == {'a': {'v': 1}}
+
+
+def test_without_redis_uses_local_cache_only():
+    async def scenario():
+        cache = CacheManager(redis_url=None)
+        await cache.set('k', {'v': 1})
+        return cache, await cache.get('k')
+
+    cache, value = asyncio.run(scenario())
+    assert value == {'v': 1}
+    assert cache.redis_available is False
+    assert cache.redis_errors == 0
+
+
+def test_close_cancels_revalidation_and_closes_client():
+    async def scenario():
+        cache = make_cache()
+        closed = []
+        original = cache.redis_client.aclose
+
+        async def aclose():
+            closed.append(True)
+            await original()
+
+        cache.redis_client.aclose = aclose
+        started = asyncio.Event()
+
+        async def refresh(keywords):
+            started.set()
+            await asyncio.sleep(60)
+
+        cache.revalidate('twitter', ['ai'], refresh)
+        await started.wait()
+        tasks = list(cache._revalidate_tasks)
+        await cache.close()
+        await asyncio.sleep(0)
+        return closed, tasks, cache
+
+    closed, tasks, cache = asyncio.run(scenario())
+    assert closed == [True]
+    assert all(task.cancelled() for task in tasks)
+    assert cache._revalidating == set()
+
+
+def test_close_swallows_client_errors():
+    async def scenario():
+        cache = make_cache()
+
+        async def broken():
+            raise ConnectionError('already closed')
+
+        cache.redis_client.aclose = broken
+        await cache.close()
+        await CacheManager().close()
+
+    asyncio.run(scenario())
+
+
+def test_health_reports_redis_availability(app_module, monkeypatch):
+    cache = make_cache()
+    monkeypatch.setattr(app_module.social_aggregator, 'cache', cache)
+    monkeypatch.setattr(app_module.social_aggregator.signal_aggregator, 'cache', cache)
+
+    async def health():
+        transport = httpx.ASGITransport(app=app_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+            return (await client.get('/health')).json()
+
+    assert asyncio.run(health())['services']['cache'] is True
+    # 已配置但处于故障退避期：不再报告为可用
+    cache._redis_down_until = float('inf')
+    assert asyncio.run(health())['services']['cache'] is False
+
+
+def test_l1_hit_served_before_redis():
+    async def scenario():
+        cache = make_cache()
+        await cache.set_many({'k': {'v': 1}})
+        calls = []
+        original = cache.redis_client.mget
+
+        def mget(keys):
+            calls.append(list(keys))
+            return original(keys)
+
+        cache.redis_client.mget = mget
+        hit = await cache.get_many(['k'])
+        mixed = await cache.get_many(['k', 'other'])
+        return hit, mixed, calls
+
+    hit, mixed, calls = asyncio.run(scenario())
+    assert hit == {'k': {'v': 1}}
+    assert mixed == {'k': {'v': 1}}
+    # 只有 L1 未命中的键才访问 Redis
+    assert calls == [['other']]
+
+
+def test_l1_copy_of_redis_hit_expires_after_near_ttl():
+    async def scenario():
+        server = fakeredis.FakeServer()
+        await make_cache(server, ttl=3600).set_many({'k': {'v': 1}})
+        reader = make_cache(server, ttl=3600, near_ttl=60)
+        await reader.get_many(['k'])
+        return reader
+
+    reader = asyncio.run(scenario())
+    entry = reader.local_cache._entries['k']
+    assert entry['expires_at'] - time.time() <= 60
+
+    # near_ttl 不超过 hard TTL
+    assert CacheManager(ttl=30, near_ttl=60).near_ttl == 30
+
+
+def test_l1_copy_of_redis_hit_capped_to_redis_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, 'time', lambda: now[0])
+
+    async def scenario():
+        server = fakeredis.FakeServer()
+        await make_cache(server, ttl=3600).set_many({'short': {'v': 1}}, ttl=100)
+        await make_cache(server, ttl=3600).set_many({'long': {'v': 2}})
+        now[0] += 90
+        reader = make_cache(server, ttl=3600, near_ttl=60)
+        await reader.get_many(['short', 'long'])
+        return reader
+
+    reader = asyncio.run(scenario())
+    entries = reader.local_cache._entries
+    # short 在 Redis 中只剩 10 秒，L1 不能保留 60 秒
+    assert entries['short']['expires_at'] == pytest.approx(now[0] + 10)
+    assert entries['long']['expires_at'] == pytest.approx(now[0] + 60)
+
+
+def test_l1_entry_expires_at_its_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, 'time', lambda: now[0])
+    tier = LocalCacheTier()
+    tier.set('k', {'v': 1}, ttl=10)
+    now[0] += 9.9
+    assert tier.get('k') == {'v': 1}
+    now[0] += 0.2
+    assert tier.get('k') is None
+    assert tier.stats()['expirations'] == 1
+    assert len(tier) == 0
+
+
+def test_l1_evicts_least_recently_used_by_count():
+    tier = LocalCacheTier(max_entries=2)
+    tier.set('a', {'v': 1}, ttl=60)
+    tier.set('b', {'v': 2}, ttl=60)
+    tier.get('a')
+    tier.set('c', {'v': 3}, ttl=60)
+    assert tier.get('b') is None
+    assert tier.get('a') == {'v': 1}
+    assert tier.get('c') == {'v': 3}
+    assert tier.stats()['evictions'] == 1
+
+
+def test_l1_evicts_by_size_and_skips_oversized_entries():
+    tier = LocalCacheTier(max_entries=100, max_bytes=100)
+    tier.set('a', {'v': 1}, ttl=60, size=40)
+    tier.set('b', {'v': 2}, ttl=60, size=40)
+    tier.set('c', {'v': 3}, ttl=60, size=40)
+    assert tier.get('a') is None
+    assert tier.stats()['bytes'] == 80
+    # 大于整个预算的条目不写入，也不挤掉已有条目
+    tier.set('huge', {'v': 4}, ttl=60, size=101)
+    assert tier.get('huge') is None
+    assert len(tier) == 2
+    # 覆盖写入时先扣除旧条目的大小
+    tier.set('b', {'v': 5}, ttl=60, size=10)
+    assert tier.stats()['bytes'] == 50
+
+
+def test_l1_sweep_removes_expired_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, 'time', lambda: now[0])
+    tier = LocalCacheTier(sweep_interval=60.0)
+    tier.set('short', {'v': 1}, ttl=5)
+    tier.set('long', {'v': 2}, ttl=600)
+    now[0] += 61
+    tier.set('new', {'v': 3}, ttl=600)
+    assert 'short' not in tier._entries
+    assert len(tier) == 2
@@ -0,0 +1,218 @@
+"""熔断器状态转换与自适应超时"""
+
+import asyncio
+
+import pytest
+
+from services import circuit_breaker
+from services.circuit_breaker import CircuitBreaker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(circuit_breaker.time, 'monotonic', fake)
+    return fake
+
+
+def make_breaker(**kwargs):
+    options = dict(min_failures=3, failure_rate=0.5, cooldown=10, max_cooldown=25)
+    options.update(kwargs)
+    return CircuitBreaker('test', **options)
+
+
+def test_opens_after_enough_failures(clock):
+    breaker = make_breaker()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == 'closed'
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    assert not breaker.allow_request()
+    assert breaker.stats()['short_circuited'] == 1
+
+
+def test_failure_rate_threshold(clock):
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record_success()
+    for _ in range(3):
+        breaker.record_failure()
+    # 3/7 < 50%
+    assert breaker.state == 'closed'
+
+
+def test_old_failures_leave_the_window(clock):
+    breaker = make_breaker(window=60)
+    breaker.record_failure()
+    breaker.record_failure()
+    clock.now += 61
+    breaker.record_failure()
+    assert breaker.state == 'closed'
+
+
+def test_half_open_probe_closes_on_success(clock):
+    breaker = make_breaker()
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now += 10
+    assert breaker.allow_request()
+    assert breaker.state == 'half_open'
+    # 试探进行中，不放行其他请求
+    assert not breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == 'closed'
+    assert breaker.allow_request()
+
+
+def test_failed_probe_doubles_cooldown_up_to_max(clock):
+    breaker = make_breaker()
+    for _ in range(3):
+        breaker.record_failure()
+    cooldowns = []
+    for _ in range(3):
+        clock.now += breaker.cooldown
+        assert breaker.allow_request()
+        breaker.record_failure()
+        cooldowns.append(breaker.cooldown)
+    assert cooldowns == [20, 25, 25]
+    assert breaker.state == 'open'
+
+    clock.now += breaker.cooldown
+    breaker.allow_request()
+    breaker.record_success()
+    assert breaker.cooldown == 10
+
+
+def test_adaptive_timeout_is_clamped():
+    breaker = make_breaker(min_timeout=3, max_timeout=15, min_samples=5)
+    for _ in range(4):
+        breaker.record_latency(1.0)
+    assert breaker.timeout() == 15
+    breaker.record_latency(1.0)
+    assert breaker.timeout() == 3
+
+    for _ in range(5):
+        breaker.record_latency(4.0)
+    assert breaker.timeout() == pytest.approx(6.0)
+
+    for _ in range(10):
+        breaker.record_latency(30.0)
+    assert breaker.timeout() == 15
+
+
+def test_call_records_outcome():
+    breaker = make_breaker()
+
+    async def ok():
+        return 'ok'
+
+    async def fail():
+        raise RuntimeError("down")
+
+    async def scenario():
+        assert await breaker.call(ok) == 'ok'
+        with pytest.raises(RuntimeError):
+            await breaker.call(fail)
+
+    asyncio.run(scenario())
+    assert (breaker.calls, breaker.failures) == (2, 1)
+
+
+def make_serpapi(monkeypatch, response):
+    from services import enhanced_social_collector as esc
+
+    class FakeSearch:
+        def __init__(self, params):
+            self.params = params
+
+        def get_dict(self):
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+    monkeypatch.setattr(esc, 'GoogleSearch', FakeSearch, raising=False)
+    collector = esc.EnhancedSerpAPICollector(api_key='key', cache_manager=esc.CacheManager())
+    collector.available = True
+    collector.breaker = make_breaker()
+    return collector
+
+
+@pytest.mark.parametrize('response', [
+    {'error': 'Invalid API key. Your API key should be here: https://serpapi.com/manage-api-key'},
+    ConnectionError('connection reset'),
+])
+def test_serpapi_errors_open_the_breaker(monkeypatch, response):
+    collector = make_serpapi(monkeypatch, response)
+
+    async def scenario():
+        return [await collector._fetch_keyword(f'kw{i}', 'US', f'key{i}') for i in range(3)]
+
+    assert asyncio.run(scenario()) == [None, None, None]
+    assert collector.breaker.failures == 3
+    assert collector.breaker.state == 'open'
+
+
+def test_serpapi_no_results_is_not_a_failure(monkeypatch):
+    collector = make_serpapi(monkeypatch, {'error': "Google hasn't returned any results for this query."})
+    assert asyncio.run(collector._fetch_keyword('kw', 'US', 'key')) is None
+    assert collector.breaker.failures == 0
+    assert collector.breaker.calls == 1
+
+
+def collection_with_serpapi(fetch):
+    """只有 SerpAPI 发请求的 collect_all_trends（其他平台直接返回空）"""
+    from services.enhanced_social_collector import EnhancedSocialMediaAggregator
+
+    aggregator = EnhancedSocialMediaAggregator()
+    aggregator.signal_aggregator.aggregate_signals = lambda *sources: []
+
+    async def empty(keywords, geo='US', cache_stats=None):
+        return []
+
+    async def serpapi(keywords, geo='US', cache_stats=None):
+        cache_stats.update({'keywords': 1, 'hits': 0})
+        return await fetch(aggregator.serpapi.breaker)
+
+    for source in ('twitter', 'reddit', 'google_trends'):
+        getattr(aggregator, source).get_trending_topics = empty
+    aggregator.serpapi.get_trending_topics = serpapi
+    breaker = aggregator.serpapi.breaker = make_breaker(max_timeout=0.2, min_timeout=0.1)
+    asyncio.run(aggregator.collect_all_trends(['ai']))
+    return breaker
+
+
+def test_timed_out_call_counted_once():
+    async def fetch(breaker):
+        async def request():
+            raise asyncio.TimeoutError()
+        try:
+            await breaker.call(request)
+        except asyncio.TimeoutError:
+            pass
+        # 请求超时后采集仍未结束，随后整体采集超时
+        await asyncio.sleep(5)
+
+    breaker = collection_with_serpapi(fetch)
+    assert breaker.failures == 1
+    assert list(breaker._latencies) == [0.2]
+
+
+def test_cancelled_collection_counted_once():
+    async def fetch(breaker):
+        async def request():
+            await asyncio.sleep(5)
+        await breaker.call(request)
+
+    breaker = collection_with_serpapi(fetch)
+    assert breaker.failures == 1
+    assert breaker.calls == 1
@@ -0,0 +1,88 @@
+"""CPUExecutor: 统计口径、进程池损坏后的重建"""
+
+import asyncio
+import threading
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from services.cpu_executor import CPUExecutor, cpu_time_scope
+
+
+def _double(x):
+    return x * 2
+
+
+def _fail():
+    raise ValueError("boom")
+
+
+def test_completed_counts_only_successful_tasks():
+    async def scenario():
+        executor = CPUExecutor(max_workers=2, mode='thread')
+        executor.start()
+        try:
+            assert await executor.run(_double, 21) == 42
+            with pytest.raises(ValueError):
+                await executor.run(_fail)
+            return executor.stats()
+        finally:
+            executor.shutdown()
+
+    stats = asyncio.run(scenario())
+    assert stats['completed'] == 1
+    assert stats['failed'] == 1
+    assert stats['queue_depth'] == 0
+
+
+def test_broken_pool_is_restarted_once_for_concurrent_failures():
+    callers = 4
+    barrier = threading.Barrier(callers)
+    attempts = []
+
+    def break_pool():
+        # 第一次在“进程池”中执行时全部同时失败，回退到线程后正常返回
+        attempts.append(1)
+        if len(attempts) <= callers:
+            barrier.wait(timeout=5)
+            raise BrokenProcessPool("worker died")
+        return 'thread'
+
+    async def scenario():
+        executor = CPUExecutor(max_workers=callers, mode='thread')
+        executor.start()
+        starts = []
+        original_start = executor.start
+
+        def counting_start():
+            starts.append(1)
+            original_start()
+
+        executor.start = counting_start
+        try:
+            results = await asyncio.gather(*(executor.run(break_pool) for _ in range(callers)))
+            return results, len(starts), executor.stats()
+        finally:
+            executor.shutdown()
+
+    results, restarts, stats = asyncio.run(scenario())
+    assert results == ['thread'] * callers
+    assert restarts == 1
+    assert stats['failed'] == callers
+    assert stats['completed'] == 0
+
+
+def test_cpu_time_scope_collects_thread_task_cpu():
+    def spin():
+        total = 0
+        for i in range(200000):
+            total += i
+        return total
+
+    async def scenario():
+        executor = CPUExecutor(mode='thread')
+        with cpu_time_scope() as cpu:
+            await executor.run_thread(spin)
+        return cpu[0]
+
+    assert asyncio.run(scenario()) > 0
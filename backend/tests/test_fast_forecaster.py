@@ -0,0 +1,71 @@
+"""BatchedSeasonalForecaster 批量回归"""
+
+import numpy as np
+import pandas as pd
+
+from services.fast_forecaster import BatchedSeasonalForecaster
+
+
+def make_history(values, start='2024-01-01'):
+    return pd.DataFrame({
+        'date': pd.date_range(start, periods=len(values), freq='D'),
+        'composite_score': values
+    })
+
+
+def seasonal_signal(days, start='2024-01-01'):
+    dates = pd.date_range(start, periods=days, freq='D')
+    weekday = dates.dayofweek.values
+    return 50 + 0.5 * np.arange(days) + 4 * np.sin(2 * np.pi * weekday / 7.0)
+
+
+def test_output_shape_and_columns():
+    forecaster = BatchedSeasonalForecaster()
+    result = forecaster.forecast({'ai': make_history(seasonal_signal(30))}, forecast_days=7)
+    frame = result['ai']
+    assert len(frame['ds']) == 37
+    assert frame['ds'][-1] == pd.Timestamp('2024-01-30') + pd.Timedelta(days=7)
+    for column in ('yhat', 'yhat_lower', 'yhat_upper'):
+        assert frame[column].shape == (37,)
+
+
+def test_recovers_linear_trend_with_weekly_seasonality():
+    signal = seasonal_signal(67)
+    forecaster = BatchedSeasonalForecaster()
+    frame = forecaster.forecast({'ai': make_history(signal[:60])}, forecast_days=7)['ai']
+    np.testing.assert_allclose(frame['yhat'], signal, atol=1e-6)
+    # 无噪声时区间宽度为 0
+    np.testing.assert_allclose(frame['yhat_upper'] - frame['yhat_lower'], 0, atol=1e-6)
+
+
+def test_batched_fit_equals_single_fits():
+    rng = np.random.default_rng(0)
+    histories = {
+        'a': make_history(seasonal_signal(60) + rng.normal(0, 3, 60)),
+        'b': make_history(rng.normal(20, 5, 60)),
+        # 不同日期网格单独分组
+        'c': make_history(rng.normal(10, 2, 45), start='2024-02-01'),
+    }
+    forecaster = BatchedSeasonalForecaster()
+    batched = forecaster.forecast(histories, forecast_days=5)
+    for keyword, df in histories.items():
+        single = forecaster.forecast({keyword: df}, forecast_days=5)[keyword]
+        for column in ('yhat', 'yhat_lower', 'yhat_upper'):
+            np.testing.assert_allclose(batched[keyword][column], single[column], rtol=1e-9)
+        assert batched[keyword]['ds'].equals(single['ds'])
+
+
+def test_interval_widens_with_noise_and_horizon():
+    rng = np.random.default_rng(1)
+    noise = rng.normal(0, 1, 60)
+    forecaster = BatchedSeasonalForecaster(interval_width=0.8)
+    result = forecaster.forecast({
+        'quiet': make_history(seasonal_signal(60) + noise),
+        'noisy': make_history(seasonal_signal(60) + 5 * noise),
+    }, forecast_days=14)
+    quiet = result['quiet']['yhat_upper'] - result['quiet']['yhat_lower']
+    noisy = result['noisy']['yhat_upper'] - result['noisy']['yhat_lower']
+    np.testing.assert_allclose(noisy, 5 * quiet, rtol=1e-9)
+    assert np.all(quiet > 0)
+    assert quiet[-1] > quiet[59]
+    assert np.all(result['quiet']['yhat_lower'] <= result['quiet']['yhat'])
@@ -0,0 +1,59 @@
+"""Prophet 预测缓存：LRU、磁盘层与缓存键"""
+
+import pandas as pd
+
+from services.forecast_cache import ForecastCache, forecast_key, history_watermark
+
+
+def make_history(days=30, start='2024-01-01'):
+    return pd.DataFrame({
+        'date': pd.date_range(start, periods=days, freq='D'),
+        'composite_score': range(days)
+    })
+
+
+def test_key_changes_with_watermark_and_params():
+    df = make_history()
+    params = {'changepoint_prior_scale': 0.05}
+    key = forecast_key('ai', 7, history_watermark(df), params)
+
+    assert key == forecast_key('ai', 7, history_watermark(df.copy()), dict(params))
+    assert key != forecast_key('ai', 14, history_watermark(df), params)
+    assert key != forecast_key('ai', 7, history_watermark(make_history(31)), params)
+    assert key != forecast_key('ai', 7, history_watermark(make_history(start='2024-01-02')), params)
+    assert key != forecast_key('ai', 7, history_watermark(df), {'changepoint_prior_scale': 0.1})
+
+
+def test_get_returns_fresh_objects():
+    cache = ForecastCache()
+    cache.set('k', {'values': [1, 2]})
+    cache.get('k')['values'].append(3)
+    assert cache.get('k') == {'values': [1, 2]}
+    assert cache.get('missing') is None
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_lru_eviction():
+    cache = ForecastCache(max_entries=2)
+    cache.set('a', {'v': 1})
+    cache.set('b', {'v': 2})
+    cache.get('a')
+    cache.set('c', {'v': 3})
+    assert cache.get('b') is None
+    assert cache.get('a') == {'v': 1}
+
+    disabled = ForecastCache(max_entries=0)
+    disabled.set('a', {'v': 1})
+    assert disabled.get('a') is None
+
+
+def test_disk_tier_survives_new_instance(tmp_path):
+    path = str(tmp_path / 'forecasts.sqlite')
+    ForecastCache(disk_path=path).set('k', {'forecast': {'yhat': [1.5]}})
+
+    restarted = ForecastCache(disk_path=path)
+    assert restarted.get('k') == {'forecast': {'yhat': [1.5]}}
+    assert restarted.disk_hits == 1
+    # 提升到内存层
+    restarted.get('k')
+    assert restarted.hits == 1
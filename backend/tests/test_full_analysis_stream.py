@@ -0,0 +1,88 @@
+"""/api/v2/full-analysis/stream：SSE 事件顺序、阶段事件与最终 complete / error 事件"""
+
+import asyncio
+import json
+
+import httpx
+
+REQUEST = {'videos': [], 'channel_data': {'title': 'test channel'}}
+
+
+def parse_events(body):
+    """SSE 文本 -> [(event, data)]（忽略 keep-alive 注释）"""
+    events = []
+    for block in body.strip().split('\n\n'):
+        fields = dict(
+            line.split(': ', 1) for line in block.split('\n') if line and not line.startswith(':')
+        )
+        if fields:
+            events.append((fields['event'], json.loads(fields['data'])))
+    return events
+
+
+def stream(app_module, headers=None):
+    async def scenario():
+        transport = httpx.ASGITransport(app=app_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+            response = await client.post('/api/v2/full-analysis/stream', json=REQUEST, headers=headers)
+            return response, parse_events(response.text)
+
+    return asyncio.run(scenario())
+
+
+def test_stream_emits_steps_in_order_then_complete(app_module, monkeypatch):
+    calls = []
+
+    async def fake_run(request, on_step=None, use_cache=True):
+        calls.append(use_cache)
+        on_step('channel', 'running', None)
+        on_step('channel', 'completed', {'channel_analysis': {'topics': ['ai']}})
+        await asyncio.sleep(0)
+        on_step('social', 'running', None)
+        on_step('social', 'timeout', {'social_trends': {'merged_trends': []}})
+        on_step('recommendations', 'completed', {'recommendations': [{'keyword': 'ai'}]})
+        on_step('backtest', 'skipped', None)
+        on_step('predictions', 'completed', {'trend_predictions': {'ai': 0.9}})
+        on_step('unknown_step', 'completed', {'ignored': True})
+        return {'success': True, 'recommendations': [{'keyword': 'ai'}]}
+
+    monkeypatch.setattr(app_module, 'run_full_analysis', fake_run)
+    response, events = stream(app_module, headers={'X-Analysis-Cache': 'bypass'})
+
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('text/event-stream')
+    assert [event for event, _ in events] == [
+        'channel_analysis', 'social_trends', 'recommendations', 'backtest', 'trend_predictions', 'complete'
+    ]
+    assert events[0][1] == {'status': 'completed', 'channel_analysis': {'topics': ['ai']}}
+    assert events[1][1]['status'] == 'timeout'
+    assert events[3][1] == {'status': 'skipped'}
+    assert events[-1][1] == {'success': True, 'recommendations': [{'keyword': 'ai'}]}
+    assert calls == [False]
+
+
+def test_stream_reports_error_event(app_module, monkeypatch):
+    async def fake_run(request, on_step=None, use_cache=True):
+        on_step('channel', 'completed', {'channel_analysis': {}})
+        raise RuntimeError('boom')
+
+    monkeypatch.setattr(app_module, 'run_full_analysis', fake_run)
+    response, events = stream(app_module)
+
+    assert response.status_code == 200
+    assert [event for event, _ in events] == ['channel_analysis', 'error']
+    assert events[-1][1] == {'success': False, 'detail': 'Full analysis failed: boom'}
+
+
+def test_stream_serializes_numpy_payloads(app_module, monkeypatch):
+    import numpy as np
+
+    async def fake_run(request, on_step=None, use_cache=True):
+        on_step('predictions', 'completed', {'trend_predictions': {'score': np.float64(0.5),
+                                                                   'series': np.arange(3)}})
+        return {'success': True}
+
+    monkeypatch.setattr(app_module, 'run_full_analysis', fake_run)
+    _, events = stream(app_module)
+    assert events[0] == ('trend_predictions', {'status': 'completed',
+                                               'trend_predictions': {'score': 0.5, 'series': [0, 1, 2]}})
@@ -0,0 +1,115 @@
+"""Google Trends 批量 payload：5 个一组、按列重新缩放、低峰值关键词单独查询、相关查询缓存"""
+
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.enhanced_social_collector import (
+    CacheManager, EnhancedGoogleTrendsCollector, KeywordFanOut
+)
+
+
+class FakeTrendReq:
+    """模拟 pytrends：同一 payload 的关键词共享 0-100 刻度，相关查询每个关键词一次请求"""
+
+    def __init__(self, raw, log):
+        self.raw = raw
+        self.log = log
+
+    def build_payload(self, kw_list, timeframe='now 7-d', geo=''):
+        self.kw_list = list(kw_list)
+        self.log['payloads'].append(list(kw_list))
+        self.related_queries_widget_list = [
+            {'request': {'restriction': {'complexKeywordsRestriction': {'keyword': [{'value': kw}]}}}}
+            for kw in kw_list
+        ]
+
+    def interest_over_time(self):
+        top = max(max(self.raw[kw]) for kw in self.kw_list)
+        return pd.DataFrame({
+            kw: np.round(np.array(self.raw[kw], dtype=float) * 100 / top).astype(np.int64)
+            for kw in self.kw_list
+        })
+
+    def related_queries(self):
+        related = {}
+        for widget in self.related_queries_widget_list:
+            kw = widget['request']['restriction']['complexKeywordsRestriction']['keyword'][0]['value']
+            self.log['related'].append(kw)
+            related[kw] = {
+                'rising': pd.DataFrame({'query': [f'{kw} rising']}),
+                'top': pd.DataFrame({'query': [f'{kw} top']})
+            }
+        return related
+
+
+def ramp(peak, days=10):
+    return list(np.linspace(peak / 2, peak, days))
+
+
+@pytest.fixture
+def collector():
+    collector = EnhancedGoogleTrendsCollector(CacheManager(), batch_size=5, min_shared_peak=5)
+    collector.pytrends = object()
+    collector.fan_out = KeywordFanOut('test', concurrency=2, rate=1000, burst=100)
+    collector.raw = {}
+    collector.log = {'payloads': [], 'related': []}
+    collector._thread_client = lambda: FakeTrendReq(collector.raw, collector.log)
+    return collector
+
+
+def fetch(collector, keywords):
+    keyed = collector._cache_keys(keywords)
+    return asyncio.run(collector._fetch_misses(keywords, keyed, 'US', 'now 7-d'))
+
+
+def test_keywords_are_chunked_into_payloads_of_five(collector):
+    keywords = [f'k{i}' for i in range(7)]
+    collector.raw.update({keyword: ramp(10 + i) for i, keyword in enumerate(keywords)})
+
+    results = fetch(collector, keywords)
+    assert sorted(results) == keywords
+    assert sorted(map(tuple, collector.log['payloads'])) == [tuple(keywords[:5]), tuple(keywords[5:])]
+    assert results['k3']['rising_queries'] == ['k3 rising']
+
+
+def test_related_queries_are_cached_separately(collector):
+    keywords = [f'k{i}' for i in range(5)]
+    collector.raw.update({keyword: ramp(50) for keyword in keywords})
+
+    fetch(collector, keywords)
+    assert sorted(collector.log['related']) == keywords
+    # 趋势数据过期后重新抓取：1 个 interest 请求，不再请求相关查询
+    for key in collector._cache_keys(keywords).values():
+        collector.cache.local_cache._remove(key)
+    results = fetch(collector, keywords)
+    assert len(collector.log['payloads']) == 2
+    assert sorted(collector.log['related']) == keywords
+    assert results['k0']['top_queries'] == ['k0 top']
+
+
+def test_each_column_is_rescaled_to_its_own_peak(collector):
+    collector.raw.update({'big': ramp(100), 'small': ramp(20)})
+
+    results = fetch(collector, ['big', 'small'])
+    assert max(results['big']['historical_data']) == 100
+    assert max(results['small']['historical_data']) == 100
+    shared = np.round(np.array(ramp(20)) * 100 / 100)
+    expected = np.round(shared * 100 / shared.max()).astype(int).tolist()
+    assert results['small']['historical_data'] == expected
+    assert collector.log['payloads'] == [['big', 'small']]
+
+
+def test_low_shared_peak_keywords_are_requeried_alone(collector):
+    collector.raw.update({'big': ramp(1000), 'tiny': ramp(3), 'mid': ramp(400)})
+
+    results = fetch(collector, ['big', 'tiny', 'mid'])
+    assert collector.log['payloads'] == [['big', 'tiny', 'mid'], ['tiny']]
+    # 单独查询的刻度：以 tiny 自己的峰值为 100
+    assert max(results['tiny']['historical_data']) == 100
+    assert len(set(results['tiny']['historical_data'])) > 3
+    # 相关查询在批量请求中已取回，单独查询时不再请求
+    assert sorted(collector.log['related']) == ['big', 'mid', 'tiny']
+    assert results['tiny']['rising_queries'] == ['tiny rising']
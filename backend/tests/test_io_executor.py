@@ -0,0 +1,123 @@
+"""BlockingIOExecutor：有界线程池、超时、队列已满与关闭"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from services.io_executor import BlockingIOExecutor, IOExecutorFull
+
+
+def test_runs_at_most_max_workers_calls_at_once():
+    executor = BlockingIOExecutor(max_workers=2, max_queue=10, timeout=5)
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def work(i):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        return i
+
+    async def scenario():
+        return await asyncio.gather(*(executor.run(work, i) for i in range(6)))
+
+    assert asyncio.run(scenario()) == list(range(6))
+    assert peak[0] == 2
+    stats = executor.stats()
+    assert stats['completed'] == 6
+    assert stats['pending'] == 0 and stats['running'] == 0
+    executor.shutdown()
+
+
+def test_timeout_keeps_slot_until_thread_finishes():
+    executor = BlockingIOExecutor(max_workers=1, max_queue=0, timeout=0.05)
+    release = threading.Event()
+
+    async def scenario():
+        with pytest.raises(asyncio.TimeoutError):
+            await executor.run(release.wait)
+        # 超时的调用仍在线程中运行，名额未释放
+        pending = executor.stats()['pending']
+        with pytest.raises(IOExecutorFull):
+            await executor.run(lambda: 'next')
+        release.set()
+        for _ in range(100):
+            if executor.stats()['pending'] == 0:
+                break
+            await asyncio.sleep(0.01)
+        return pending, await executor.run(lambda: 'next')
+
+    pending, result = asyncio.run(scenario())
+    assert pending == 1
+    assert result == 'next'
+    stats = executor.stats()
+    assert stats['timeouts'] == 1
+    assert stats['rejected'] == 1
+    assert stats['completed'] == 1
+    executor.shutdown()
+
+
+def test_queue_full_rejects_immediately():
+    executor = BlockingIOExecutor(max_workers=1, max_queue=1, timeout=5)
+    release = threading.Event()
+
+    async def scenario():
+        running = asyncio.ensure_future(executor.run(release.wait))
+        queued = asyncio.ensure_future(executor.run(lambda: 'queued'))
+        await asyncio.sleep(0.05)
+        start = time.perf_counter()
+        with pytest.raises(IOExecutorFull):
+            await executor.run(lambda: 'rejected')
+        elapsed = time.perf_counter() - start
+        release.set()
+        return await running, await queued, elapsed
+
+    running, queued, elapsed = asyncio.run(scenario())
+    assert running is True
+    assert queued == 'queued'
+    assert elapsed < 0.05
+    assert executor.stats()['rejected'] == 1
+    executor.shutdown()
+
+
+def test_failures_are_counted_and_raised():
+    executor = BlockingIOExecutor(max_workers=1, timeout=5)
+
+    def broken():
+        raise ValueError('sdk error')
+
+    with pytest.raises(ValueError):
+        asyncio.run(executor.run(broken))
+    stats = executor.stats()
+    assert stats['failed'] == 1
+    assert stats['pending'] == 0
+    executor.shutdown()
+
+
+def test_shutdown_cancels_queued_calls_and_restarts_lazily():
+    executor = BlockingIOExecutor(max_workers=1, max_queue=5, timeout=5)
+    release = threading.Event()
+    ran = []
+
+    async def scenario():
+        running = asyncio.ensure_future(executor.run(release.wait))
+        queued = asyncio.ensure_future(executor.run(lambda: ran.append('queued')))
+        await asyncio.sleep(0.05)
+        executor.shutdown()
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        release.set()
+        await running
+        # 关闭后再次调用时重新创建线程池
+        return await executor.run(lambda: 'after')
+
+    assert asyncio.run(scenario()) == 'after'
+    assert ran == []
+    assert executor.stats()['pending'] == 0
+    executor.shutdown()
+    executor.shutdown()
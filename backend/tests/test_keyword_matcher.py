@@ -0,0 +1,45 @@
+"""KeywordMatcher 与逐个关键词 text.count / in 的一致性"""
+
+import random
+
+from services.keyword_matcher import KeywordMatcher, keyword_categories
+
+OVERLAPPING = {
+    'gaming': ['game', 'gameplay', 'games', 'play'],
+    'repeat': ['aa', 'aaa', 'a a'],
+    'music': ['music', 'musical', 'sic'],
+}
+
+
+def naive_count(categories, text):
+    return {c: sum(text.count(kw) for kw in kws) for c, kws in categories.items()}
+
+
+def naive_distinct(categories, text):
+    return {c: sum(1 for kw in kws if kw in text) for c, kws in categories.items()}
+
+
+def test_overlapping_keywords_match_naive_counting():
+    matcher = KeywordMatcher(OVERLAPPING)
+    rng = random.Random(0)
+    pieces = ['game', 'play', 'gameplay', 's', ' ', 'a', 'aa', 'mu', 'sic', 'musical', 'x']
+    for _ in range(500):
+        text = ''.join(rng.choice(pieces) for _ in range(rng.randint(0, 20)))
+        assert matcher.count(text) == naive_count(OVERLAPPING, text), text
+        assert matcher.distinct(text) == naive_distinct(OVERLAPPING, text), text
+
+
+def test_builtin_categories_match_naive_counting():
+    rng = random.Random(1)
+    for group, categories in keyword_categories.items():
+        matcher = KeywordMatcher(categories)
+        vocabulary = [kw for kws in categories.values() for kw in kws] + ['the', 'video', ' ']
+        for _ in range(100):
+            text = ' '.join(rng.choice(vocabulary) for _ in range(rng.randint(0, 15))).lower()
+            assert matcher.count(text) == naive_count(categories, text), (group, text)
+            assert matcher.distinct(text) == naive_distinct(categories, text), (group, text)
+
+
+def test_empty_inputs():
+    assert KeywordMatcher({}).count('anything') == {}
+    assert KeywordMatcher(OVERLAPPING).count('') == {'gaming': 0, 'repeat': 0, 'music': 0}
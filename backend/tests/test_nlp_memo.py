@@ -0,0 +1,72 @@
+"""标题分词/词性标注缓存"""
+
+import json
+import sqlite3
+
+from services.nlp_memo import TitleParseMemo, merge_counter_stats, title_key
+
+PARSED = (('AI', 'News'), ('NNP', 'NNP'), ('ai', 'news'), ('NN', 'NNS'))
+
+
+def test_key_normalizes_whitespace_but_not_case():
+    assert title_key('AI  news\n') == title_key('AI news')
+    assert title_key('AI news') != title_key('ai news')
+
+
+def test_set_many_and_lru():
+    memo = TitleParseMemo(max_entries=1)
+    memo.set_many({'AI News': PARSED})
+    assert memo.get('AI  News') == PARSED
+    memo.set_many({'Other': PARSED})
+    assert memo.get('AI News') is None
+    assert memo.counters() == {'hits': 1, 'disk_hits': 0, 'misses': 1}
+
+
+def test_disk_tier_and_old_format_rows(tmp_path):
+    path = str(tmp_path / 'titles.sqlite')
+    TitleParseMemo(disk_path=path).set_many({'AI News': PARSED})
+
+    # 旧格式只有 (tokens, tags) 两项
+    conn = sqlite3.connect(path)
+    conn.execute("INSERT INTO title_parse (key, value) VALUES (?, ?)",
+                 (title_key('Old Title'), json.dumps([['Old', 'Title'], ['JJ', 'NN']])))
+    conn.commit()
+    conn.close()
+
+    restarted = TitleParseMemo(disk_path=path)
+    assert restarted.get('AI News') == PARSED
+    assert restarted.get('Old Title') is None
+    assert restarted.counters() == {'hits': 0, 'disk_hits': 1, 'misses': 1}
+
+
+def test_character_budget_evicts_oldest():
+    # PARSED 共 23 个字符
+    memo = TitleParseMemo(max_entries=100, max_chars=50)
+    memo.set_many({'a': PARSED, 'b': PARSED})
+    assert memo.stats()['chars'] == 46
+    memo.set_many({'c': PARSED})
+    assert memo.get('a') is None
+    assert memo.get('b') == PARSED and memo.get('c') == PARSED
+    assert memo.stats()['chars'] == 46
+
+    # 覆盖写入不重复计数
+    memo.set_many({'c': PARSED})
+    assert memo.stats()['chars'] == 46
+    assert memo.stats()['entries'] == 2
+
+
+def test_oversized_entry_not_kept_in_memory(tmp_path):
+    huge = (('word',) * 20, ('NN',) * 20, ('word',) * 20, ('NN',) * 20)
+    path = str(tmp_path / 'titles.sqlite')
+    memo = TitleParseMemo(max_chars=100, disk_path=path)
+    memo.set_many({'small': PARSED, 'huge': huge})
+    assert memo.stats()['entries'] == 1
+    assert memo.stats()['chars'] == 23
+    # 磁盘层仍然保存，读取后同样不进入内存层
+    assert memo.get('huge') == huge
+    assert memo.stats()['entries'] == 1
+
+
+def test_merge_counter_stats():
+    assert merge_counter_stats({'hits': 2, 'disk_hits': 1, 'misses': 1})['hit_rate'] == 0.75
+    assert merge_counter_stats({})['hit_rate'] == 0.0
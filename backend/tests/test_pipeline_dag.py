@@ -0,0 +1,171 @@
+"""PipelineDAG: 依赖顺序、并发、异常传播、阶段耗时"""
+
+import asyncio
+import time
+
+import pytest
+
+from services.cpu_executor import CPUExecutor
+from services.pipeline_dag import PipelineDAG, _InlineCPUTimer, inline_cpu_scope
+
+
+def _burn(seconds):
+    end = time.thread_time() + seconds
+    while time.thread_time() < end:
+        pass
+    return seconds
+
+
+def test_stages_see_dependency_results():
+    async def a(ctx):
+        await asyncio.sleep(0.01)
+        return 1
+
+    async def b(ctx):
+        await asyncio.sleep(0.01)
+        return ctx['a'] + 1
+
+    async def c(ctx):
+        await asyncio.sleep(0.01)
+        return ctx['a'] + ctx['b']
+
+    dag = PipelineDAG()
+    dag.add_stage('a', a)
+    dag.add_stage('b', b, depends_on=['a'])
+    dag.add_stage('c', c, depends_on=['a', 'b'])
+    ctx = asyncio.run(dag.run())
+    assert ctx == {'a': 1, 'b': 2, 'c': 3}
+    assert dag.critical_path()['stages'] == ['a', 'b', 'c']
+
+
+def test_independent_stages_run_concurrently():
+    async def sleeper(ctx):
+        await asyncio.sleep(0.2)
+
+    dag = PipelineDAG()
+    dag.add_stage('x', sleeper)
+    dag.add_stage('y', sleeper)
+    start = time.perf_counter()
+    asyncio.run(dag.run())
+    assert time.perf_counter() - start < 0.35
+
+
+def test_rejects_unknown_and_duplicate_stages():
+    async def noop(ctx):
+        return None
+
+    dag = PipelineDAG()
+    dag.add_stage('a', noop)
+    with pytest.raises(ValueError):
+        dag.add_stage('a', noop)
+    with pytest.raises(ValueError):
+        dag.add_stage('b', noop, depends_on=['missing'])
+
+
+def test_failure_cancels_other_stages():
+    cancelled = []
+
+    async def slow(ctx):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def failing(ctx):
+        await asyncio.sleep(0.01)
+        raise RuntimeError("stage failed")
+
+    dag = PipelineDAG()
+    dag.add_stage('slow', slow)
+    dag.add_stage('failing', failing)
+    with pytest.raises(RuntimeError):
+        asyncio.run(dag.run())
+    assert cancelled == [True]
+
+
+def test_cpu_time_covers_inline_and_executor_work():
+    executor = CPUExecutor(mode='thread')
+
+    async def inline(ctx):
+        _burn(0.05)
+        await asyncio.sleep(0.1)     # 挂起期间其他阶段的 CPU 不计入
+        _burn(0.05)
+
+    async def offloaded(ctx):
+        return await executor.run_thread(_burn, 0.05)
+
+    async def idle(ctx):
+        await asyncio.sleep(0.1)
+
+    dag = PipelineDAG()
+    dag.add_stage('inline', inline)
+    dag.add_stage('offloaded', offloaded)
+    dag.add_stage('idle', idle)
+    asyncio.run(dag.run())
+    stats = dag.stats()
+
+    assert 0.09 <= stats['inline']['inline_cpu_seconds'] < 0.14
+    assert stats['inline']['executor_cpu_seconds'] == 0
+    assert stats['offloaded']['executor_cpu_seconds'] >= 0.04
+    assert stats['offloaded']['cpu_seconds'] >= stats['offloaded']['executor_cpu_seconds']
+    assert stats['idle']['cpu_seconds'] < 0.02
+
+
+class _Suspend:
+    """挂起一次（不依赖事件循环，直接用 send/close 驱动协程）"""
+
+    def __await__(self):
+        yield
+
+
+def test_inline_timer_close_propagates_generator_exit():
+    events = []
+
+    async def stage():
+        try:
+            await _Suspend()
+        except GeneratorExit:
+            events.append('closed')
+            raise
+        finally:
+            events.append('finally')
+
+    async def outer():
+        with inline_cpu_scope():
+            await _InlineCPUTimer(stage())
+
+    coro = outer()
+    coro.send(None)          # 运行到挂起点
+    coro.close()             # 不应报 "coroutine ignored GeneratorExit"
+    assert events == ['closed', 'finally']
+
+
+def test_inline_timer_forwards_exceptions_and_results():
+    async def stage():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            return 'cleaned up'
+
+    async def scenario():
+        with inline_cpu_scope() as acc:
+            task = asyncio.ensure_future(_InlineCPUTimer(stage()))
+            await asyncio.sleep(0)
+            task.cancel()
+            return await task, acc
+
+    result, acc = asyncio.run(scenario())
+    assert result == 'cleaned up'
+    assert acc[0] >= 0
+
+
+def test_inline_timer_without_scope_is_passthrough():
+    async def stage():
+        await asyncio.sleep(0)
+        return 42
+
+    async def scenario():
+        return await _InlineCPUTimer(stage())
+
+    assert asyncio.run(scenario()) == 42
@@ -0,0 +1,44 @@
+"""/api/v3/predict-trends：并发请求按 (keyword, forecast_days) 合并拟合"""
+
+import asyncio
+import threading
+import time
+
+import httpx
+
+
+def test_overlapping_requests_fit_each_keyword_once(app_module, monkeypatch):
+    fitted = []
+    lock = threading.Lock()
+
+    def predict_many(keywords, forecast_days=7, parallel=None):
+        with lock:
+            fitted.extend(keywords)
+        time.sleep(0.2)
+        return {
+            keyword: {
+                'keyword': keyword, 'confidence': 90.0, 'trend_strength': 60.0,
+                'trend_direction': 'stable', 'peak_day': None, 'summary': keyword
+            }
+            for keyword in keywords
+        }
+
+    monkeypatch.setattr(app_module, 'PREDICTIONS_AVAILABLE', True)
+    monkeypatch.setattr(app_module.trend_predictor, 'predict_many', predict_many)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+            first = asyncio.ensure_future(client.post(
+                '/api/v3/predict-trends', json={'keywords': ['a', 'b'], 'forecast_days': 7}
+            ))
+            await asyncio.sleep(0.05)
+            second = client.post(
+                '/api/v3/predict-trends', json={'keywords': ['b', 'a', 'c'], 'forecast_days': 7}
+            )
+            return await asyncio.gather(first, second)
+
+    first, second = asyncio.run(scenario())
+    assert sorted(fitted) == ['a', 'b', 'c']
+    assert {p['keyword'] for p in first.json()['predictions']} == {'a', 'b'}
+    assert {p['keyword'] for p in second.json()['predictions']} == {'a', 'b', 'c'}
@@ -0,0 +1,106 @@
+"""令牌桶与 API 配额限流"""
+
+import asyncio
+
+import pytest
+
+from services import rate_limit
+from services.rate_limit import TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limit.time, 'monotonic', fake)
+    return fake
+
+
+def test_token_bucket_burst_then_queue(clock):
+    bucket = TokenBucket(rate=2.0, capacity=2)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    # 透支后按到达顺序排队
+    assert bucket.reserve() == pytest.approx(0.5)
+    assert bucket.reserve() == pytest.approx(1.0)
+
+    clock.now += 1.0
+    assert bucket.stats()['tokens'] == pytest.approx(0.0)
+    clock.now += 10.0
+    assert bucket.stats()['tokens'] == pytest.approx(2.0)
+    assert bucket.acquired == 4
+
+
+def test_token_bucket_acquire_waits():
+    async def scenario():
+        bucket = TokenBucket(rate=50.0, capacity=1)
+        waits = [await bucket.acquire() for _ in range(3)]
+        return bucket, waits
+
+    bucket, waits = asyncio.run(scenario())
+    assert waits[0] == 0.0
+    assert all(wait > 0 for wait in waits[1:])
+    assert bucket.stats()['total_wait_seconds'] == pytest.approx(sum(waits), abs=1e-3)
+
+
+def test_quota_limiter_local_rejects_when_exhausted(clock):
+    async def scenario():
+        limiter = rate_limit.QuotaLimiter('test', max_calls=3, time_window=30)
+        results = [await limiter.acquire() for _ in range(4)]
+        clock.now += 10.0
+        results.append(await limiter.acquire())
+        return limiter, results
+
+    limiter, results = asyncio.run(scenario())
+    assert results == [True, True, True, False, True]
+    assert (limiter.allowed, limiter.rejected) == (4, 1)
+
+
+def test_quota_limiter_waits_up_to_max_wait():
+    async def scenario():
+        limiter = rate_limit.QuotaLimiter('test', max_calls=1, time_window=0.05)
+        return [await limiter.acquire(), await limiter.acquire(max_wait=1.0)]
+
+    assert asyncio.run(scenario()) == [True, True]
+
+
+def test_quota_limiter_shares_state_through_redis():
+    fakeredis = pytest.importorskip('fakeredis')
+    pytest.importorskip('lupa')
+
+    async def scenario():
+        server = fakeredis.FakeServer()
+        workers = [
+            rate_limit.QuotaLimiter('shared', max_calls=5, time_window=60,
+                                    redis_client=fakeredis.aioredis.FakeRedis(server=server))
+            for _ in range(3)
+        ]
+        results = await asyncio.gather(*(w.acquire() for w in workers for _ in range(4)))
+        return workers, results
+
+    workers, results = asyncio.run(scenario())
+    assert sum(results) == 5
+    assert sum(w.redis_errors for w in workers) == 0
+
+
+def test_quota_limiter_falls_back_to_local_bucket_on_redis_error():
+    class BrokenRedis:
+        def register_script(self, script):
+            async def run(**kwargs):
+                raise ConnectionError("redis down")
+            return run
+
+    async def scenario():
+        limiter = rate_limit.QuotaLimiter('test', max_calls=2, time_window=60, redis_client=BrokenRedis())
+        return limiter, [await limiter.acquire() for _ in range(3)]
+
+    limiter, results = asyncio.run(scenario())
+    assert results == [True, True, False]
+    assert limiter.redis_errors == 1
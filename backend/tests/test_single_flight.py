@@ -0,0 +1,112 @@
+"""SingleFlight: 并发相同请求只计算一次"""
+
+import asyncio
+
+import pytest
+
+from services.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_computation():
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {'items': [1]}
+
+    async def scenario():
+        flight = SingleFlight()
+        results = await asyncio.gather(*(flight.do('k', compute) for _ in range(5)))
+        return flight, results
+
+    flight, results = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert all(result == {'items': [1]} for result in results)
+    # 每个调用方得到独立的拷贝
+    results[0]['items'].append(2)
+    assert results[1] == {'items': [1]}
+    assert flight.stats() == {'inflight': 0, 'leaders': 1, 'coalesced': 4}
+
+
+def test_different_keys_and_sequential_calls_are_not_coalesced():
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return len(calls)
+
+    async def scenario():
+        flight = SingleFlight()
+        await asyncio.gather(flight.do('a', compute), flight.do('b', compute))
+        await flight.do('a', compute)
+
+    asyncio.run(scenario())
+    assert len(calls) == 3
+
+
+def test_errors_propagate_to_all_waiters():
+    async def compute():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def scenario():
+        flight = SingleFlight()
+        return await asyncio.gather(*(flight.do('k', compute) for _ in range(3)),
+                                    return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_cancelled_caller_does_not_cancel_shared_computation():
+    async def compute():
+        await asyncio.sleep(0.05)
+        return 'done'
+
+    async def scenario():
+        flight = SingleFlight(copy_results=False)
+        first = asyncio.ensure_future(flight.do('k', compute))
+        second = asyncio.ensure_future(flight.do('k', compute))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(scenario()) == 'done'
+
+
+def test_do_many_batches_missing_keys_and_shares_overlap():
+    batches = []
+
+    async def compute_many(keys):
+        batches.append(list(keys))
+        await asyncio.sleep(0.05)
+        return {key: key.upper() for key in keys if key != 'none'}
+
+    async def scenario():
+        flight = SingleFlight()
+        first = asyncio.ensure_future(flight.do_many(['a', 'b'], compute_many))
+        await asyncio.sleep(0.01)
+        second = await flight.do_many(['b', 'c', 'none', 'a'], compute_many)
+        return flight, await first, second
+
+    flight, first, second = asyncio.run(scenario())
+    assert batches == [['a', 'b'], ['c', 'none']]
+    assert first == ['A', 'B']
+    assert second == ['B', 'C', None, 'A']
+    assert flight.stats() == {'inflight': 0, 'leaders': 2, 'coalesced': 2}
+
+
+def test_do_many_errors_reach_every_key():
+    async def compute_many(keys):
+        raise ValueError("boom")
+
+    async def scenario():
+        flight = SingleFlight()
+        with pytest.raises(ValueError):
+            await flight.do_many(['a', 'b'], compute_many)
+        return flight
+
+    assert asyncio.run(scenario()).stats()['inflight'] == 0
@@ -0,0 +1,76 @@
+"""collect_all_trends 的各数据源新鲜度（freshness）与缓存统计"""
+
+import asyncio
+import time
+
+import pytest
+
+from services.enhanced_social_collector import (
+    EnhancedSocialMediaAggregator, _freshness
+)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(time, 'time', lambda: now[0])
+    return now
+
+
+def fake_source(aggregator, source, live):
+    """
+    替换收集器的 get_trending_topics：走真实的 cache.lookup，
+    live=True 时实时"抓取"缓存未命中的关键词，否则视为平台无数据
+    """
+    cache = aggregator.cache
+
+    async def get_trending_topics(keywords, geo='US', cache_stats=None):
+        keyed = {keyword: f'{source}:{keyword}' for keyword in keywords[:5]}
+        hits, misses, _ = await cache.lookup(source, keyed, cache_stats)
+        if live:
+            hits.update({keyword: {'keyword': keyword, 'source': source} for keyword in misses})
+        return [hits[keyword] for keyword in keyed if keyword in hits]
+
+    setattr(getattr(aggregator, source), 'get_trending_topics', get_trending_topics)
+
+
+def test_collect_all_trends_reports_per_source_freshness(clock, monkeypatch):
+    aggregator = EnhancedSocialMediaAggregator()
+    monkeypatch.setattr(aggregator.signal_aggregator, 'aggregate_signals', lambda *sources: [])
+    for source, live in (('twitter', True), ('reddit', True), ('google_trends', True), ('serpapi', False)):
+        fake_source(aggregator, source, live)
+
+    async def scenario():
+        cache = aggregator.cache
+        # reddit：超过 soft TTL 的缓存；twitter：新鲜缓存；google_trends：一半缓存一半实时
+        await cache.set_many({'reddit:ai': {'keyword': 'ai'}, 'reddit:ml': {'keyword': 'ml'}})
+        clock[0] += cache.soft_ttl + 10
+        await cache.set_many({
+            'twitter:ai': {'keyword': 'ai'}, 'twitter:ml': {'keyword': 'ml'},
+            'google_trends:ai': {'keyword': 'ai'}
+        })
+        clock[0] += 30
+        return await aggregator.collect_all_trends(['ai', 'ml'])
+
+    result = asyncio.run(scenario())
+    freshness = result['freshness']
+    soft_ttl = aggregator.cache.soft_ttl
+
+    assert freshness['twitter'] == {'status': 'cached', 'max_age_seconds': 30.0}
+    assert freshness['reddit'] == {'status': 'stale', 'max_age_seconds': soft_ttl + 40.0}
+    assert freshness['google_trends'] == {'status': 'partial', 'max_age_seconds': 30.0}
+    # SerpAPI 无缓存也无数据
+    assert freshness['serpapi'] == {'status': 'unavailable', 'max_age_seconds': 0.0}
+
+    assert result['cache']['twitter']['hit_ratio'] == 1.0
+    assert result['cache']['reddit']['stale'] == 2
+    assert result['cache']['google_trends']['hits'] == 1
+    assert result['cache']['serpapi']['hits'] == 0
+    assert len(result['by_source']['google_trends']) == 2
+
+
+def test_freshness_status_for_live_data():
+    stats = {'keywords': 2, 'hits': 0, 'hit_ratio': 0.0, 'stale': 0, 'max_age_seconds': None}
+    assert _freshness(stats, [{}, {}]) == {'status': 'live', 'max_age_seconds': 0.0}
+    # 数据源抛错或超时时 cache_stats 可能为空
+    assert _freshness({}, []) == {'status': 'unavailable', 'max_age_seconds': 0.0}
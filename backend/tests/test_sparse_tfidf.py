@@ -0,0 +1,136 @@
+"""稀疏 TF-IDF（生产路径）与原 Counter 稠密实现的一致性"""
+
+import random
+from collections import Counter
+
+import numpy as np
+
+from benchmark_tfidf import make_bigrams, make_corpus
+from services.enhanced_youtube_analyzer import LightweightContentAnalyzer
+from services.sparse_tfidf import TermDocumentMatrix, min_max_normalize, rank_terms, top_k
+
+
+def dense_tfidf(docs, bigrams):
+    """原 _extract_tfidf_topics 的 Counter 实现（稠密基线）"""
+    all_words = [word for doc in docs for word in doc]
+    word_freq = Counter(all_words)
+    doc_freq = Counter()
+    for doc in docs:
+        doc_freq.update(set(doc))
+
+    tfidf_scores = {}
+    for word, freq in word_freq.items():
+        tf = freq / len(all_words)
+        idf = np.log(len(docs) / doc_freq[word])
+        tfidf_scores[word] = tf * idf
+    for bigram, count in bigrams.items():
+        tfidf_scores[bigram] = count * 1.5
+
+    max_score = max(tfidf_scores.values())
+    min_score = min(tfidf_scores.values())
+    score_range = max_score - min_score if max_score != min_score else 1
+    ranked = sorted(tfidf_scores.items(), key=lambda x: x[1], reverse=True)[:20]
+    return [
+        {
+            'topic': word,
+            'score': (score - min_score) / score_range,
+            'frequency': word_freq.get(word, bigrams.get(word, 1)),
+            'type': 'tfidf'
+        }
+        for word, score in ranked
+    ]
+
+
+def assert_same_topics(actual, expected):
+    assert [item['topic'] for item in actual] == [item['topic'] for item in expected]
+    assert [item['frequency'] for item in actual] == [item['frequency'] for item in expected]
+    np.testing.assert_allclose(
+        [item['score'] for item in actual], [item['score'] for item in expected], rtol=1e-12
+    )
+
+
+def make_analyzer():
+    # 跳过 __init__（不依赖 NLTK 停用词语料）
+    analyzer = LightweightContentAnalyzer.__new__(LightweightContentAnalyzer)
+    analyzer.stop_words = {'the', 'and', 'video', 'best'}
+    return analyzer
+
+
+def make_parsed(size, seed):
+    """随机生成已分词/标注的标题（NN 名词、其他词性、停用词、短词混合）"""
+    rng = random.Random(seed)
+    vocab = [f'term{i}' for i in range(60)] + ['the', 'and', 'video', 'ab', 'x-ray']
+    tags = ['NN', 'NNS', 'NNP', 'VB', 'JJ']
+    parsed = []
+    for _ in range(size):
+        lower = tuple(rng.choice(vocab) for _ in range(rng.randint(0, 10)))
+        lower_tags = tuple(rng.choice(tags) for _ in lower)
+        parsed.append({'tokens': lower, 'tags': lower_tags, 'lower': lower, 'lower_tags': lower_tags})
+    return parsed
+
+
+def test_rank_terms_matches_dense_baseline():
+    for size, seed in ((1, 0), (20, 1), (300, 2), (1000, 3)):
+        docs = make_corpus(size, vocab_size=200, seed=seed)
+        docs.append(['term0', 'term1', 'term0'])
+        bigrams = make_bigrams(docs)
+        expected = [{k: v for k, v in item.items() if k != 'type'} for item in dense_tfidf(docs, bigrams)]
+        assert_same_topics(rank_terms(docs, bigrams), expected)
+
+
+def test_extract_tfidf_topics_matches_dense_baseline():
+    analyzer = make_analyzer()
+    for size, seed in ((1, 4), (25, 5), (400, 6)):
+        parsed = make_parsed(size, seed)
+        titles = [' '.join(item['lower']) for item in parsed]
+        docs = [
+            [
+                word for word, pos in zip(item['lower'], item['lower_tags'])
+                if pos.startswith('NN') and word not in analyzer.stop_words
+                and len(word) > 2 and word.isalnum()
+            ]
+            for item in parsed
+        ]
+        actual = analyzer._extract_tfidf_topics(titles, parsed)
+        if not any(docs):
+            assert actual == []
+            continue
+        expected = dense_tfidf(docs, analyzer._extract_bigrams(titles, parsed))
+        assert_same_topics(actual, expected)
+        assert all(item['type'] == 'tfidf' for item in actual)
+
+
+def test_extract_tfidf_topics_without_nouns():
+    parsed = [{'tokens': ('run',), 'tags': ('VB',), 'lower': ('run',), 'lower_tags': ('VB',)}]
+    assert make_analyzer()._extract_tfidf_topics(['run'], parsed) == []
+
+
+def test_matrix_counts():
+    docs = [['a', 'b', 'a'], [], ['b', 'c']]
+    matrix = TermDocumentMatrix(docs)
+    assert matrix.vocabulary == ['a', 'b', 'c']
+    assert matrix.total_terms == 5
+    assert matrix.term_frequency().tolist() == [2, 2, 1]
+    assert matrix.document_frequency().tolist() == [1, 2, 1]
+    assert matrix.indptr.tolist() == [0, 2, 2, 4]
+
+
+def test_empty_corpus():
+    matrix = TermDocumentMatrix([[], []])
+    assert matrix.vocabulary == []
+    assert matrix.indptr.tolist() == [0, 0, 0]
+
+
+def test_top_k_is_stable_like_sorted():
+    rng = random.Random(7)
+    for _ in range(50):
+        scores = np.array([rng.choice([0.0, 0.5, 1.0, 2.0]) for _ in range(rng.randint(0, 30))])
+        k = rng.randint(0, 35)
+        expected = sorted(range(scores.size), key=lambda i: scores[i], reverse=True)[:k]
+        assert top_k(scores, k).tolist() == expected
+
+
+def test_min_max_normalize():
+    np.testing.assert_allclose(min_max_normalize(np.array([1.0, 3.0, 2.0])), [0.0, 1.0, 0.5])
+    assert min_max_normalize(np.array([4.0, 4.0])).tolist() == [0.0, 0.0]
+    assert min_max_normalize(np.array([])).size == 0
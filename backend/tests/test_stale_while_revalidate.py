@@ -0,0 +1,191 @@
+"""Stale-while-revalidate：soft TTL、后台刷新与去重、旧格式条目"""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from services.enhanced_social_collector import CacheManager, EnhancedSerpAPICollector
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = Clock()
+    monkeypatch.setattr(time, 'time', fake)
+    return fake
+
+
+def make_collector(cache):
+    """SerpAPI 收集器，真实抓取替换为计数的假抓取（仍走 _fetch_misses / cache.inflight）"""
+    collector = EnhancedSerpAPICollector(api_key=None, cache_manager=cache)
+    collector.available = True
+    collector.fetched = []
+    collector.release = asyncio.Event()
+
+    async def fetch_keyword(keyword, geo, cache_key):
+        collector.fetched.append(keyword)
+        await collector.release.wait()
+        data = {'keyword': keyword, 'version': len(collector.fetched)}
+        await cache.set(cache_key, data)
+        return data
+
+    collector._fetch_keyword = fetch_keyword
+    return collector
+
+
+def test_soft_ttl_defaults_to_three_quarters_of_hard_ttl():
+    assert CacheManager(ttl=3600).soft_ttl == 2700
+    assert CacheManager(ttl=3600, soft_ttl=600).soft_ttl == 600
+    assert CacheManager(ttl=600, soft_ttl=900).soft_ttl == 600
+
+
+def test_lookup_fresh_stale_and_missing(clock):
+    async def scenario():
+        cache = CacheManager(ttl=3600)
+        await cache.set_many({'k:old': {'v': 'old'}})
+        clock.now += 3000
+        await cache.set_many({'k:new': {'v': 'new'}})
+        stats = {}
+        result = await cache.lookup(
+            'serpapi', {'old': 'k:old', 'new': 'k:new', 'none': 'k:none'}, stats
+        )
+        return result, stats
+
+    (hits, misses, stale), stats = asyncio.run(scenario())
+    assert hits == {'old': {'v': 'old'}, 'new': {'v': 'new'}}
+    assert misses == ['none']
+    assert stale == ['old']
+    assert stats['hits'] == 2 and stats['stale'] == 1
+    assert stats['max_age_seconds'] == 3000.0
+
+
+def test_legacy_entries_are_served_as_stale(clock):
+    async def scenario():
+        cache = CacheManager(ttl=3600)
+        # 旧格式：直接存 data，没有 __swr__ 信封
+        cache.local_cache.set('k:legacy', {'v': 'legacy'}, ttl=3600)
+        stats = {}
+        hits, misses, stale = await cache.lookup('serpapi', {'legacy': 'k:legacy'}, stats)
+        due = await cache.due_for_refresh({'legacy': 'k:legacy'}, refresh_after=1e9)
+        return hits, stale, stats, due
+
+    hits, stale, stats, due = asyncio.run(scenario())
+    assert hits == {'legacy': {'v': 'legacy'}}
+    assert stale == ['legacy']
+    assert stats['max_age_seconds'] is None
+    assert due == ['legacy']
+
+
+def test_due_for_refresh(clock):
+    async def scenario():
+        cache = CacheManager(ttl=3600)
+        await cache.set_many({'k:a': {'v': 1}})
+        clock.now += 100
+        await cache.set_many({'k:b': {'v': 2}})
+        keyed = {'a': 'k:a', 'b': 'k:b', 'c': 'k:c'}
+        return await cache.due_for_refresh(keyed, refresh_after=50), cache.source_stats
+
+    due, source_stats = asyncio.run(scenario())
+    assert due == ['a', 'c']
+    # 预热查询不计入命中率
+    assert source_stats == {}
+
+
+def test_envelope_written_to_cache():
+    async def scenario():
+        cache = CacheManager(ttl=3600)
+        await cache.set('k', {'v': 1})
+        return cache.local_cache.get('k')
+
+    entry = asyncio.run(scenario())
+    assert entry['__swr__'] == 1
+    assert entry['data'] == {'v': 1}
+    assert entry['ttl'] == 3600
+    assert json.dumps(entry)
+
+
+def test_fresh_hit_does_not_fetch(clock):
+    async def scenario():
+        cache = CacheManager(ttl=3600)
+        collector = make_collector(cache)
+        await cache.set(collector._cache_keys(['ai'])['ai'], {'keyword': 'ai', 'version': 0})
+        clock.now += 60
+        return await collector.get_trending_topics(['ai']), collector, cache
+
+    result, collector, cache = asyncio.run(scenario())
+    assert result == [{'keyword': 'ai', 'version': 0}]
+    assert collector.fetched == []
+    assert cache.revalidations == 0
+
+
+def test_stale_served_then_refreshed_in_background(clock):
+    async def scenario():
+        cache = CacheManager(ttl=3600)
+        collector = make_collector(cache)
+        key = collector._cache_keys(['ai'])['ai']
+        await cache.set(key, {'keyword': 'ai', 'version': 0})
+        clock.now += 3000
+
+        # 过期条目立即返回，不等待抓取
+        served = await collector.get_trending_topics(['ai'])
+        pending = list(cache._revalidate_tasks)
+        collector.release.set()
+        await asyncio.gather(*pending)
+        refreshed = await cache.get(key)
+        return served, refreshed, pending, cache
+
+    served, refreshed, pending, cache = asyncio.run(scenario())
+    assert served == [{'keyword': 'ai', 'version': 0}]
+    assert len(pending) == 1
+    assert refreshed == {'keyword': 'ai', 'version': 1}
+    assert cache.revalidations == 1
+    assert cache._revalidating == set()
+
+
+def test_revalidation_is_deduplicated(clock):
+    async def scenario():
+        cache = CacheManager(ttl=3600)
+        collector = make_collector(cache)
+        keyed = collector._cache_keys(['ai'])
+        await cache.set(keyed['ai'], {'keyword': 'ai', 'version': 0})
+        clock.now += 3000
+
+        # 同一 stale 关键词的多个请求只触发一次后台刷新
+        await collector.get_trending_topics(['ai'])
+        await collector.get_trending_topics(['ai'])
+        await asyncio.sleep(0)
+        # 与后台刷新并发的前台抓取通过 cache.inflight 共享同一次抓取
+        foreground = asyncio.ensure_future(collector._fetch_misses(['ai'], keyed, 'US'))
+        await asyncio.sleep(0)
+        collector.release.set()
+        await asyncio.gather(foreground, *list(cache._revalidate_tasks))
+        return foreground.result(), collector, cache
+
+    foreground, collector, cache = asyncio.run(scenario())
+    assert collector.fetched == ['ai']
+    assert foreground == {'ai': {'keyword': 'ai', 'version': 1}}
+    assert cache.revalidations == 1
+    assert cache.inflight.stats()['coalesced'] >= 1
+
+
+def test_hard_expired_entry_is_a_blocking_miss(clock):
+    async def scenario():
+        cache = CacheManager(ttl=3600)
+        collector = make_collector(cache)
+        await cache.set(collector._cache_keys(['ai'])['ai'], {'keyword': 'ai', 'version': 0})
+        clock.now += 3601
+        collector.release.set()
+        return await collector.get_trending_topics(['ai']), cache
+
+    result, cache = asyncio.run(scenario())
+    assert result == [{'keyword': 'ai', 'version': 1}]
+    assert cache.revalidations == 0
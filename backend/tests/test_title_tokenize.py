@@ -0,0 +1,131 @@
+"""标题批量分词/标注与逐标题标注一致；专有名词短语不跨标题拼接"""
+
+import re
+
+import pytest
+
+from services import enhanced_youtube_analyzer as analyzer_module
+from services.enhanced_youtube_analyzer import LightweightContentAnalyzer
+from services.nlp_memo import TitleParseMemo
+
+TITLES = [
+    'Apple iPhone 15 Pro Review: Is It Worth It?',
+    'I tried the NEW Google Pixel for 30 days',
+    'apple iphone 15 pro review',
+    'Apple iPhone 15 Pro Review: Is It Worth It?',   # 重复标题
+    '',
+    'Best budget headphones under $50 (Sony vs JBL)',
+    'Review of Apple',
+    'Google Pixel Camera Test',
+]
+
+
+def fake_tokenize(text):
+    return re.findall(r"\w+|[^\w\s]", text)
+
+
+def fake_tag(tokens):
+    """与上下文相关的确定性标注（标签依赖前一个词，批量与逐句标注只有在对齐正确时才一致）"""
+    tags = []
+    for i, token in enumerate(tokens):
+        if not token.isalnum():
+            tag = '.'
+        elif token.isdigit():
+            tag = 'CD'
+        elif token[0].isupper() and (i > 0 or len(token) > 3):
+            tag = 'NNPS' if token.endswith('s') else 'NNP'
+        elif i > 0 and tags[-1] == 'DT':
+            tag = 'NN'
+        elif token.lower() in ('the', 'a', 'of'):
+            tag = 'DT'
+        else:
+            tag = 'NNS' if token.endswith('s') else ('VB' if len(token) <= 3 else 'NN')
+        tags.append(tag)
+    return list(zip(tokens, tags))
+
+
+@pytest.fixture(params=['fake', 'nltk'])
+def nlp(request, monkeypatch):
+    """返回 (word_tokenize, pos_tag)；缺少 NLTK 数据时只运行替身版本"""
+    monkeypatch.setattr(analyzer_module, 'title_memo', TitleParseMemo())
+    if request.param == 'nltk':
+        import nltk
+        try:
+            nltk.pos_tag(nltk.word_tokenize('Data check'))
+        except LookupError:
+            pytest.skip('NLTK tokenizer/tagger data not available')
+        return nltk.word_tokenize, nltk.pos_tag
+
+    return use_fake_nlp(monkeypatch)
+
+
+@pytest.fixture
+def fake_nlp(monkeypatch):
+    monkeypatch.setattr(analyzer_module, 'title_memo', TitleParseMemo())
+    return use_fake_nlp(monkeypatch)
+
+
+def use_fake_nlp(monkeypatch):
+    monkeypatch.setattr(analyzer_module, 'word_tokenize', fake_tokenize)
+    monkeypatch.setattr(analyzer_module, 'pos_tag_sents', lambda sents: [fake_tag(s) for s in sents])
+    return fake_tokenize, fake_tag
+
+
+def make_analyzer():
+    analyzer = LightweightContentAnalyzer.__new__(LightweightContentAnalyzer)
+    analyzer.stop_words = {'the', 'of', 'for', 'is', 'it', 'under', 'vs', 'best', 'new'}
+    return analyzer
+
+
+def per_title(word_tokenize, pos_tag, title):
+    """原实现：每个标题单独分词 + 标注（原始大小写和小写各一次）"""
+    tokens = word_tokenize(title)
+    lower = word_tokenize(title.lower())
+    return {
+        'tokens': tuple(tokens),
+        'tags': tuple(tag for _, tag in pos_tag(tokens)),
+        'lower': tuple(lower),
+        'lower_tags': tuple(tag for _, tag in pos_tag(lower)),
+    }
+
+
+def test_tokenize_titles_matches_per_title_tagging(nlp):
+    word_tokenize, pos_tag = nlp
+    analyzer = make_analyzer()
+    expected = [per_title(word_tokenize, pos_tag, title) for title in TITLES]
+
+    assert analyzer._tokenize_titles(TITLES) == expected
+    # 第二次全部来自 memo，结果不变
+    assert analyzer._tokenize_titles(list(reversed(TITLES))) == list(reversed(expected))
+    assert analyzer_module.title_memo.counters()['hits'] >= len(set(TITLES))
+
+
+def test_tagging_failure_is_not_memoized(fake_nlp, monkeypatch):
+    def broken(sents):
+        raise RuntimeError('tagger unavailable')
+
+    monkeypatch.setattr(analyzer_module, 'pos_tag_sents', broken)
+    parsed = make_analyzer()._tokenize_titles(['Apple Review'])
+    assert parsed[0]['tags'] == ('', '')
+    assert analyzer_module.title_memo.get('Apple Review') is None
+
+
+def test_proper_nouns_are_grouped_per_title(fake_nlp):
+    analyzer = make_analyzer()
+    titles = ['Review of Apple', 'Google Pixel Camera Test']
+    parsed = analyzer._tokenize_titles(titles)
+    topics = {item['topic']: item['frequency'] for item in analyzer._extract_proper_nouns('', parsed)}
+
+    assert topics == {'review': 1, 'apple': 1, 'google pixel camera test': 1}
+    # 拼接全部标题后再标注会得到跨标题的短语 "apple google pixel camera test"
+    assert not any('apple google' in topic for topic in topics)
+
+
+def test_proper_noun_phrases_counted_across_titles(fake_nlp):
+    analyzer = make_analyzer()
+    titles = ['watch Google Pixel today', 'Google Pixel Review', 'Google Pixel']
+    topics = analyzer._extract_proper_nouns('', analyzer._tokenize_titles(titles))
+    top = topics[0]
+    assert top['topic'] == 'google pixel'
+    assert top['type'] == 'entity'
+    assert top['frequency'] == 2
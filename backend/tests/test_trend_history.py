@@ -0,0 +1,53 @@
+"""批量读取关键词历史（一次查询）"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip('sqlalchemy')
+from sqlalchemy import event  # noqa: E402
+
+from services.trend_predictor import TrendHistoryModel, TrendPredictionEngine  # noqa: E402
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = TrendPredictionEngine(db_url=f"sqlite:///{tmp_path / 'history.db'}",
+                                   min_history_days=5, forecaster='fast')
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    session = engine.Session()
+    for keyword, days in (('ai', 10), ('crypto', 7), ('sparse', 3)):
+        for offset in range(days):
+            session.add(TrendHistoryModel(
+                keyword=keyword, date=today - timedelta(days=offset),
+                search_volume=1.0, composite_score=float(offset)
+            ))
+    # 超出时间窗口的旧数据
+    session.add(TrendHistoryModel(keyword='ai', date=today - timedelta(days=200),
+                                  search_volume=1.0, composite_score=99.0))
+    session.commit()
+    session.close()
+    return engine
+
+
+def test_bulk_loader_uses_one_query(engine):
+    statements = []
+    event.listen(engine.db_engine, 'before_cursor_execute',
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+
+    histories = engine.get_historical_data_bulk(['ai', 'crypto', 'sparse', 'missing', 'ai'], days=30)
+
+    assert len(statements) == 1
+    # 数据不足 min_history_days 的关键词被丢弃
+    assert sorted(histories) == ['ai', 'crypto']
+    assert len(histories['ai']) == 10
+    assert 'keyword' not in histories['ai'].columns
+    assert histories['ai']['date'].is_monotonic_increasing
+    assert histories['ai']['composite_score'].max() == 9.0
+
+
+def test_single_keyword_loader_matches_bulk(engine):
+    bulk = engine.get_historical_data_bulk(['crypto'], days=30)['crypto']
+    single = engine.get_historical_data('crypto', days=30)
+    assert single.equals(bulk)
+    assert engine.get_historical_data('sparse', days=30) is None
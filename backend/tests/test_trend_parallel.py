@@ -0,0 +1,100 @@
+"""batch_predict 进程池路径：超时回收、崩溃重试、父进程预测缓存"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services import trend_predictor as trend_module
+from services.forecast_cache import ForecastCache
+from services.trend_predictor import TrendPredictionEngine
+
+
+def fake_fit_task(min_history_days, uncertainty, uncertainty_samples,
+                  keyword, forecast_days, historical_df):
+    """代替 Prophet 拟合（在进程池子进程中执行，按关键词模拟卡住/崩溃）"""
+    if keyword == 'slow':
+        time.sleep(2)
+    if keyword.startswith('crash:'):
+        marker = keyword.split(':', 1)[1]
+        if not os.path.exists(marker):
+            open(marker, 'w').close()
+            os._exit(1)
+    return {'forecast': {}, 'result': {'keyword': keyword, 'confidence': 90.0, 'pid': os.getpid()}}
+
+
+def make_history():
+    return pd.DataFrame({
+        'date': pd.date_range('2024-01-01', periods=30, freq='D'),
+        'composite_score': 50 + np.random.RandomState(0).normal(0, 5, 30)
+    })
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    monkeypatch.setattr(trend_module, '_fit_keyword_task', fake_fit_task)
+    engine = TrendPredictionEngine(max_workers=2, keyword_timeout=0.5, forecaster='prophet')
+    engine.forecast_cache = ForecastCache()
+    yield engine
+    engine.shutdown()
+
+
+def predict(engine, keywords):
+    histories = {keyword: make_history() for keyword in keywords}
+    return engine._predict_parallel(keywords, 7, histories)
+
+
+def test_timeout_recycles_pool_and_keeps_other_keywords(engine):
+    engine._get_pool()
+    first_pool = engine._pool
+    start = time.monotonic()
+    results = predict(engine, ['a', 'slow', 'b', 'c'])
+    assert list(results) == ['a', 'b', 'c']
+    # 不等卡住的拟合结束
+    assert time.monotonic() - start < 2
+    assert engine._pool is not first_pool
+
+
+def test_keywords_lost_to_a_crashed_worker_are_retried(engine, tmp_path):
+    crash = f"crash:{tmp_path / 'crashed'}"
+    results = predict(engine, ['a', crash, 'b'])
+    assert list(results) == ['a', crash, 'b']
+    assert (tmp_path / 'crashed').exists()
+
+
+def test_cached_keywords_are_not_submitted(engine):
+    history = make_history()
+    engine.forecast_cache.set(
+        engine._forecast_cache_key('a', 7, history),
+        {'forecast': {}, 'result': {'keyword': 'a', 'confidence': 11.0}}
+    )
+    results = predict(engine, ['a'])
+    assert results['a']['confidence'] == 11.0
+    assert 'forecast_start' in results['a']
+    assert engine._pool is None
+
+    results = predict(engine, ['a', 'b'])
+    assert results['a']['confidence'] == 11.0
+    assert results['b']['pid'] != os.getpid()
+    # 拟合结果写入父进程缓存，下一次不再提交
+    assert engine.forecast_cache.get(engine._forecast_cache_key('b', 7, history)) is not None
+
+
+def test_prophet_intervals_do_not_depend_on_rng_state_or_threads(fake_prophet):
+    engine = TrendPredictionEngine(max_workers=1, forecaster='prophet', uncertainty='fast')
+    history = make_history()
+
+    np.random.seed(1)
+    first = engine._fit_prophet('ai', 7, history)
+    np.random.seed(2)
+    second = engine._fit_prophet('ai', 7, history)
+    assert first == second
+
+    # 请求线程中并发拟合（cpu_executor.run_thread）与串行结果相同
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        threaded = list(pool.map(lambda _: engine._fit_prophet('ai', 7, history), range(8)))
+    assert all(entry == first for entry in threaded)
+    assert engine._fit_prophet('other', 7, history) != first
@@ -0,0 +1,181 @@
+"""热门关键词预热：请求频率合并、预算、每轮锁与 run_once"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from services import trend_prewarmer
+from services.enhanced_social_collector import CacheManager
+from services.trend_prewarmer import KeywordPopularity, TrendPrewarmer
+
+fakeredis = pytest.importorskip('fakeredis')
+
+
+def redis_cache(server):
+    cache = CacheManager()
+    cache.redis_client = fakeredis.aioredis.FakeRedis(server=server)
+    return cache
+
+
+class FakeQuota:
+    def __init__(self, level, capacity):
+        self._level = level
+        self.capacity = capacity
+
+    async def level(self):
+        return self._level
+
+
+class FakeCollector:
+    def __init__(self, quota=None, fail=False):
+        if quota is not None:
+            self.quota = quota
+        self.fail = fail
+        self.calls = []
+
+    async def prewarm(self, keywords, refresh_after, max_fetch=None, geo=None):
+        self.calls.append({'keywords': list(keywords), 'refresh_after': refresh_after,
+                           'max_fetch': max_fetch, 'geo': geo})
+        if self.fail:
+            raise RuntimeError('platform down')
+        return min(len(keywords), max_fetch)
+
+
+class FakeAggregator:
+    def __init__(self, cache, twitter_level=15.0, reddit_level=60.0):
+        self.cache = cache
+        self.popularity = KeywordPopularity(cache)
+        self.twitter = FakeCollector(FakeQuota(twitter_level, 15.0))
+        self.reddit = FakeCollector(FakeQuota(reddit_level, 60.0))
+        self.google_trends = FakeCollector()
+        self.serpapi = FakeCollector()
+
+
+def test_top_counts_locally_without_redis():
+    async def scenario():
+        popularity = KeywordPopularity(CacheManager())
+        await popularity.record(['ai', 'ml', ''], geo='US')
+        await popularity.record(['ai'], geo='US')
+        await popularity.record(['ai'], geo='GB')
+        return await popularity.top(2), popularity.stats()
+
+    top, stats = asyncio.run(scenario())
+    assert top == [('ai', 'US', 2), ('ml', 'US', 1)]
+    assert stats['backend'] == 'local'
+    assert stats['recorded'] == 4
+
+
+def test_top_merges_workers_and_days_through_redis():
+    async def scenario():
+        server = fakeredis.FakeServer()
+        worker_a = KeywordPopularity(redis_cache(server), window_days=3)
+        worker_b = KeywordPopularity(redis_cache(server), window_days=3)
+        await worker_a.record(['ai', 'ml'])
+        await worker_b.record(['ai', 'rust'])
+        # 前一天的桶（同一窗口内）与很久以前的桶（窗口外）
+        today = datetime.utcnow().date()
+        client = worker_a.cache.redis_client
+        await client.zincrby(f"prewarm:popularity:{(today - timedelta(days=1)).strftime('%Y%m%d')}", 3, 'US|rust')
+        await client.zincrby(f"prewarm:popularity:{(today - timedelta(days=10)).strftime('%Y%m%d')}", 50, 'US|old')
+        return await worker_a.top(3)
+
+    top = asyncio.run(scenario())
+    assert top == [('rust', 'US', 4.0), ('ai', 'US', 2.0), ('ml', 'US', 1.0)]
+
+
+def test_top_falls_back_to_local_counts_when_redis_fails():
+    async def scenario():
+        server = fakeredis.FakeServer()
+        popularity = KeywordPopularity(redis_cache(server))
+        await popularity.record(['ai', 'ai', 'ml'])
+        server.connected = False
+        # 上一个 worker 写入 Redis 的计数此时读不到，只用本进程计数
+        popularity.cache._redis_down_until = 0.0
+        return await popularity.top(5), popularity.cache.redis_available
+
+    top, available = asyncio.run(scenario())
+    assert top == [('ai', 'US', 2), ('ml', 'US', 1)]
+    assert available is False
+
+
+def test_budget_respects_quota_reserve():
+    cache = CacheManager()
+    prewarmer = TrendPrewarmer(FakeAggregator(cache, twitter_level=10.0, reddit_level=20.0),
+                               quota_reserve=0.5, max_per_cycle=25)
+
+    async def budgets():
+        return {source: await prewarmer._budget(source) for source in trend_prewarmer.PREWARM_SOURCES}
+
+    # twitter: 10 - 15*0.5 = 2；reddit: 20 - 60*0.5 < 0；无配额的数据源用 max_per_cycle
+    assert asyncio.run(budgets()) == {'twitter': 2, 'reddit': 0, 'google_trends': 25, 'serpapi': 25}
+
+
+def test_acquire_cycle_runs_once_per_interval_across_workers():
+    async def scenario():
+        server = fakeredis.FakeServer()
+        first = TrendPrewarmer(FakeAggregator(redis_cache(server)), interval=300)
+        second = TrendPrewarmer(FakeAggregator(redis_cache(server)), interval=300)
+        local = TrendPrewarmer(FakeAggregator(CacheManager()), interval=300)
+        acquired = [await first._acquire_cycle(), await second._acquire_cycle()]
+        ttl = await first.cache.redis_client.ttl('prewarm:lock')
+        skipped = await second.run_once()
+        return acquired, ttl, skipped, second, await local._acquire_cycle()
+
+    acquired, ttl, skipped, second, local = asyncio.run(scenario())
+    assert acquired == [True, False]
+    assert 0 < ttl <= 270
+    assert skipped == {'skipped': True}
+    assert second.skipped_cycles == 1
+    assert local is True
+
+
+def test_acquire_cycle_when_redis_errors():
+    async def scenario():
+        server = fakeredis.FakeServer()
+        prewarmer = TrendPrewarmer(FakeAggregator(redis_cache(server)))
+        server.connected = False
+        return await prewarmer._acquire_cycle()
+
+    assert asyncio.run(scenario()) is True
+
+
+def test_run_once_warms_top_keywords_within_budget():
+    async def scenario():
+        cache = CacheManager(ttl=3600)
+        aggregator = FakeAggregator(cache, twitter_level=10.0, reddit_level=20.0)
+        aggregator.serpapi.fail = True
+        await aggregator.popularity.record(['ai', 'ml'], geo='US')
+        await aggregator.popularity.record(['ai'], geo='US')
+        await aggregator.popularity.record(['ai', 'rust'], geo='GB')
+        prewarmer = TrendPrewarmer(aggregator, top_n=10, interval=300, max_per_cycle=3)
+        return await prewarmer.run_once(), aggregator, prewarmer
+
+    result, aggregator, prewarmer = asyncio.run(scenario())
+    refresh_after = prewarmer.refresh_after
+    assert refresh_after == 2700 - 300
+
+    # Twitter / Reddit 的缓存键不含 geo：去重后一次调用
+    assert aggregator.twitter.calls == [
+        {'keywords': ['ai', 'ml', 'rust'], 'refresh_after': refresh_after, 'max_fetch': 2, 'geo': None}
+    ]
+    assert aggregator.reddit.calls == []
+    # 按 geo 分组，总数不超过预算
+    assert aggregator.google_trends.calls == [
+        {'keywords': ['ai', 'ml'], 'refresh_after': refresh_after, 'max_fetch': 3, 'geo': 'US'},
+        {'keywords': ['ai', 'rust'], 'refresh_after': refresh_after, 'max_fetch': 1, 'geo': 'GB'},
+    ]
+    assert result['keywords'] == 4
+    assert result['refreshed'] == {'twitter': 2, 'reddit': 0, 'google_trends': 3, 'serpapi': 0}
+    assert prewarmer.stats()['cycles'] == 1
+    assert prewarmer.stats()['refreshed']['google_trends'] == 3
+
+
+def test_run_once_without_popular_keywords():
+    async def scenario():
+        aggregator = FakeAggregator(CacheManager())
+        return await TrendPrewarmer(aggregator).run_once(), aggregator
+
+    result, aggregator = asyncio.run(scenario())
+    assert result['keywords'] == 0
+    assert not any(getattr(aggregator, source).calls for source in trend_prewarmer.PREWARM_SOURCES)